@@ -0,0 +1,218 @@
+"""Deterministic generator of synthetic OpenAPI specs and a matching ruleset."""
+
+import random
+from typing import Any, Dict, NamedTuple
+
+METHODS = ("get", "post", "put", "patch", "delete")
+TYPES = ("string", "integer", "number", "boolean")
+
+
+class Scale(NamedTuple):
+    paths: int
+    operations: int  # per path, at most len(METHODS)
+    schemas: int
+    ref_depth: int  # length of the chains of schemas referencing each other
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(paths=50, operations=2, schemas=50, ref_depth=3),
+    "medium": Scale(paths=500, operations=3, schemas=500, ref_depth=5),
+    "large": Scale(paths=5000, operations=4, schemas=5000, ref_depth=8),
+}
+
+
+def _schema(rng: random.Random, index: int, scale: Scale) -> Dict[str, Any]:
+    properties = {
+        f"field{number}": {"type": rng.choice(TYPES), "description": f"Field {number}"}
+        for number in range(rng.randint(2, 8))
+    }
+    # chains of `ref_depth` schemas, each referencing the next one
+    if (index + 1) % scale.ref_depth and index + 1 < scale.schemas:
+        properties["child"] = {"$ref": f"#/components/schemas/Schema{index + 1}"}
+    schema = {"type": "object", "properties": properties}
+    if rng.random() < 0.9:
+        schema["required"] = sorted(rng.sample(sorted(properties), 2))
+    return schema
+
+
+def _operation(
+    rng: random.Random, path_index: int, method: str, scale: Scale
+) -> Dict[str, Any]:
+    name = f"{method}Resource{path_index}"
+    if rng.random() < 0.05:  # a few rule violations
+        name = f"{method}_resource_{path_index}"
+    operation = {
+        "operationId": name,
+        "summary": f"{method.upper()} resource {path_index}",
+        "parameters": [
+            {
+                "name": "id",
+                "in": "path",
+                "required": True,
+                "schema": {"type": "string"},
+            },
+            {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+        ],
+        "responses": {
+            "200": {
+                "description": "OK",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "$ref": "#/components/schemas/"
+                            f"Schema{rng.randrange(scale.schemas)}"
+                        }
+                    }
+                },
+            },
+            "default": {"$ref": "#/components/responses/Error"},
+        },
+    }
+    if rng.random() < 0.95:
+        operation["tags"] = sorted(rng.sample(["alpha", "beta", "gamma", "delta"], 2))
+    return operation
+
+
+def generate_spec(scale: Scale, seed: int = 0) -> Dict[str, Any]:
+    """Generate an OpenAPI 3 spec; the same scale and seed give the same spec.
+
+    Args:
+        scale (Scale): Size of the spec.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        Dict[str, Any]: The spec.
+    """
+    rng = random.Random(seed)
+    paths = {}
+    for path_index in range(scale.paths):
+        methods = METHODS[: max(1, min(scale.operations, len(METHODS)))]
+        paths[f"/resources{path_index}/{{id}}"] = {
+            method: _operation(rng, path_index, method, scale) for method in methods
+        }
+    schemas = {
+        f"Schema{index}": _schema(rng, index, scale) for index in range(scale.schemas)
+    }
+    schemas["Unused"] = {"type": "object"}
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic API", "version": "1.0.0", "contact": {}},
+        "tags": [{"name": name} for name in ("alpha", "beta", "delta", "gamma")],
+        "paths": paths,
+        "components": {
+            "schemas": schemas,
+            "responses": {
+                "Error": {
+                    "description": "Error",
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/Schema0"}
+                        }
+                    },
+                }
+            },
+        },
+    }
+
+
+def _rule(given: Any, then: Any, severity: str = "warn") -> Dict[str, Any]:
+    return {
+        "description": "Synthetic rule",
+        "message": "Synthetic rule failed",
+        "severity": severity,
+        "given": given if isinstance(given, list) else [given],
+        "then": then,
+    }
+
+
+def generate_ruleset() -> Dict[str, Any]:
+    """Generate a Spectral-style ruleset that uses every builtin.
+
+    Returns:
+        Dict[str, Any]: The ruleset.
+    """
+    return {
+        "description": "Synthetic ruleset",
+        "formats": ["oas3"],
+        "aliases": {},
+        "functions": [],
+        "functionsDir": "functions",
+        "rules": {
+            "operation-id-camel-case": _rule(
+                "$.paths[*][*]",
+                {
+                    "field": "operationId",
+                    "function": "casing",
+                    "functionOptions": {"type": "camel"},
+                },
+                severity="error",
+            ),
+            "operation-tags": _rule(
+                "$.paths[*][*]", {"field": "tags", "function": "truthy"}
+            ),
+            "operation-summary-length": _rule(
+                "$.paths[*][*]",
+                {
+                    "field": "summary",
+                    "function": "length",
+                    "functionOptions": {"min": 5, "max": 80},
+                },
+            ),
+            "operation-tags-sorted": _rule(
+                "$.paths[*][*].tags", {"function": "alphabetical"}
+            ),
+            "parameter-in": _rule(
+                "$.paths[*][*].parameters[*]",
+                {
+                    "field": "in",
+                    "function": "enumeration",
+                    "functionOptions": {"values": ["path", "query", "header"]},
+                },
+            ),
+            "parameter-description": _rule(
+                "$.paths[*][*].parameters[*]",
+                {"field": "description", "function": "undefined"},
+            ),
+            "parameter-name-pattern": _rule(
+                "$..parameters[*].name",
+                {"function": "pattern", "functionOptions": {"match": "^[a-z]+$"}},
+            ),
+            "schema-type": _rule(
+                "$.components.schemas[*]", {"field": "type", "function": "defined"}
+            ),
+            "schema-deprecated": _rule(
+                "$.components.schemas[*]", {"field": "deprecated", "function": "falsy"}
+            ),
+            "schema-properties": _rule(
+                "$.components.schemas[*]",
+                {
+                    "function": "schema",
+                    "functionOptions": {
+                        "schema": {
+                            "type": "object",
+                            "required": ["type"],
+                            "properties": {"type": {"enum": ["object"]}},
+                        },
+                        "dialect": "draft7",
+                    },
+                },
+            ),
+            "schema-xor": _rule(
+                "$..properties[*]",
+                {
+                    "function": "xor",
+                    "functionOptions": {"properties": ["type", "$ref"]},
+                },
+            ),
+            "info-title": _rule("$.info.title", {"function": "truthy"}),
+            "unused-schemas": _rule(
+                "$.components.schemas",
+                {
+                    "function": "unreferencedReusableObject",
+                    "functionOptions": {
+                        "reusable_objects_location": "#/components/schemas"
+                    },
+                },
+            ),
+        },
+    }
@@ -0,0 +1,269 @@
+"""Benchmark the parser, every builtin and a full lint on synthetic specs.
+
+Run from the repository root:
+
+    python -m benchmarks.run --scale medium
+    python -m benchmarks.run --scale medium --update-baseline
+
+Every benchmark is timed as the best of `--repeat` runs, and run once more
+under `tracemalloc` for its peak memory. Results are compared against
+`benchmarks/baseline.json`; a benchmark that is more than `--tolerance`
+slower, or uses more than `--tolerance` more memory, fails the run.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from loguru import logger
+
+from benchmarks.generator import SCALES, generate_ruleset, generate_spec
+from stinky.noodle.utils import builtins
+from stinky.noodle.utils.enforcer import RuleEnforcer
+from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils.plan import ExecutionPlan, compile_ruleset
+from stinky.noodle.utils.ruleset import RuleSetModel
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Differences below these are noise, whatever the tolerance
+MIN_SECONDS = 0.001
+MIN_PEAK_MB = 0.5
+MIN_LOOP_SECONDS = 0.1
+
+FIND_OBJECTS_EXPRESSIONS = (
+    "$.info.title",
+    "$.paths[*][*]",
+    "$.paths[*][*].parameters[*]",
+    "$.components.schemas[*]",
+    "$..parameters[*].name",
+    "$..properties[*]",
+)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Time a benchmark and measure its peak memory.
+
+    Like `timeit`, fast benchmarks are run in loops of at least `MIN_LOOP_SECONDS`
+    so timer resolution and scheduling noise do not dominate.
+
+    Args:
+        func (Callable[[], Any]): The benchmark.
+        repeat (int): Number of timed loops.
+
+    Returns:
+        Dict[str, float]: Best time per run in seconds, and peak traced memory in MB.
+    """
+    number = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start_time >= MIN_LOOP_SECONDS:
+            break
+        number *= 2
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start_time = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start_time) / number)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_mb": peak / (1024 * 1024)}
+
+
+def _builtin_workloads(
+    parser: Parser, plan: ExecutionPlan
+) -> Dict[str, List[Tuple[builtins.Checker, List[Any]]]]:
+    """Collect the checkers of every builtin with the objects they check.
+
+    Args:
+        parser (Parser): Parser of the spec.
+        plan (ExecutionPlan): The compiled ruleset.
+
+    Returns:
+        Dict[str, List[Tuple[builtins.Checker, List[Any]]]]: Per builtin, its
+            bound checkers and their objects.
+    """
+    matches = parser.find_objects_many(given for given, _ in plan.groups)
+    workloads = defaultdict(list)
+    for given, clauses in plan.groups:
+        for clause in clauses:
+            objs = matches[given]
+            if clause.field is not None:
+                objs = [
+                    obj.get(clause.field) if isinstance(obj, dict) else None
+                    for obj in objs
+                ]
+            workloads[clause.function].append((clause.checker.bind(parser), objs))
+    return workloads
+
+
+def run_benchmarks(scale_name: str, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Run all benchmarks at one scale.
+
+    Args:
+        scale_name (str): Key of `SCALES`.
+        repeat (int, optional): Number of timed runs per benchmark. Defaults to 5.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Seconds, peak MB and throughput (items per
+            second) per benchmark.
+    """
+    specs = generate_spec(SCALES[scale_name])
+    plan = compile_ruleset(RuleSetModel(**generate_ruleset()))
+    parser = Parser(specs=specs)
+    results = {}
+
+    for json_expr in FIND_OBJECTS_EXPRESSIONS:
+        count = len(parser.find_objects(json_expr))
+        result = measure(lambda: parser.find_objects(json_expr), repeat)
+        results[f"find_objects {json_expr}"] = dict(
+            result, throughput=count / result["seconds"]
+        )
+
+    for function, workload in sorted(_builtin_workloads(parser, plan).items()):
+        count = sum(len(objs) for _, objs in workload)
+
+        def check(workload=workload):
+            for checker, objs in workload:
+                checker.check_many(objs)
+
+        result = measure(check, repeat)
+        results[f"builtin {function}"] = dict(
+            result, throughput=count / result["seconds"]
+        )
+
+    def enforce():
+        # a fresh parser, so the reference index is built as part of the run
+        RuleEnforcer(None, Parser(specs=specs), plan=plan).enforce()
+
+    result = measure(enforce, repeat)
+    results["enforce"] = dict(
+        result, throughput=len(specs["paths"]) / result["seconds"]
+    )
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """Find the benchmarks that regressed against a baseline.
+
+    Args:
+        results (Dict[str, Dict[str, float]]): Current results.
+        baseline (Dict[str, Dict[str, float]]): Baseline results of the same scale.
+        tolerance (float): Allowed relative slowdown or memory growth.
+
+    Returns:
+        List[str]: A description of every regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_mb", MIN_PEAK_MB)):
+            before, after = baseline[name][metric], result[metric]
+            if after > before * (1 + tolerance) and after - before > floor:
+                regressions.append(
+                    f"{name}: {metric} {before:.4f} -> {after:.4f} "
+                    f"(+{(after / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    """CLI entrypoint."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument(
+        "--scale",
+        help="Size of the synthetic spec",
+        dest="scales",
+        choices=sorted(SCALES),
+        action="append",
+        default=None,
+    )
+    parser.add_argument(
+        "--repeat",
+        help="Number of timed runs per benchmark, the best one counts",
+        dest="repeat",
+        type=int,
+        default=5,
+    )
+    parser.add_argument(
+        "--tolerance",
+        help="Allowed relative slowdown or memory growth against the baseline",
+        dest="tolerance",
+        type=float,
+        default=0.25,
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Path to the baseline file",
+        dest="baseline_path",
+        default=str(BASELINE_PATH),
+    )
+    parser.add_argument(
+        "--update-baseline",
+        help="Store the results as the new baseline instead of comparing",
+        dest="update_baseline",
+        action="store_true",
+        default=False,
+    )
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    baseline_path = Path(args.baseline_path)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    regressions = []
+    for scale_name in args.scales or ["small", "medium"]:
+        results = run_benchmarks(scale_name, repeat=args.repeat)
+        print(f"\n[{scale_name}] {SCALES[scale_name]}")
+        print(f"{'benchmark':<48} {'ms':>10} {'peak MB':>9} {'items/s':>12}")
+        for name, result in results.items():
+            print(
+                f"{name:<48} {result['seconds'] * 1000:>10.2f} "
+                f"{result['peak_mb']:>9.2f} {result['throughput']:>12.0f}"
+            )
+        if args.update_baseline:
+            baseline[scale_name] = results
+        else:
+            regressions.extend(
+                f"[{scale_name}] {regression}"
+                for regression in compare(
+                    results, baseline.get(scale_name, {}), args.tolerance
+                )
+            )
+
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline written to {baseline_path}.")
+    elif regressions:
+        print("\nPERFORMANCE REGRESSIONS:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        sys.exit(1)
+    else:
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from typing import Any
+
+# `Linter` pulls in the enforcer and the builtins, so it is only imported when
+# it is used and `noodle --help` stays fast
+_LAZY_EXPORTS = {"Linter": "stinky.noodle.linter"}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        import importlib
+
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
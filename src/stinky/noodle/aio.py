@@ -0,0 +1,159 @@
+"""Asyncio API, to lint specs from an event loop, e.g. in a web service.
+
+Linting is CPU bound, so it runs in an executor: a thread pool (the loop's
+default executor unless one is given) or a process pool for parallelism.
+`AsyncLinter` holds one compiled plan, so many small specs share the cost of
+loading the ruleset, and limits how many lints it runs at the same time::
+
+    plan = load_plan(Path("ruleset.yaml"))
+    linter = AsyncLinter(plan, max_concurrency=4)
+
+    results = await linter.lint(specs)
+    async for result in linter.iter_lint(specs):
+        ...
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from stinky.noodle.core import lint_parsed
+from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils.plan import ExecutionPlan
+from stinky.noodle.utils.reporters import LintResult
+from stinky.noodle.utils.scheduler import CostModel
+
+
+def _lint_specs(
+    specs: Any,
+    plan: ExecutionPlan,
+    resolve_refs: bool = False,
+    lint_cache_path: Optional[Union[str, Path]] = None,
+) -> List[LintResult]:
+    """Lint parsed specs, in an executor (picklable for process pools).
+
+    Args:
+        specs (Any): The parsed specs.
+        plan (ExecutionPlan): The compiled ruleset, or a part of it.
+        resolve_refs (bool, optional): Lint a view of the specs in which `$ref`s
+            are resolved. Defaults to False.
+        lint_cache_path (Optional[Union[str, Path]], optional): Path to the sqlite
+            lint cache, None to disable it. Defaults to None.
+
+    Returns:
+        List[LintResult]: The issues found.
+    """
+    spec_parser = Parser(specs=specs, resolve_refs=resolve_refs)
+    return lint_parsed(spec_parser, plan, lint_cache_path=lint_cache_path)
+
+
+class AsyncLinter:
+    """Lints parsed specs without blocking the event loop.
+
+    Every lint, or every part of a lint with `iter_lint`, is a job in the
+    executor. At most `max_concurrency` jobs of a linter run at the same time;
+    the others wait without holding an executor worker.
+    """
+
+    def __init__(
+        self,
+        plan: ExecutionPlan,
+        executor: Optional[Executor] = None,
+        max_concurrency: int = 4,
+        resolve_refs: bool = False,
+        lint_cache_path: Optional[Union[str, Path]] = None,
+    ):
+        """Initialize the linter.
+
+        Args:
+            plan (ExecutionPlan): The compiled ruleset, see
+                `stinky.noodle.core.load_plan` and
+                `stinky.noodle.utils.plan.compile_ruleset`.
+            executor (Optional[Executor], optional): Executor to lint in. With a
+                process pool, the plan and specs are pickled for every job.
+                Defaults to None, the event loop's default thread pool.
+            max_concurrency (int, optional): Maximum number of jobs running at
+                the same time. Defaults to 4.
+            resolve_refs (bool, optional): Lint a view of the specs in which
+                `$ref`s are resolved. Defaults to False.
+            lint_cache_path (Optional[Union[str, Path]], optional): Path to the
+                sqlite lint cache, None to disable it. Defaults to None.
+
+        Raises:
+            ValueError: Raised when `max_concurrency` is less than 1.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self.plan = plan
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.resolve_refs = resolve_refs
+        self.lint_cache_path = lint_cache_path
+        # created on first use, so it belongs to the running loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _run(self, specs: Any, plan: ExecutionPlan) -> List[LintResult]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                _lint_specs,
+                specs,
+                plan,
+                self.resolve_refs,
+                self.lint_cache_path,
+            )
+
+    async def lint(self, specs: Dict) -> List[LintResult]:
+        """Lint parsed specs in one executor job.
+
+        Args:
+            specs (Dict): The parsed specs.
+
+        Returns:
+            List[LintResult]: The issues found, as `RuleEnforcer.enforce` reports
+                them.
+        """
+        return await self._run(specs, self.plan)
+
+    async def iter_lint(
+        self, specs: Dict, chunks: int = 4
+    ) -> AsyncIterator[LintResult]:
+        """Lint parsed specs, yielding the issues as parts of the ruleset finish.
+
+        The given path groups of the plan are split into `chunks` parts of
+        about equal estimated cost, linted as separate jobs (each matching its
+        own given paths). The issues of every part are yielded as soon as it
+        finishes. Parts that did not start yet are cancelled when the caller
+        stops iterating.
+
+        Args:
+            specs (Dict): The parsed specs.
+            chunks (int, optional): Number of parts. Defaults to 4.
+
+        Yields:
+            LintResult: The issues found, part by part.
+        """
+        group_chunks = CostModel().chunks(
+            self.plan, range(len(self.plan.groups)), chunks
+        )
+        tasks = [
+            asyncio.ensure_future(
+                self._run(
+                    specs,
+                    self.plan._replace(
+                        groups=tuple(self.plan.groups[index] for index in sorted(chunk))
+                    ),
+                )
+            )
+            for chunk in group_chunks
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                for result in await task:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
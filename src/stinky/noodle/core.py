@@ -1,20 +1,69 @@
 import argparse
+import functools
+import glob
 import importlib
 import json
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from loguru import logger
 
-from stinky.noodle.utils.enforcer import RuleEnforcer
+from stinky.noodle.utils.bundle import BundleLoader
+from stinky.noodle.utils.lazy import materialize, read_json_lazy
+from stinky.noodle.utils.loader import DocumentCache, detect_format, load_document
 from stinky.noodle.utils.parser import Parser
-from stinky.noodle.utils.ruleset import RuleSetModel
+from stinky.noodle.utils.profiler import Profiler
+from stinky.noodle.utils.reporters import REPORTERS, LintResult, Reporter
 
+# The enforcer, the builtins, pydantic and multiprocessing are imported where
+# they are used, so `noodle --help` and the lint daemon client start fast.
+if TYPE_CHECKING:  # pragma: no cover
+    from stinky.noodle.utils.plan import ExecutionPlan
 
-def read_json(path: Path) -> Any:
-    with open(path) as fp:
-        return json.load(fp)
+LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {message}"
+
+# Set in each worker process by `_init_worker`, so the plan is shipped once
+# per worker instead of once per file.
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def read_json(
+    path: Path, cache_dir: Optional[Union[str, Path]] = None, lazy: bool = False
+) -> Any:
+    """Read a json or yaml document (the name predates yaml support).
+
+    Args:
+        path (Path): Path to the document.
+        cache_dir (Optional[Union[str, Path]], optional): Directory of the parsed
+            document cache, None to disable it. Defaults to None.
+        lazy (bool, optional): Memory-map json documents and only parse the
+            subtrees that are accessed. Defaults to False.
+
+    Returns:
+        Any: The parsed document.
+    """
+    if lazy:
+        with open(path, "rb") as fp:
+            head = fp.read(64)
+        if detect_format(path, head) == "json":
+            return read_json_lazy(path)
+        logger.debug(f"{path} is not json, it is loaded in full.")
+
+    cache = DocumentCache(cache_dir) if cache_dir is not None else None
+    return load_document(path, cache=cache)
 
 
 def try_import_custom_callables(
@@ -41,12 +90,405 @@ def try_import_custom_callables(
         raise exception
 
 
+def expand_spec_paths(patterns: Iterable[str]) -> List[Path]:
+    """Expand paths and glob patterns into a list of unique spec files.
+
+    Args:
+        patterns (Iterable[str]): Paths or (recursive) glob patterns.
+
+    Returns:
+        List[Path]: Absolute spec paths, in the order they were given.
+    """
+    paths = {}
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matched = sorted(glob.glob(pattern, recursive=True))
+            if not matched:
+                logger.warning(f"Pattern {pattern} did not match any files.")
+        else:
+            matched = [pattern]
+        for path in matched:
+            paths.setdefault(Path(path).absolute(), None)
+    return list(paths)
+
+
+def peak_rss() -> Optional[float]:
+    """Get the peak resident set size of this process and its finished children.
+
+    Returns:
+        Optional[float]: Peak RSS in MB, None where the `resource` module is
+            not available (Windows).
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (
+        max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        )
+        / scale
+    )
+
+
+def lint_file(
+    spec_path: Path,
+    plan: "ExecutionPlan",
+    jobs: int = 1,
+    lazy: bool = False,
+    cache_dir: Optional[Union[str, Path]] = None,
+    lint_cache_path: Optional[Union[str, Path]] = None,
+    resolve_refs: bool = False,
+    on_result: Optional[Callable[[LintResult], None]] = None,
+    profiler: Optional[Profiler] = None,
+    fail_fast: bool = False,
+    bundle_loader: Optional[BundleLoader] = None,
+) -> List[LintResult]:
+    """Lint a single spec file with a compiled plan.
+
+    Args:
+        spec_path (Path): Path to the spec file.
+        plan (ExecutionPlan): The compiled ruleset.
+        jobs (int, optional): Number of worker processes for the rules.
+            Defaults to 1.
+        lazy (bool, optional): Memory-map the spec and only parse the subtrees
+            the rules reach into. Defaults to False.
+        cache_dir (Optional[Union[str, Path]], optional): Directory of the parsed
+            document cache, None to disable it. Defaults to None.
+        lint_cache_path (Optional[Union[str, Path]], optional): Path to the sqlite
+            lint cache, None to disable it. Defaults to None.
+        resolve_refs (bool, optional): Lint a view of the spec in which `$ref`s
+            are resolved. Defaults to False.
+        on_result (Optional[Callable[[LintResult], None]], optional): Called with
+            every result as soon as it is produced. Defaults to None.
+        profiler (Optional[Profiler], optional): Collects where the time goes.
+            Defaults to None.
+        fail_fast (bool, optional): Stop at the first error. Defaults to False.
+        bundle_loader (Optional[BundleLoader], optional): Loads the files the spec
+            references when `resolve_refs` is set; share one between files so
+            each referenced file is loaded once. Defaults to None, a loader for
+            this file only.
+
+    Returns:
+        List[LintResult]: The issues found.
+    """
+    specs = read_json(spec_path, cache_dir=cache_dir, lazy=lazy)
+    documents = None
+    if resolve_refs:
+        specs = materialize(specs)
+        if bundle_loader is None:
+            with _bundle_loader(cache_dir) as file_loader:
+                documents = file_loader.load(spec_path, specs)
+        else:
+            documents = bundle_loader.load(spec_path, specs)
+    spec_parser = Parser(
+        specs=specs,
+        resolve_refs=resolve_refs,
+        base_path=spec_path,
+        documents=documents,
+    )
+    return lint_parsed(
+        spec_parser,
+        plan,
+        jobs=jobs,
+        lint_cache_path=lint_cache_path,
+        on_result=on_result,
+        profiler=profiler,
+        fail_fast=fail_fast,
+    )
+
+
+def lint_parsed(
+    spec_parser: Parser,
+    plan: "ExecutionPlan",
+    jobs: int = 1,
+    lint_cache_path: Optional[Union[str, Path]] = None,
+    on_result: Optional[Callable[[LintResult], None]] = None,
+    profiler: Optional[Profiler] = None,
+    fail_fast: bool = False,
+) -> List[LintResult]:
+    """Lint an already parsed spec with a compiled plan.
+
+    Args:
+        spec_parser (Parser): Parser of the spec.
+        plan (ExecutionPlan): The compiled ruleset.
+        jobs (int, optional): Number of worker processes for the rules.
+            Defaults to 1.
+        lint_cache_path (Optional[Union[str, Path]], optional): Path to the sqlite
+            lint cache, None to disable it. Defaults to None.
+        on_result (Optional[Callable[[LintResult], None]], optional): Called with
+            every result as soon as it is produced. Defaults to None.
+        profiler (Optional[Profiler], optional): Collects where the time goes.
+            Defaults to None.
+        fail_fast (bool, optional): Stop at the first clause of severity error
+            that fails. Defaults to False.
+
+    Returns:
+        List[LintResult]: The issues found.
+    """
+    from stinky.noodle.utils.enforcer import RuleEnforcer
+    from stinky.noodle.utils.lint_cache import LintCache
+
+    lint_cache = LintCache(lint_cache_path) if lint_cache_path is not None else None
+    rule_enforcer = RuleEnforcer(
+        ruleset_instance=None,
+        spec_parser_instance=spec_parser,
+        plan=plan,
+        jobs=jobs,
+        lint_cache=lint_cache,
+        profiler=profiler,
+        fail_fast=fail_fast,
+    )
+    try:
+        return rule_enforcer.enforce(on_result=on_result)
+    finally:
+        if lint_cache is not None:
+            lint_cache.close()
+
+
+def load_plan(
+    ruleset_path: Path,
+    callables_module: Optional[str] = None,
+    callables_dir: Optional[str] = None,
+    functions_attr_name: str = "custom_callables",
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> "ExecutionPlan":
+    """Read a ruleset, import the custom callables and compile them into a plan.
+
+    The `extends` chain of the ruleset is resolved and its aliases expanded,
+    see `stinky.noodle.utils.ruleset.read_ruleset`.
+
+    Args:
+        ruleset_path (Path): Path to the ruleset file.
+        callables_module (Optional[str], optional): The custom callables module.
+            Defaults to None.
+        callables_dir (Optional[str], optional): The path that contains the custom
+            callables module. Defaults to None.
+        functions_attr_name (str, optional): The name of the attribute within the
+            custom callables module. Defaults to "custom_callables".
+        cache_dir (Optional[Union[str, Path]], optional): Directory of the parsed
+            document and validated ruleset cache, None to disable it.
+            Defaults to None.
+
+    Returns:
+        ExecutionPlan: The compiled ruleset.
+    """
+    from stinky.noodle.utils.plan import compile_ruleset
+    from stinky.noodle.utils.ruleset import load_ruleset
+
+    cache = DocumentCache(cache_dir) if cache_dir is not None else None
+    ruleset_instance, sources = load_ruleset(ruleset_path, cache=cache)
+
+    custom_callables = {}
+    if callables_dir is not None and callables_dir not in sys.path:
+        sys.path.append(callables_dir)
+    if callables_module is not None:
+        custom_callables = try_import_custom_callables(
+            mod=callables_module, callables_attr=functions_attr_name
+        )
+    plan = compile_ruleset(ruleset_instance, custom_callables)
+    return plan._replace(sources=tuple(str(source) for source in sources))
+
+
+def _bundle_loader(cache_dir: Optional[Union[str, Path]] = None) -> BundleLoader:
+    return BundleLoader(
+        cache=DocumentCache(cache_dir) if cache_dir is not None else None
+    )
+
+
+def _init_worker(plan: "ExecutionPlan", options: Dict[str, Any]):
+    _WORKER_STATE["plan"] = plan
+    _WORKER_STATE["options"] = options
+    # files referenced by several specs are loaded once per worker
+    _WORKER_STATE["bundle_loader"] = (
+        _bundle_loader(options.get("cache_dir"))
+        if options.get("resolve_refs")
+        else None
+    )
+    logger.remove()
+
+
+def _lint_file_in_worker(
+    spec_path: Path,
+) -> Tuple[Optional[List[LintResult]], str, Optional[Profiler]]:
+    options = _WORKER_STATE["options"]
+    # a profiler per file, merged into the caller's profiler by `lint_files`
+    profiler = Profiler() if options.get("profiler") is not None else None
+    messages = []
+    handler_id = logger.add(messages.append, format=LOG_FORMAT, colorize=False)
+    try:
+        results = lint_file(
+            spec_path,
+            _WORKER_STATE["plan"],
+            bundle_loader=_WORKER_STATE["bundle_loader"],
+            **dict(options, profiler=profiler),
+        )
+    except Exception as exception:
+        logger.error(f"Unable to lint {spec_path}: {exception}")
+        results = None
+    finally:
+        logger.remove(handler_id)
+    return results, "".join(messages), profiler
+
+
+def lint_files(
+    spec_paths: List[Path],
+    plan: "ExecutionPlan",
+    jobs: int = 1,
+    reporter: Optional[Reporter] = None,
+    **options,
+) -> Dict[Path, Optional[List[LintResult]]]:
+    """Lint many spec files with one compiled plan.
+
+    With more than one file and more than one job, files are linted in a
+    process pool and each file's log output and results are reported in one
+    block once it is done; otherwise files are linted one after another, results
+    are reported as soon as they are produced, and `jobs` is used to spread the
+    rules of each file.
+
+    With the `fail_fast` option, no more files are linted once one has an error;
+    files that were not linted are left out of the returned issues. With the
+    `resolve_refs` option, files referenced by several specs are loaded once
+    (once per worker process).
+
+    Args:
+        spec_paths (List[Path]): Paths to the spec files.
+        plan (ExecutionPlan): The compiled ruleset.
+        jobs (int, optional): Number of worker processes. Defaults to 1.
+        reporter (Optional[Reporter], optional): Receives the results.
+            Defaults to None.
+        **options: Passed on to `lint_file`.
+
+    Returns:
+        Dict[Path, Optional[List[LintResult]]]: Issues per file, None when the
+            file could not be linted.
+    """
+    reporter = reporter if reporter is not None else Reporter()
+    results = {}
+    fail_fast = options.get("fail_fast", False)
+    if jobs > 1 and len(spec_paths) > 1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(plan, options),
+        ) as executor:
+            futures = [
+                executor.submit(_lint_file_in_worker, spec_path)
+                for spec_path in spec_paths
+            ]
+            for spec_path, future in zip(spec_paths, futures):
+                file_results, output, profiler = future.result()
+                logger.info(f"Linting {spec_path}.")
+                sys.stderr.write(output)
+                if profiler is not None:
+                    options["profiler"].merge(profiler)
+                for result in file_results or []:
+                    reporter.result(spec_path, result)
+                reporter.file(spec_path, file_results)
+                results[spec_path] = file_results
+                if fail_fast and _has_error(file_results):
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        _log_skipped(spec_paths, results, fail_fast)
+        return results
+
+    bundle_loader = (
+        _bundle_loader(options.get("cache_dir"))
+        if options.get("resolve_refs")
+        else None
+    )
+    try:
+        for spec_path in spec_paths:
+            logger.info(f"Linting {spec_path}.")
+            try:
+                results[spec_path] = lint_file(
+                    spec_path,
+                    plan,
+                    jobs=jobs,
+                    on_result=functools.partial(reporter.result, spec_path),
+                    bundle_loader=bundle_loader,
+                    **options,
+                )
+            except Exception as exception:
+                logger.error(f"Unable to lint {spec_path}: {exception}")
+                results[spec_path] = None
+            reporter.file(spec_path, results[spec_path])
+            if fail_fast and _has_error(results[spec_path]):
+                break
+    finally:
+        if bundle_loader is not None:
+            bundle_loader.close()
+    _log_skipped(spec_paths, results, fail_fast)
+    return results
+
+
+def _has_error(results: Optional[List[LintResult]]) -> bool:
+    return any(result.severity == "error" for result in results or [])
+
+
+def _log_skipped(
+    spec_paths: List[Path],
+    results: Dict[Path, Optional[List[LintResult]]],
+    fail_fast: bool,
+):
+    if fail_fast and len(results) < len(spec_paths):
+        logger.warning(
+            f"Stopped at the first error, {len(spec_paths) - len(results)} files "
+            "were not linted."
+        )
+
+
+def write_profile(
+    profiler: Profiler, profile_format: str, output: Optional[Union[str, Path]] = None
+):
+    """Write a profile as a table, json or Chrome trace.
+
+    Args:
+        profiler (Profiler): The profiler of the run.
+        profile_format (str): One of "table", "json" or "chrome".
+        output (Optional[Union[str, Path]], optional): File to write to, stderr
+            if None. Defaults to None.
+    """
+    if profile_format == "table":
+        content = profiler.table()
+    elif profile_format == "json":
+        content = json.dumps(profiler.to_json(), indent=2) + "\n"
+    else:
+        content = json.dumps(profiler.chrome_trace()) + "\n"
+
+    if output is None:
+        sys.stderr.write(content)
+    else:
+        Path(output).write_text(content)
+        logger.info(f"Profile written to {output}.")
+
+
 def entrypoint():
     """CLI entrypoint."""
-    parser = argparse.ArgumentParser(prog="noodle")
+    if sys.argv[1:2] in (["serve"], ["client"]):
+        from stinky.noodle import server
+
+        return server.entrypoint(sys.argv[1], sys.argv[2:])
+
+    parser = argparse.ArgumentParser(
+        prog="noodle",
+        epilog="Run `noodle serve --help` and `noodle client --help` for the lint daemon.",
+    )
     parser.add_argument(
-        "spec_path",
-        help="Path to the spec file",
+        "spec_paths",
+        help="Paths or glob patterns of the spec files",
+        nargs="+",
         default=None,
     )
     parser.add_argument(
@@ -85,28 +527,160 @@ def entrypoint():
         default="custom_callables",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of worker processes to spread the files (or the rules of a single file) over, 0 for one per CPU",
+        dest="jobs",
+        type=int,
+        required=False,
+        default=1,
+    )
+
+    parser.add_argument(
+        "--lazy",
+        help="Memory-map the spec files and only parse the subtrees the rules reach into",
+        dest="lazy",
+        action="store_true",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory to cache parsed specs and rulesets in, keyed by their content hash",
+        dest="cache_dir",
+        required=False,
+        default=None,
+    )
+
+    parser.add_argument(
+        "--lint-cache",
+        help="Path to a sqlite file storing check results per rule and matched subtree, so unchanged parts of the specs are not checked again",
+        dest="lint_cache_path",
+        required=False,
+        default=None,
+    )
+
+    parser.add_argument(
+        "--resolve-refs",
+        help="Resolve internal and local-file $refs before linting, so rules also match referenced objects",
+        dest="resolve_refs",
+        action="store_true",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--format",
+        help="Output format of the results: a text summary on stderr, or json, ndjson (streamed) or sarif on stdout",
+        dest="output_format",
+        choices=sorted(REPORTERS),
+        required=False,
+        default="text",
+    )
+
+    parser.add_argument(
+        "--min-severity",
+        help="Only run the rules of at least this severity, the others are dropped before any matching",
+        dest="min_severity",
+        choices=["error", "warn", "info", "hint"],
+        required=False,
+        default=None,
+    )
+
+    parser.add_argument(
+        "--fail-fast",
+        help="Stop at the first error: rules of severity error are checked first, cheapest first (from timings kept in --lint-cache), and no more files are linted",
+        dest="fail_fast",
+        action="store_true",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--profile",
+        help="Measure the time spent per given path, rule and function",
+        dest="profile",
+        action="store_true",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--profile-format",
+        help="Write the profile as a table, json or a Chrome trace",
+        dest="profile_format",
+        choices=["table", "json", "chrome"],
+        default="table",
+    )
+
+    parser.add_argument(
+        "--profile-output",
+        help="File to write the profile to, stderr by default",
+        dest="profile_output",
+        required=False,
+        default=None,
+    )
+
     args = parser.parse_args()
     ruleset_path = Path(args.ruleset_path).absolute()
-    spec_path = Path(args.spec_path).absolute()
-    custom_callables_module = args.callables_module
-    custom_callables_path = args.callables_dir
-    specs = read_json(spec_path)
-    ruleset = read_json(ruleset_path)
-    ruleset_instance = RuleSetModel(**ruleset)
+    spec_paths = expand_spec_paths(args.spec_paths)
+    plan = load_plan(
+        ruleset_path,
+        callables_module=args.callables_module,
+        callables_dir=args.callables_dir,
+        functions_attr_name=args.functions_attr_name,
+        cache_dir=args.cache_dir,
+    )
+    # lint cache entries of rules skipped by --min-severity are kept
+    live_plan = plan
+    if args.min_severity is not None:
+        from stinky.noodle.utils.plan import filter_severity
 
-    custom_callables = {}
-    if custom_callables_path is not None:
-        sys.path.append(custom_callables_path)
-    if custom_callables_module is not None:
-        custom_callables = try_import_custom_callables(
-            mod=custom_callables_module, callables_attr=args.functions_attr_name
-        )
+        plan = filter_severity(plan, args.min_severity)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
 
-    parser = Parser(specs=specs)
+    reporter = REPORTERS[args.output_format]()
+    profiler = Profiler() if args.profile else None
+    start_time = time.perf_counter()
+    results = lint_files(
+        spec_paths,
+        plan,
+        jobs=jobs,
+        reporter=reporter,
+        lazy=args.lazy,
+        cache_dir=args.cache_dir,
+        lint_cache_path=args.lint_cache_path,
+        resolve_refs=args.resolve_refs,
+        profiler=profiler,
+        fail_fast=args.fail_fast,
+    )
+    elapsed = time.perf_counter() - start_time
 
-    rule_enforcer = RuleEnforcer(
-        ruleset_instance=ruleset_instance,
-        spec_parser_instance=parser,
-        custom_callables=custom_callables,
+    reporter.close()
+
+    failed = [path for path, file_results in results.items() if file_results != []]
+    logger.info(
+        f"[Linting finished] Linted {len(results)} files in {elapsed:.2f}s "
+        f"({len(results) / max(elapsed, 1e-9):.1f} files/s), {len(failed)} with issues."
     )
-    rule_enforcer.enforce()
+    if args.lint_cache_path is not None:
+        from stinky.noodle.utils.lint_cache import LintCache
+
+        lint_cache = LintCache(args.lint_cache_path)
+        pruned = lint_cache.prune(
+            (
+                clause.fingerprint
+                for _, clauses in live_plan.groups
+                for clause in clauses
+            ),
+            str(ruleset_path),
+        )
+        lint_cache.close()
+        logger.debug(f"Removed {pruned} outdated lint cache entries.")
+
+    if profiler is not None:
+        write_profile(profiler, args.profile_format, args.profile_output)
+
+    rss = peak_rss()
+    if rss is not None:
+        logger.info(f"Peak RSS: {rss:.1f} MB.")
+    if failed:
+        sys.exit(1)
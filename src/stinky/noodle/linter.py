@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from stinky.noodle.utils.enforcer import RuleEnforcer
+from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils.plan import ExecutionPlan, compile_ruleset, filter_severity
+from stinky.noodle.utils.reporters import LintResult
+from stinky.noodle.utils.ruleset import RuleSetModel
+
+
+class Linter:
+    """Compiles a ruleset and its custom callables once, then lints any number of specs.
+
+    The compiled plan is immutable and shared by every lint. Everything that
+    belongs to a single spec (its parser, reference index, bound checkers and
+    results) is created per call, so `lint` can be called from many threads at
+    the same time, e.g. in a long-lived worker.
+
+    ```python
+    linter = Linter.from_path("ruleset.yaml")
+    for specs in uploaded_specs:
+        results = linter.lint(specs)
+    ```
+    """
+
+    def __init__(
+        self,
+        ruleset_instance: Optional[RuleSetModel] = None,
+        custom_callables: Optional[Dict[str, Callable]] = None,
+        plan: Optional[ExecutionPlan] = None,
+        resolve_refs: bool = False,
+        min_severity: Optional[str] = None,
+        fail_fast: bool = False,
+    ):
+        """Initialize the linter, compiling the ruleset.
+
+        Args:
+            ruleset_instance (Optional[RuleSetModel], optional): The ruleset.
+                Defaults to None.
+            custom_callables (Optional[Dict[str, Callable]], optional): Custom
+                callable names mapped to callables. Defaults to None.
+            plan (Optional[ExecutionPlan], optional): A precompiled execution
+                plan, used instead of the ruleset. Defaults to None.
+            resolve_refs (bool, optional): Lint a view of every spec in which
+                `$ref`s are resolved. Defaults to False.
+            min_severity (Optional[str], optional): Only run the rules of at
+                least this severity. Defaults to None, all rules.
+            fail_fast (bool, optional): Stop linting a spec at its first error.
+                Defaults to False.
+
+        Raises:
+            ValueError: Raised when neither a ruleset nor a plan is given.
+            NonExistentCallableError: Raised when any of the rules uses a
+                function that does not exist.
+        """
+        if plan is None:
+            if ruleset_instance is None:
+                raise ValueError("Either ruleset_instance or plan is required.")
+            plan = compile_ruleset(ruleset_instance, custom_callables)
+        if min_severity is not None:
+            plan = filter_severity(plan, min_severity)
+        self.plan = plan
+        self.resolve_refs = resolve_refs
+        self.fail_fast = fail_fast
+
+    @classmethod
+    def from_path(
+        cls,
+        ruleset_path: Union[str, Path],
+        callables_module: Optional[str] = None,
+        callables_dir: Optional[str] = None,
+        functions_attr_name: str = "custom_callables",
+        cache_dir: Optional[Union[str, Path]] = None,
+        **options,
+    ) -> "Linter":
+        """Create a linter from a ruleset file, like the `noodle` CLI does.
+
+        Args:
+            ruleset_path (Union[str, Path]): Path to the ruleset file.
+            callables_module (Optional[str], optional): The custom callables
+                module. Defaults to None.
+            callables_dir (Optional[str], optional): The path that contains the
+                custom callables module. Defaults to None.
+            functions_attr_name (str, optional): The name of the attribute within
+                the custom callables module. Defaults to "custom_callables".
+            cache_dir (Optional[Union[str, Path]], optional): Directory of the
+                parsed document and validated ruleset cache. Defaults to None.
+            **options: Passed on to `Linter`.
+
+        Returns:
+            Linter: The linter.
+        """
+        from stinky.noodle.core import load_plan
+
+        plan = load_plan(
+            Path(ruleset_path).absolute(),
+            callables_module=callables_module,
+            callables_dir=callables_dir,
+            functions_attr_name=functions_attr_name,
+            cache_dir=cache_dir,
+        )
+        return cls(plan=plan, **options)
+
+    def lint(
+        self,
+        specs: Dict,
+        on_result: Optional[Callable[[LintResult], None]] = None,
+    ) -> List[LintResult]:
+        """Lint parsed specs. Safe to call from many threads at the same time.
+
+        Args:
+            specs (Dict): The parsed specs.
+            on_result (Optional[Callable[[LintResult], None]], optional): Called
+                with every result as soon as it is produced. Defaults to None.
+
+        Returns:
+            List[LintResult]: The issues found.
+        """
+        spec_parser = Parser(specs=specs, resolve_refs=self.resolve_refs)
+        return RuleEnforcer(
+            None, spec_parser, plan=self.plan, fail_fast=self.fail_fast
+        ).enforce(on_result=on_result)
@@ -0,0 +1,565 @@
+"""Lint daemon that keeps the ruleset and parsed specs warm, and its thin client.
+
+The daemon listens on a Unix socket and speaks newline-delimited json: every
+request is one json object on one line, and every response is a stream of
+json objects, one per line. Requests are
+
+- `{"command": "lint", "spec_paths": [...]}`, answered with one
+  `{"path", "fail_count", "results", "output", "elapsed_ms"}` object per spec
+  (`results` are `stinky.noodle.utils.reporters.LintResult` objects) and a final
+  `{"done": true, "fail_count": ...}` object,
+- `{"command": "ping"}` and `{"command": "shutdown"}`, answered with `{"ok": true}`.
+
+The client only imports the standard library, loguru and the reporters, so it starts fast;
+everything else is imported by the daemon.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from stinky.noodle.utils.reporters import REPORTERS, LintResult, Reporter, TextReporter
+
+SOCKET_NAME = "stinky-noodle.sock"
+# Log output sent to clients, without timestamps: formatting them costs more
+# than linting a medium spec
+OUTPUT_FORMAT = "{level: <8} | {message}"
+
+
+def default_socket_path() -> Path:
+    """Get the default socket path, private to the current user.
+
+    Returns:
+        Path: The socket path.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / SOCKET_NAME
+    return Path(tempfile.gettempdir()) / f"{os.getuid()}-{SOCKET_NAME}"
+
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    """Get a stamp that changes whenever a file is modified.
+
+    Args:
+        path (Path): Path to the file.
+
+    Returns:
+        Optional[Tuple[int, int]]: Modification time in ns and size, None if the
+            file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class LintDaemon:
+    """Lints specs with a compiled ruleset that is kept in memory.
+
+    The plan is recompiled when the ruleset file or a ruleset it extends
+    changes (custom callables modules are imported once, restart the daemon
+    after changing them), and
+    parsed specs are kept per file version, so re-linting a file that did not
+    change skips parsing, and a changed file is the only one parsed again.
+    With `resolve_refs`, a spec is also parsed again when any file it
+    references changes.
+    """
+
+    def __init__(
+        self,
+        ruleset_path: Path,
+        callables_module: Optional[str] = None,
+        callables_dir: Optional[str] = None,
+        functions_attr_name: str = "custom_callables",
+        cache_dir: Optional[str] = None,
+        lint_cache_path: Optional[str] = None,
+        resolve_refs: bool = False,
+        max_specs: int = 64,
+    ):
+        """Initialize the daemon and compile the ruleset.
+
+        Args:
+            ruleset_path (Path): Path to the ruleset file.
+            callables_module (Optional[str], optional): The custom callables module.
+                Defaults to None.
+            callables_dir (Optional[str], optional): The path that contains the
+                custom callables module. Defaults to None.
+            functions_attr_name (str, optional): The name of the attribute within
+                the custom callables module. Defaults to "custom_callables".
+            cache_dir (Optional[str], optional): Directory of the parsed document
+                cache. Defaults to None.
+            lint_cache_path (Optional[str], optional): Path to the sqlite lint
+                cache. Defaults to None.
+            resolve_refs (bool, optional): Lint a view of the specs in which
+                `$ref`s are resolved. Defaults to False.
+            max_specs (int, optional): Number of parsed specs to keep in memory.
+                Defaults to 64.
+        """
+        from stinky.noodle.utils.cache import LRUCache
+
+        self.ruleset_path = Path(ruleset_path).absolute()
+        self.plan_options = {
+            "callables_module": callables_module,
+            "callables_dir": callables_dir,
+            "functions_attr_name": functions_attr_name,
+            "cache_dir": cache_dir,
+        }
+        self.cache_dir = cache_dir
+        self.lint_cache_path = lint_cache_path
+        self.resolve_refs = resolve_refs
+        self.parsers = LRUCache(maxsize=max_specs)
+        self._plan = None
+        self._ruleset_stamp = None
+        self.plan()
+
+    def plan(self) -> Any:
+        """Get the compiled ruleset, recompiled if any of its files changed.
+
+        Returns:
+            ExecutionPlan: The compiled ruleset.
+        """
+        from stinky.noodle.core import load_plan
+
+        sources = [self.ruleset_path]
+        if self._plan is not None and self._plan.sources:
+            sources = [Path(source) for source in self._plan.sources]
+        stamp = tuple(file_stamp(source) for source in sources)
+        if self._plan is None or stamp != self._ruleset_stamp:
+            logger.info(f"Compiling ruleset {self.ruleset_path}.")
+            self._plan = load_plan(self.ruleset_path, **self.plan_options)
+            self._ruleset_stamp = tuple(
+                file_stamp(Path(source))
+                for source in self._plan.sources or [self.ruleset_path]
+            )
+        return self._plan
+
+    def parser(self, spec_path: Path) -> Any:
+        """Get the parser of a spec, parsed again only if the file changed.
+
+        With `resolve_refs`, the parser is also built again when a file the spec
+        references, directly or through other files, changed or appeared.
+
+        Args:
+            spec_path (Path): Path to the spec file.
+
+        Returns:
+            Parser: Parser of the current version of the spec.
+        """
+        from stinky.noodle.core import read_json
+        from stinky.noodle.utils.bundle import BundleLoader, bundle_files
+        from stinky.noodle.utils.lazy import materialize
+        from stinky.noodle.utils.loader import DocumentCache
+        from stinky.noodle.utils.parser import Parser
+
+        def build() -> Tuple[Any, Tuple]:
+            specs = read_json(spec_path, cache_dir=self.cache_dir)
+            documents, stamps = None, ()
+            if self.resolve_refs:
+                specs = materialize(specs)
+                cache = (
+                    DocumentCache(self.cache_dir)
+                    if self.cache_dir is not None
+                    else None
+                )
+                # a loader per build, so changed referenced files are read again
+                with BundleLoader(cache=cache) as bundle_loader:
+                    documents = bundle_loader.load(spec_path, specs)
+                stamps = tuple(
+                    (path, file_stamp(path)) for path in bundle_files(documents)
+                )
+            spec_parser = Parser(
+                specs=specs,
+                resolve_refs=self.resolve_refs,
+                base_path=spec_path,
+                documents=documents,
+            )
+            return spec_parser, stamps
+
+        key = (spec_path, file_stamp(spec_path))
+        spec_parser, stamps = self.parsers.get_or_create(key, build)
+        if any(file_stamp(path) != stamp for path, stamp in stamps):
+            self.parsers.discard(key)
+            spec_parser, _ = self.parsers.get_or_create(key, build)
+        return spec_parser
+
+    def lint(self, spec_path: Path) -> Dict[str, Any]:
+        """Lint a single spec, capturing its log output.
+
+        Args:
+            spec_path (Path): Path to the spec file.
+
+        Returns:
+            Dict[str, Any]: The path, the number of issues and the issues (None if
+                the spec could not be linted), the log output and the time it took.
+        """
+        from stinky.noodle.core import lint_parsed
+
+        start_time = time.perf_counter()
+        messages = []
+        handler_id = logger.add(messages.append, format=OUTPUT_FORMAT, colorize=False)
+        try:
+            results = lint_parsed(
+                self.parser(spec_path),
+                self.plan(),
+                lint_cache_path=self.lint_cache_path,
+            )
+        except Exception as exception:
+            logger.error(f"Unable to lint {spec_path}: {exception}")
+            results = None
+        finally:
+            logger.remove(handler_id)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        return {
+            "path": str(spec_path),
+            "fail_count": None if results is None else len(results),
+            "results": None if results is None else [r._asdict() for r in results],
+            "output": "".join(messages),
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Handle a single request.
+
+        Args:
+            request (Dict[str, Any]): The request.
+
+        Yields:
+            Iterator[Dict[str, Any]]: The responses.
+        """
+        from stinky.noodle.core import expand_spec_paths
+
+        command = request.get("command")
+        if command in ("ping", "shutdown"):
+            yield {"ok": True, "pid": os.getpid()}
+        elif command == "lint":
+            total = 0
+            for spec_path in expand_spec_paths(request.get("spec_paths", [])):
+                result = self.lint(spec_path)
+                logger.info(
+                    f"Linted {spec_path} in {result['elapsed_ms']:.1f} ms, "
+                    f"{result['fail_count']} issues."
+                )
+                total += 1 if result["fail_count"] is None else result["fail_count"]
+                yield result
+            yield {"done": True, "fail_count": total}
+        else:
+            yield {"error": f"Unknown command {command!r}."}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                responses = self.server.lint_daemon.handle(request)
+            except ValueError as exception:
+                request, responses = {}, [{"error": f"Invalid request: {exception}"}]
+            for response in responses:
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+                self.wfile.flush()
+            if request.get("command") == "shutdown":
+                # shutdown() waits for serve_forever(), which runs this handler
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+class LintServer(socketserver.UnixStreamServer):
+    """Unix socket server handing the requests of one client at a time to a daemon."""
+
+    def __init__(self, socket_path: Path, lint_daemon: LintDaemon):
+        self.lint_daemon = lint_daemon
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            try:
+                with socket.socket(socket.AF_UNIX) as probe:
+                    probe.connect(str(socket_path))
+            except OSError:
+                socket_path.unlink()  # left behind by a daemon that crashed
+            else:
+                raise RuntimeError(f"A daemon is already listening on {socket_path}.")
+        super().__init__(str(socket_path), _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def send_request(
+    socket_path: Path, request: Dict[str, Any], timeout: Optional[float] = None
+) -> Iterator[Dict[str, Any]]:
+    """Send a request to the daemon and stream its responses.
+
+    Args:
+        socket_path (Path): The daemon socket.
+        request (Dict[str, Any]): The request.
+        timeout (Optional[float], optional): Socket timeout in seconds.
+            Defaults to None.
+
+    Yields:
+        Iterator[Dict[str, Any]]: The responses, as they arrive.
+    """
+    with socket.socket(socket.AF_UNIX) as client:
+        client.settimeout(timeout)
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(request).encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as responses:
+            for line in responses:
+                yield json.loads(line)
+
+
+def lint_remote(
+    socket_path: Path, spec_paths: Iterable[str], reporter: Optional[Reporter] = None
+) -> int:
+    """Lint specs with the daemon, writing their log output to stderr.
+
+    Args:
+        socket_path (Path): The daemon socket.
+        spec_paths (Iterable[str]): Paths or glob patterns of the spec files.
+        reporter (Optional[Reporter], optional): Receives the results, a
+            `TextReporter` that is closed at the end if None. Defaults to None.
+
+    Returns:
+        int: The number of issues, specs that could not be linted count as one.
+    """
+    close = reporter is None
+    reporter = reporter if reporter is not None else TextReporter()
+    request = {
+        "command": "lint",
+        "spec_paths": [os.path.abspath(path) for path in spec_paths],
+    }
+    fail_count = 0
+    for response in send_request(socket_path, request):
+        if "error" in response:
+            logger.error(response["error"])
+            return 1
+        if response.get("done"):
+            fail_count = response["fail_count"]
+            continue
+        sys.stderr.write(response["output"])
+        spec_path = Path(response["path"])
+        results = response["results"]
+        if results is not None:
+            results = [LintResult(**result) for result in results]
+            for result in results:
+                reporter.result(spec_path, result)
+        reporter.file(spec_path, results)
+        logger.info(f"{spec_path}: linted in {response['elapsed_ms']:.1f} ms.")
+    if close:
+        reporter.close()
+    return fail_count
+
+
+def changed_paths(
+    paths: Iterable[Path], stamps: Dict[Path, Optional[Tuple[int, int]]]
+) -> List[Path]:
+    """Find the files that changed since the last call, and update their stamps.
+
+    Args:
+        paths (Iterable[Path]): The watched files.
+        stamps (Dict[Path, Optional[Tuple[int, int]]]): Stamps seen so far.
+
+    Returns:
+        List[Path]: The files that are new or were modified; deleted files are
+            not returned.
+    """
+    changed = []
+    for path in paths:
+        stamp = file_stamp(path)
+        if stamp != stamps.get(path):
+            stamps[path] = stamp
+            if stamp is not None:
+                changed.append(path)
+    return changed
+
+
+def watch(socket_path: Path, spec_paths: List[str], interval: float = 0.2):
+    """Lint the specs, then re-lint every spec that changes until interrupted.
+
+    Files are polled by modification time and size, which works the same on
+    every platform and for editors that save by replacing the file.
+
+    Args:
+        socket_path (Path): The daemon socket.
+        spec_paths (List[str]): Paths or glob patterns of the spec files.
+        interval (float, optional): Seconds between polls. Defaults to 0.2.
+    """
+    import glob
+
+    paths = []
+    for pattern in spec_paths:
+        matched = (
+            glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        )
+        paths.extend(Path(path).absolute() for path in sorted(matched))
+    paths = list(dict.fromkeys(paths))
+
+    stamps = {}
+    logger.info(f"Watching {len(paths)} files, press Ctrl+C to stop.")
+    try:
+        while True:
+            changed = changed_paths(paths, stamps)
+            if changed:
+                lint_remote(socket_path, [str(path) for path in changed])
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def entrypoint(command: str, argv: List[str]):
+    """CLI entrypoint of `noodle serve` and `noodle client`.
+
+    Args:
+        command (str): Either "serve" or "client".
+        argv (List[str]): The remaining command line arguments.
+    """
+    parser = argparse.ArgumentParser(prog=f"noodle {command}")
+    parser.add_argument(
+        "--socket",
+        help="Path of the daemon's Unix socket",
+        dest="socket_path",
+        required=False,
+        default=str(default_socket_path()),
+    )
+
+    if command == "serve":
+        parser.add_argument(
+            "-c",
+            "--ruleset-path",
+            help="Path to the ruleset file",
+            dest="ruleset_path",
+            required=True,
+            default=None,
+        )
+        parser.add_argument(
+            "-f",
+            "--custom-callables-module",
+            help="The custom callables module",
+            dest="callables_module",
+            required=False,
+            default=None,
+        )
+        parser.add_argument(
+            "-d",
+            "--custom-callables-dir",
+            help="The path that contains the module to be imported",
+            dest="callables_dir",
+            required=False,
+            default=None,
+        )
+        parser.add_argument(
+            "-a",
+            "--custom-functions-attr-name",
+            help="The name of the attribute within the custom functions module",
+            dest="functions_attr_name",
+            required=False,
+            default="custom_callables",
+        )
+        parser.add_argument(
+            "--cache-dir",
+            help="Directory to cache parsed specs and rulesets in, keyed by their content hash",
+            dest="cache_dir",
+            required=False,
+            default=None,
+        )
+        parser.add_argument(
+            "--lint-cache",
+            help="Path to a sqlite file storing check results per rule and matched subtree",
+            dest="lint_cache_path",
+            required=False,
+            default=None,
+        )
+        parser.add_argument(
+            "--resolve-refs",
+            help="Resolve internal and local-file $refs before linting",
+            dest="resolve_refs",
+            action="store_true",
+            default=False,
+        )
+        args = parser.parse_args(argv)
+        lint_daemon = LintDaemon(
+            Path(args.ruleset_path),
+            callables_module=args.callables_module,
+            callables_dir=args.callables_dir,
+            functions_attr_name=args.functions_attr_name,
+            cache_dir=args.cache_dir,
+            lint_cache_path=args.lint_cache_path,
+            resolve_refs=args.resolve_refs,
+        )
+        with LintServer(Path(args.socket_path), lint_daemon) as server:
+            logger.info(f"Listening on {args.socket_path}.")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return
+
+    parser.add_argument(
+        "spec_paths",
+        help="Paths or glob patterns of the spec files",
+        nargs="*",
+        default=[],
+    )
+    parser.add_argument(
+        "--watch",
+        help="Keep running and re-lint every spec file that changes",
+        dest="watch",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--interval",
+        help="Seconds between polls of the watched files",
+        dest="interval",
+        type=float,
+        required=False,
+        default=0.2,
+    )
+    parser.add_argument(
+        "--format",
+        help="Output format of the results: a text summary on stderr, or json, ndjson (streamed) or sarif on stdout",
+        dest="output_format",
+        choices=sorted(REPORTERS),
+        required=False,
+        default="text",
+    )
+    parser.add_argument(
+        "--stop",
+        help="Stop the daemon",
+        dest="stop",
+        action="store_true",
+        default=False,
+    )
+    args = parser.parse_args(argv)
+    socket_path = Path(args.socket_path)
+    if args.stop:
+        for _ in send_request(socket_path, {"command": "shutdown"}):
+            pass
+        return
+    if not args.spec_paths:
+        parser.error("the following arguments are required: spec_paths")
+    if args.watch:
+        return watch(socket_path, args.spec_paths, interval=args.interval)
+    reporter = REPORTERS[args.output_format]()
+    fail_count = lint_remote(socket_path, args.spec_paths, reporter=reporter)
+    reporter.close()
+    if fail_count != 0:
+        sys.exit(1)
@@ -1,6 +1,3 @@
-from convert_case import snake_case
-
-
 def sanitize_callable_name(name: str, custom: bool = False) -> str:
     """Sanitzation for the JS callable name.
 
@@ -11,5 +8,7 @@ def sanitize_callable_name(name: str, custom: bool = False) -> str:
     Returns:
         str: sanitzed python compatible callable name
     """
+    from convert_case import snake_case
+
     prefix = "" if custom else "builtin_"
     return f"{prefix}{snake_case(name)}"
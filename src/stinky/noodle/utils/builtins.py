@@ -1,14 +1,12 @@
+import hashlib
+import json
 import re
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from jsonschema.validators import (
-    Draft3Validator,
-    Draft4Validator,
-    Draft6Validator,
-    Draft7Validator,
-    Draft201909Validator,
-    Draft202012Validator,
-)
+from stinky.noodle.utils.cache import LRUCache
+from stinky.noodle.utils.parser import Parser, escape_pointer_token
 
 FALSY = (False, "", 0, None)
 CASE_PATTERNS = {
@@ -22,16 +20,541 @@ CASE_PATTERNS = {
     "flat": ("^{0:s}[a-z{1:s}]+$", ""),
 }
 
+# Names of the validator classes in `jsonschema.validators`. jsonschema is slow
+# to import, so it is only imported once a schema is first validated.
 JSON_SCHEMA_VALIDATORS = {
-    "draft3": Draft3Validator,
-    "draft4": Draft4Validator,
-    "draft6": Draft6Validator,
-    "draft7": Draft7Validator,
-    "draft201909": Draft201909Validator,
-    "draft202012": Draft202012Validator,
+    "draft3": "Draft3Validator",
+    "draft4": "Draft4Validator",
+    "draft6": "Draft6Validator",
+    "draft7": "Draft7Validator",
+    "draft201909": "Draft201909Validator",
+    "draft202012": "Draft202012Validator",
 }
 
 
+class ValidatorRegistry:
+    """Registry of compiled json schema validators.
+
+    Validators are keyed by dialect and a canonical hash of the schema, so the
+    schema is checked and its validator built once, however many objects are
+    validated against it. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.cache = LRUCache(maxsize=maxsize)
+
+    @staticmethod
+    def schema_hash(schema: Dict) -> str:
+        """Hash a schema independently of its key order.
+
+        Args:
+            schema (Dict): The json schema
+
+        Returns:
+            str: sha256 hex digest of the canonical json representation
+        """
+        canonical = json.dumps(
+            schema, sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get_validator(self, schema: Dict, dialect: str) -> Any:
+        """Get the (cached) validator for `schema` in `dialect`.
+
+        Args:
+            schema (Dict): The json schema
+            dialect (str): the json schema dialect
+
+        Raises:
+            ValueError: Raised of the json schema `dialect` is invalid
+            jsonschema.exceptions.SchemaError: Raised when `schema` is not valid
+                for `dialect`
+
+        Returns:
+            Any: The jsonschema validator instance
+        """
+        try:
+            validator_name = JSON_SCHEMA_VALIDATORS[dialect]
+        except KeyError:
+            raise ValueError(
+                f"Dialect {dialect} is not valid, choose one of ({', '.join(JSON_SCHEMA_VALIDATORS)})"
+            )
+        from jsonschema import validators
+
+        validator_cls = getattr(validators, validator_name)
+
+        def build():
+            validator_cls.check_schema(schema)
+            return validator_cls(schema=schema)
+
+        return self.cache.get_or_create((dialect, self.schema_hash(schema)), build)
+
+
+VALIDATOR_REGISTRY = ValidatorRegistry()
+
+
+class Checker(ABC):
+    """A builtin, prepared for a single `then` clause.
+
+    Builtins are executed in two phases: the checker is constructed once per
+    `then` clause with its `functionOptions` (compiling regexes, building sets,
+    looking up validators), and is then called with every matched object.
+
+    `cacheable` tells the lint cache whether storing results is worth it: for
+    cheap checks hashing the matched object costs more than checking it.
+
+    Matches are checked in batches with `check_many`, which checkers override
+    to do the work in bulk. `uses_paths` tells the enforcer to pass the keys
+    leading to every object along, which only checkers that need them ask for;
+    those get all matches of a clause in one call. Checkers that find several problems inside one object
+    (e.g. every unused object of `components.schemas`) override `locate`, so
+    each is reported at its own path.
+    """
+
+    cacheable = False
+    uses_paths = False
+
+    @abstractmethod
+    def __call__(self, obj: Any) -> Any:
+        """Check a single matched object.
+
+        Args:
+            obj (Any): The matched object.
+
+        Returns:
+            Any: Either a boolean, or a list of errors, see `passed`.
+        """
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        """Check all matched objects of a clause.
+
+        Args:
+            objs (List[Any]): The matched objects.
+            paths (Optional[List[Optional[Tuple]]], optional): The keys leading
+                to every object, None where unknown. Only passed to checkers
+                that set `uses_paths`. Defaults to None.
+
+        Returns:
+            List[bool]: Whether each object passed.
+        """
+        return [passed(self(obj)) for obj in objs]
+
+    def locate(self, obj: Any) -> Optional[List[Tuple]]:
+        """Find the offending parts of an object that did not pass.
+
+        Args:
+            obj (Any): The matched object.
+
+        Returns:
+            Optional[List[Tuple]]: The keys below `obj` leading to every offending
+                part, or None to report `obj` itself.
+        """
+        return None
+
+    def bind(self, parser: Parser) -> "Checker":
+        """Get the checker to use for a single spec.
+
+        Checkers that look beyond the matched object (e.g. at the references
+        in the whole document) override this to get at the spec.
+
+        Args:
+            parser (Parser): Parser of the spec being linted.
+
+        Returns:
+            Checker: The checker for that spec.
+        """
+        return self
+
+
+class CallableAdapter(Checker):
+    """Checker for plain callables that take `obj` and the options as kwargs."""
+
+    cacheable = True
+
+    def __init__(self, func: Callable, **options):
+        self.func = func
+        self.options = options
+
+    def __call__(self, obj: Any) -> Any:
+        return self.func(obj=obj, **self.options)
+
+
+class BatchCallableAdapter(Checker):
+    """Checker for plain callables that take all matches at once.
+
+    Such callables set a truthy `batched` attribute and are called as
+    `func(matches=[(path, obj), ...], **options)`, where every path is the
+    tuple of keys leading to `obj` (None where unknown, see
+    `stinky.noodle.utils.parser.format_path`). They return a result per match,
+    in order, each a boolean or a list of errors.
+
+    Their results are not cached: they may depend on the paths, or on the other
+    matches, while the lint cache only knows the matched subtree.
+    """
+
+    uses_paths = True
+
+    def __init__(self, func: Callable, **options):
+        self.func = func
+        self.options = options
+
+    def __call__(self, obj: Any) -> Any:
+        return self.func(matches=[(None, obj)], **self.options)[0]
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        if paths is None:
+            paths = [None] * len(objs)
+        results = self.func(matches=list(zip(paths, objs)), **self.options)
+        if len(results) != len(objs):
+            raise ValueError(
+                f"{getattr(self.func, '__name__', self.func)} returned {len(results)} "
+                f"results for {len(objs)} matches."
+            )
+        return [passed(result) for result in results]
+
+
+def prepare(func: Callable, options: Optional[Dict] = None) -> Checker:
+    """Prepare a builtin or custom callable for a `then` clause.
+
+    Callables with a `prepare` attribute (all builtins, or custom callables
+    that opt in) are prepared by it, all others are wrapped in an adapter:
+    callables with a truthy `batched` attribute are called once with all
+    matches, the rest once per match.
+
+    Args:
+        func (Callable): The builtin or custom callable.
+        options (Optional[Dict], optional): The `functionOptions`. Defaults to None.
+
+    Returns:
+        Checker: Callable that verifies a single matched object.
+    """
+    options = options or {}
+    preparer = getattr(func, "prepare", None)
+    if preparer is not None:
+        return preparer(**options)
+    if getattr(func, "batched", False):
+        return BatchCallableAdapter(func, **options)
+    return CallableAdapter(func, **options)
+
+
+def passed(result: Any) -> bool:
+    """Interpret a checker result.
+
+    Args:
+        result (Any): Either a boolean, or a list of errors (like `builtin_schema`).
+
+    Returns:
+        bool: Whether the check passed.
+    """
+    if isinstance(result, list):
+        return not result
+    return bool(result)
+
+
+def _prepared_by(checker_cls: Callable[..., Checker]) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        func.prepare = checker_cls
+        return func
+
+    return decorator
+
+
+def _check_unique(
+    check_all: Callable[[List[Any]], List[bool]], objs: List[Any]
+) -> List[bool]:
+    # property names, tags, etc. repeat a lot across a spec, check each value once
+    try:
+        unique = list(dict.fromkeys(objs))
+    except TypeError:  # unhashable objects
+        return check_all(objs)
+    if len(unique) == len(objs):
+        return check_all(objs)
+    return list(map(dict(zip(unique, check_all(unique))).__getitem__, objs))
+
+
+def _require_defined(objs: List[Any]):
+    if any(obj is None for obj in objs):
+        raise ValueError("obj cannot have value None")
+
+
+def _is_sorted(items: Iterable) -> bool:
+    items = list(items)
+    return all(a <= b for a, b in zip(items, islice(items, 1, None)))
+
+
+class AlphabeticalChecker(Checker):
+    def __init__(self, keyed_by: Optional[str] = None):
+        self.keyed_by = keyed_by
+
+    def __call__(self, obj: Any) -> bool:
+        if obj is None:
+            raise ValueError("obj cannot have value None")
+
+        if self.keyed_by is not None:
+            return _is_sorted(item[self.keyed_by] for item in obj)
+        return _is_sorted(obj)
+
+
+class EnumerationChecker(Checker):
+    def __init__(self, values: Union[Set, List, Tuple], **kwargs):
+        self.values = tuple(values)
+        try:
+            self.allowed = frozenset(self.values)
+        except TypeError:
+            self.allowed = None
+
+    def __call__(self, obj: Any) -> bool:
+        if obj is None:
+            raise ValueError("obj cannot have value None")
+
+        if self.allowed is not None:
+            try:
+                return obj in self.allowed
+            except TypeError:
+                pass
+        return obj in self.values
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        _require_defined(objs)
+        if self.allowed is not None:
+            try:
+                return list(map(self.allowed.__contains__, objs))
+            except TypeError:  # unhashable objects
+                pass
+        return [self(obj) for obj in objs]
+
+
+class FalsyChecker(Checker):
+    def __init__(self, **kwargs):
+        pass
+
+    def __call__(self, obj: Any) -> bool:
+        return obj in FALSY
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        return [obj in FALSY for obj in objs]
+
+
+class TruthyChecker(FalsyChecker):
+    def __call__(self, obj: Any) -> bool:
+        return obj not in FALSY
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        return [obj not in FALSY for obj in objs]
+
+
+class UndefinedChecker(Checker):
+    def __call__(self, obj: Any) -> bool:
+        return obj is None
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        return [obj is None for obj in objs]
+
+
+class DefinedChecker(Checker):
+    def __call__(self, obj: Any) -> bool:
+        return obj is not None
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        return [obj is not None for obj in objs]
+
+
+class LengthChecker(Checker):
+    def __init__(self, min: int, max: int):
+        self.min = min
+        self.max = max
+
+    def __call__(self, obj: Any) -> bool:
+        if obj is None:
+            raise ValueError("obj cannot have value None")
+
+        return self.min <= len(obj) < self.max
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        _require_defined(objs)
+        low, high = self.min, self.max
+        return [low <= length < high for length in map(len, objs)]
+
+
+class PatternChecker(Checker):
+    def __init__(self, match: Optional[str] = None, not_match: Optional[str] = None):
+        self.match = None if match is None else re.compile(match)
+        self.not_match = None if not_match is None else re.compile(not_match)
+
+    def __call__(self, obj: str) -> bool:
+        if obj is None:
+            raise ValueError("obj cannot have value None")
+
+        if self.match is not None and self.match.match(obj) is None:
+            return False
+        if self.not_match is not None and self.not_match.match(obj) is not None:
+            return False
+        return True
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        _require_defined(objs)
+        return _check_unique(self._check_all, objs)
+
+    def _check_all(self, objs: List[str]) -> List[bool]:
+        results = [True] * len(objs)
+        if self.match is not None:
+            results = [found is not None for found in map(self.match.match, objs)]
+        if self.not_match is not None:
+            results = [
+                result and found is None
+                for result, found in zip(results, map(self.not_match.match, objs))
+            ]
+        return results
+
+
+class CasingChecker(Checker):
+    DIGITS = re.compile(r"[0-9]")
+
+    def __init__(
+        self,
+        type: str,
+        disallow_digits: Optional[bool] = False,
+        separator: Optional[Dict] = None,
+    ):
+        try:
+            patt, sep = CASE_PATTERNS[type]
+        except KeyError:
+            raise ValueError(f"Case type {type} is not recognized.")
+
+        leading_sep = ""
+        if separator is not None:
+            sep = re.escape(separator.get("char", sep))
+            leading = separator.get("allow_leading", False)
+            if leading:
+                leading_sep = sep
+
+        self.disallow_digits = disallow_digits
+        self.pattern = re.compile(patt.format(leading_sep, sep))
+
+    def __call__(self, obj: str) -> bool:
+        if obj is None:
+            raise ValueError("obj cannot have value None")
+
+        if self.disallow_digits and self.DIGITS.match(obj):
+            return False
+        return self.pattern.match(obj) is not None
+
+    def check_many(
+        self, objs: List[Any], paths: Optional[List[Optional[Tuple]]] = None
+    ) -> List[bool]:
+        _require_defined(objs)
+        return _check_unique(self._check_all, objs)
+
+    def _check_all(self, objs: List[str]) -> List[bool]:
+        results = [found is not None for found in map(self.pattern.match, objs)]
+        if self.disallow_digits:
+            results = [
+                result and found is None
+                for result, found in zip(results, map(self.DIGITS.match, objs))
+            ]
+        return results
+
+
+class SchemaChecker(Checker):
+    cacheable = True
+
+    def __init__(self, schema: Dict, dialect: str, all_errors: Optional[bool] = False):
+        self.schema = schema
+        self.dialect = dialect
+        self.all_errors = all_errors
+        self.validator = VALIDATOR_REGISTRY.get_validator(
+            schema=schema, dialect=dialect
+        )
+
+    def __getstate__(self) -> Dict:
+        # validators are looked up again after unpickling instead of being pickled
+        state = self.__dict__.copy()
+        del state["validator"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self.validator = VALIDATOR_REGISTRY.get_validator(
+            schema=self.schema, dialect=self.dialect
+        )
+
+    def __call__(self, obj: Any) -> List[str]:
+        if obj is None:
+            raise ValueError("obj cannot have value None")
+
+        errors = sorted(self.validator.iter_errors(obj), key=lambda e: e.path)
+        out = []
+        for error in errors:
+            temp = []
+            for suberror in sorted(error.context, key=lambda e: e.schema_path):
+                temp += [list(suberror.schema_path), suberror.message]
+                if not self.all_errors:
+                    break
+            out += [temp]
+        return out
+
+
+class XorChecker(Checker):
+    def __init__(self, properties: List[str]):
+        self.properties = properties
+
+    def __call__(self, obj: Any) -> bool:
+        return sum(obj.get(prop) is not None for prop in self.properties) == 1
+
+
+class UnreferencedReusableObjectChecker(Checker):
+    def __init__(self, reusable_objects_location: str, reference_index: Any = None):
+        self.reusable_objects_location = reusable_objects_location.rstrip("/")
+        self.reference_index = reference_index
+
+    def bind(self, parser: Parser) -> Checker:
+        return UnreferencedReusableObjectChecker(
+            self.reusable_objects_location, parser.reference_index()
+        )
+
+    def _unreferenced(self, obj: Any) -> List[Tuple[str, str]]:
+        if self.reference_index is None:
+            raise ValueError("The checker is not bound to a spec.")
+        if not isinstance(obj, dict):
+            return []
+        pointers = (
+            (key, f"{self.reusable_objects_location}/{escape_pointer_token(key)}")
+            for key in obj
+        )
+        return [
+            (key, pointer)
+            for key, pointer in pointers
+            if not self.reference_index.is_referenced(pointer)
+        ]
+
+    def __call__(self, obj: Any) -> List[str]:
+        return [
+            f"{pointer} is not referenced." for _, pointer in self._unreferenced(obj)
+        ]
+
+    def locate(self, obj: Any) -> Optional[List[Tuple]]:
+        return [(key,) for key, _ in self._unreferenced(obj)]
+
+
+@_prepared_by(AlphabeticalChecker)
 def builtin_alphabetical(obj: Any, keyed_by: Optional[str] = None) -> bool:
     """Check if obj is sorted, optionally by key
 
@@ -45,15 +568,10 @@ def builtin_alphabetical(obj: Any, keyed_by: Optional[str] = None) -> bool:
     Returns:
         bool: Indicates whether `obj` is sorted alphabetically or not.
     """
-    if obj is None:
-        raise ValueError("obj cannot have value None")
-
-    if keyed_by is not None:
-        return sorted(obj, key=lambda obj: obj[keyed_by]) == obj
-
-    return sorted(obj) == obj
+    return AlphabeticalChecker(keyed_by=keyed_by)(obj)
 
 
+@_prepared_by(EnumerationChecker)
 def builtin_enumeration(obj: Any, values: Union[Set, List, Tuple], **kwargs) -> bool:
     """Check for presence in predefined list.
 
@@ -63,12 +581,10 @@ def builtin_enumeration(obj: Any, values: Union[Set, List, Tuple], **kwargs) ->
     Returns:
         bool: Indicates wheter `obj` is equal to one of `values`.
     """
-    if obj is None:
-        raise ValueError("obj cannot have value None")
-
-    return obj in values
+    return EnumerationChecker(values=values)(obj)
 
 
+@_prepared_by(FalsyChecker)
 def builtin_falsy(obj: Any, **kwargs) -> bool:
     """Check for falsiness
 
@@ -81,6 +597,7 @@ def builtin_falsy(obj: Any, **kwargs) -> bool:
     return obj in FALSY
 
 
+@_prepared_by(LengthChecker)
 def builtin_length(obj: Any, min: int, max: int) -> bool:
     """Check min-max bounds of obj
 
@@ -95,12 +612,10 @@ def builtin_length(obj: Any, min: int, max: int) -> bool:
     Returns:
         bool: Whether `obj` is within the required bounds (`min` <= `obj` < `max`)
     """
-    if obj is None:
-        raise ValueError("obj cannot have value None")
-
-    return min <= len(obj) < max
+    return LengthChecker(min=min, max=max)(obj)
 
 
+@_prepared_by(PatternChecker)
 def builtin_pattern(
     obj: str, match: Optional[str] = None, not_match: Optional[str] = None
 ) -> bool:
@@ -117,17 +632,10 @@ def builtin_pattern(
         bool: Whether we matched what was specified in `match` or
             we didn't match what was in `not_match`.
     """
-    if obj is None:
-        raise ValueError("obj cannot have value None")
-
-    cond = True
-    if match is not None:
-        cond &= re.match(match, obj) is not None
-    if not_match is not None:
-        cond &= not (re.match(not_match, obj) is not None)
-    return cond
+    return PatternChecker(match=match, not_match=not_match)(obj)
 
 
+@_prepared_by(CasingChecker)
 def builtin_casing(
     obj: str,
     type: str,
@@ -144,29 +652,13 @@ def builtin_casing(
         separator (Optional[Dict], optional): a dict containing
             char (str) and allow_leading (bool). Defaults to None.
     """
-
-    if obj is None:
-        raise ValueError("obj cannot have value None")
-
-    if disallow_digits and re.match(r"[0-9]", obj):
-        return False
-
-    try:
-        patt, sep = CASE_PATTERNS[type]
-    except KeyError:
-        raise ValueError(f"Case type {type} is not recognized.")
-
-    leading_sep = ""
-    if separator is not None:
-        sep = re.escape(separator.get("char", sep))
-        leading = separator.get("allow_leading", False)
-        if leading:
-            leading_sep = sep
-
-    patt = patt.format(leading_sep, sep)
-    return re.match(patt, obj) is not None
+    checker = CasingChecker(
+        type=type, disallow_digits=disallow_digits, separator=separator
+    )
+    return checker(obj)
 
 
+@_prepared_by(SchemaChecker)
 def builtin_schema(
     obj: Any, schema: Dict, dialect: str, all_errors: Optional[bool] = False
 ) -> List[str]:
@@ -186,28 +678,10 @@ def builtin_schema(
     Returns:
         List[str]: Nested list of json schema validation errors
     """
-    if obj is None:
-        raise ValueError("obj cannot have value None")
-
-    try:
-        validator_cls = JSON_SCHEMA_VALIDATORS[dialect]
-    except KeyError:
-        raise ValueError(
-            f"Dialect {dialect} is not valid, choose one of ({', '.join(JSON_SCHEMA_VALIDATORS)})"
-        )
-    validator = validator_cls(schema=schema)
-    errors = sorted(validator.iter_errors(obj), key=lambda e: e.path)
-    out = []
-    for error in errors:
-        temp = []
-        for suberror in sorted(error.context, key=lambda e: e.schema_path):
-            temp += [list(suberror.schema_path), suberror.message]
-            if not all_errors:
-                break
-        out += [temp]
-    return out
+    return SchemaChecker(schema=schema, dialect=dialect, all_errors=all_errors)(obj)
 
 
+@_prepared_by(TruthyChecker)
 def builtin_truthy(obj: Any, **kwargs) -> bool:  # pragma: no cover
     """Check for non-falsiness
 
@@ -220,6 +694,7 @@ def builtin_truthy(obj: Any, **kwargs) -> bool:  # pragma: no cover
     return not builtin_falsy(obj)
 
 
+@_prepared_by(UndefinedChecker)
 def builtin_undefined(obj: Any) -> bool:  # pragma: no cover
     """Check for None values
 
@@ -232,6 +707,7 @@ def builtin_undefined(obj: Any) -> bool:  # pragma: no cover
     return obj is None
 
 
+@_prepared_by(DefinedChecker)
 def builtin_defined(obj: Any) -> bool:  # pragma: no cover
     """Check for non-None values
 
@@ -244,11 +720,28 @@ def builtin_defined(obj: Any) -> bool:  # pragma: no cover
     return not builtin_undefined(obj)
 
 
-def builtin_unreferenced_reusable_object(obj: Any):  # pragma: no cover
-    # TODO: implementation
-    pass
+@_prepared_by(UnreferencedReusableObjectChecker)
+def builtin_unreferenced_reusable_object(
+    obj: Any, reusable_objects_location: str, document: Any
+) -> List[str]:
+    """Check for reusable objects that are not (transitively) referenced.
+
+    Args:
+        obj (Any): The obj to verify, the mapping of reusable objects.
+        reusable_objects_location (str): JSON pointer of `obj` in the document,
+            e.g. `#/components/schemas`.
+        document (Any): The whole document. When linting, the reference index
+            of the spec is built once and shared instead.
+
+    Returns:
+        List[str]: An error for every unreferenced object, empty if all are used.
+    """
+    return UnreferencedReusableObjectChecker(reusable_objects_location).bind(
+        Parser(specs=document)
+    )(obj)
 
 
+@_prepared_by(XorChecker)
 def builtin_xor(obj: Any, properties: List[str]) -> bool:
     """Check for exclusive-or existence of properties in obj.
 
@@ -259,4 +752,4 @@ def builtin_xor(obj: Any, properties: List[str]) -> bool:
     Returns:
         bool: Whether or not only one of `properties` is defined.
     """
-    return len(builtin_defined(obj.get(prop) for prop in properties)) == 1
+    return XorChecker(properties=properties)(obj)
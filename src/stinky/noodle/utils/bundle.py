@@ -0,0 +1,153 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from stinky.noodle.utils.loader import DocumentCache, load_document
+
+
+def external_refs(document: Any) -> List[str]:
+    """Find the local files a document references.
+
+    Args:
+        document (Any): The parsed document.
+
+    Returns:
+        List[str]: The distinct file parts of `$ref`s, e.g. `./schemas/user.yaml`
+            for `./schemas/user.yaml#/User`, in document order. Internal and
+            remote references are left out.
+    """
+    locations = {}
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                location = ref.partition("#")[0]
+                if location and "://" not in location:
+                    locations.setdefault(location, None)
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return list(locations)
+
+
+def bundle_files(documents: Dict[Path, Any]) -> List[Path]:
+    """Get every file of a bundle, with the referenced files that could not be loaded.
+
+    Args:
+        documents (Dict[Path, Any]): The parsed documents by resolved path, from
+            `BundleLoader.load`.
+
+    Returns:
+        List[Path]: The resolved paths, sorted.
+    """
+    paths = set(documents)
+    for path, document in documents.items():
+        paths.update(
+            (path.parent / location).resolve() for location in external_refs(document)
+        )
+    return sorted(paths)
+
+
+def _load(path: Path, cache: Optional[DocumentCache]) -> Tuple[Any, List[str]]:
+    document = load_document(path, cache=cache)
+    return document, external_refs(document)
+
+
+class BundleLoader:
+    """Loads specs that are split over several files, with every file they reference.
+
+    Referenced files are found by following relative `$ref`s from file to
+    file, and read and parsed in a thread pool. Every file is loaded once per
+    loader, however many references and specs point at it, so a loader should
+    live as long as a run. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache: Optional[DocumentCache] = None,
+    ):
+        """Initialize the loader.
+
+        Args:
+            max_workers (Optional[int], optional): Number of threads reading and
+                parsing files. Defaults to None, `ThreadPoolExecutor`'s default.
+            cache (Optional[DocumentCache], optional): Cache of parsed documents.
+                Defaults to None.
+        """
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="noodle-bundle"
+        )
+        self._futures: Dict[Path, Future] = {}
+        self._lock = threading.Lock()
+
+    def _submit(self, path: Path) -> Future:
+        with self._lock:
+            future = self._futures.get(path)
+            if future is None:
+                future = self._futures[path] = self.executor.submit(
+                    _load, path, self.cache
+                )
+        return future
+
+    def load(
+        self, root_path: Union[str, Path], root: Optional[Any] = None
+    ) -> Dict[Path, Any]:
+        """Load a spec and every file it references, directly or through other files.
+
+        Args:
+            root_path (Union[str, Path]): Path to the spec.
+            root (Optional[Any], optional): The spec, if it is parsed already.
+                Defaults to None.
+
+        Raises:
+            OSError: Raised when the spec cannot be read. Referenced files that
+                cannot be read or parsed are skipped, their references stay
+                unresolved.
+
+        Returns:
+            Dict[Path, Any]: The parsed documents by resolved path, the spec first.
+        """
+        root_path = Path(root_path).resolve()
+        if root is None:
+            root, refs = self._submit(root_path).result()
+        else:
+            refs = external_refs(root)
+        documents = {root_path: root}
+        pending: Dict[Future, Path] = {}
+
+        def follow(source: Path, locations: List[str]):
+            for location in locations:
+                path = (source.parent / location).resolve()
+                if path not in documents and path not in pending.values():
+                    pending[self._submit(path)] = path
+
+        follow(root_path, refs)
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    document, refs = future.result()
+                except Exception as exception:
+                    # the resolver warns about the references it cannot resolve
+                    logger.debug(f"Unable to load {path}: {exception}")
+                    continue
+                documents[path] = document
+                follow(path, refs)
+        return documents
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self) -> "BundleLoader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,11 +1,26 @@
-from typing import Callable, List, Optional
+import functools
+import multiprocessing
+import multiprocessing.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from loguru import logger
 
-from stinky.noodle.utils import builtins, sanitize_callable_name
-from stinky.noodle.utils.exceptions import NonExistentCallableError
-from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils import builtins
+from stinky.noodle.utils.lint_cache import LintCache
+from stinky.noodle.utils.parser import Match, Parser, format_path, format_pointer
+from stinky.noodle.utils.plan import (
+    CompiledClause,
+    ExecutionPlan,
+    compile_ruleset,
+    resolve_callable,
+)
+from stinky.noodle.utils.profiler import Profiler
+from stinky.noodle.utils.reporters import LintResult
 from stinky.noodle.utils.ruleset import RuleSetModel
+from stinky.noodle.utils.scheduler import CostHistory, CostModel
 
 
 class RuleEnforcer:
@@ -13,11 +28,41 @@ class RuleEnforcer:
         self,
         ruleset_instance: RuleSetModel,
         spec_parser_instance: Parser,
-        custom_callables: Optional[List[Callable]] = [],
+        custom_callables: Optional[Dict[str, Callable]] = None,
+        plan: Optional[ExecutionPlan] = None,
+        jobs: int = 1,
+        lint_cache: Optional[LintCache] = None,
+        profiler: Optional[Profiler] = None,
+        fail_fast: bool = False,
     ):
-        self.custom_callables = custom_callables
+        """Initialize the rule enforcer.
+
+        Args:
+            ruleset_instance (RuleSetModel): The ruleset.
+            spec_parser_instance (Parser): Parser of the specs to lint.
+            custom_callables (Optional[Dict[str, Callable]], optional): Custom
+                callable names mapped to callables. Defaults to None.
+            plan (Optional[ExecutionPlan], optional): A precompiled execution plan.
+                Defaults to None.
+            jobs (int, optional): Number of worker processes to spread the rules
+                over, 0 for one per CPU. Defaults to 1.
+            lint_cache (Optional[LintCache], optional): Persistent store of check
+                results to reuse for unchanged subtrees. Defaults to None.
+            profiler (Optional[Profiler], optional): Collects the time spent per
+                given path, rule and function. Profiled runs evaluate the rules
+                serially. Defaults to None.
+            fail_fast (bool, optional): Stop at the first clause of severity
+                error that fails. Groups with error clauses are checked first,
+                cheapest first, in this process. Defaults to False.
+        """
+        self.fail_fast = fail_fast
+        self.lint_cache = lint_cache
+        self.profiler = profiler
+        self.jobs = jobs if jobs > 0 else os.cpu_count() or 1
+        self.custom_callables = custom_callables if custom_callables is not None else {}
         self.ruleset_instance = ruleset_instance
         self.spec_parser_instance = spec_parser_instance
+        self.plan = plan
 
     def get_callable(self, callable_name: str) -> Callable:
         """Get callable by string name.
@@ -28,61 +73,570 @@ class RuleEnforcer:
         Returns:
             Callable: The callable.
         """
-        sanitized_callable_name = sanitize_callable_name(callable_name)
-        try:
-            callable = getattr(builtins, sanitized_callable_name)
-            return callable
-        except AttributeError:
-            logger.debug(
-                f"Callabel with name: {callable_name} is not a built-in. Trying custom callables."
-            )
+        return resolve_callable(callable_name, self.custom_callables)
+
+    def compile(self) -> ExecutionPlan:
+        """Compile the ruleset and custom callables into an execution plan, once.
+
+        Returns:
+            ExecutionPlan: The (cached) execution plan.
+        """
+        if self.plan is None:
+            self.plan = compile_ruleset(self.ruleset_instance, self.custom_callables)
+        return self.plan
+
+    def enforce(
+        self, on_result: Optional[Callable[[LintResult], None]] = None
+    ) -> List[LintResult]:
+        """Lint the specs with the ruleset.
+
+        Given path groups are scheduled by their estimated cost, from the
+        timings of earlier runs kept in the lint cache (see `CostModel`).
+        Results are reported in plan order however they were scheduled.
 
-        sanitized_callable_name = sanitize_callable_name(callable_name, custom=True)
-        try:
-            callable = self.custom_callables[sanitized_callable_name]
-        except KeyError:
-            logger.debug(
-                f'Callabel with name: "{callable_name}" is not a custom callable either.'
+        Args:
+            on_result (Optional[Callable[[LintResult], None]], optional): Called
+                with every result as soon as it is produced. Defaults to None.
+
+        Returns:
+            List[LintResult]: The issues found.
+        """
+        results = []
+        plan = self.compile()
+        logger.debug(
+            f"Evaluating {len(plan.groups)} distinct given paths for {plan.given_count} "
+            f"rule givens, saved {plan.saved_evaluations} evaluations."
+        )
+        costs: CostHistory = {}
+        cost_model = CostModel(
+            self.lint_cache.load_costs() if self.lint_cache is not None else None
+        )
+        if self.profiler is not None:
+            evaluate = functools.partial(
+                _evaluate_groups_profiled,
+                self.spec_parser_instance,
+                plan,
+                profiler=self.profiler,
+                lint_cache=self.lint_cache,
+            )
+        else:
+            evaluate = functools.partial(
+                _evaluate_groups,
+                self.spec_parser_instance,
+                plan,
+                lint_cache=self.lint_cache,
+                costs=costs,
             )
-            raise NonExistentCallableError(
-                f'Callable "{callable_name}" does not exist.'
+        if self.fail_fast:
+            outcomes_by_group = _evaluate_fail_fast(plan, cost_model, evaluate)
+        elif self.profiler is None and self.jobs > 1 and len(plan.groups) > 1:
+            outcomes_by_group = _evaluate_parallel(
+                self.spec_parser_instance,
+                plan,
+                self.jobs,
+                self.lint_cache,
+                cost_model,
+                costs,
             )
+        else:
+            outcomes_by_group = evaluate(range(len(plan.groups)))
+        if self.lint_cache is not None:
+            self.lint_cache.store_costs(costs)
+            logger.info(
+                f"Lint cache: {self.lint_cache.hits} hits, {self.lint_cache.misses} misses."
+            )
+
+        for group_index, outcomes in sorted(
+            outcomes_by_group, key=lambda item: item[0]
+        ):
+            given_path, clauses = plan.groups[group_index]
+            for clause_index, keys in outcomes:
+                clause = clauses[clause_index]
+                result = LintResult(
+                    rule=clause.rule_name,
+                    severity=clause.severity,
+                    message=clause.message,
+                    path=format_path(keys) if keys is not None else given_path,
+                    function=clause.function,
+                    pointer=format_pointer(keys) if keys is not None else None,
+                )
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        return results
+
+
+# (clause index, keys of the checked object), for every object that did not pass
+_Outcomes = List[Tuple[int, Optional[Tuple]]]
 
-        return callable
-
-    def enforce(self):
-        validation_fail_count = 0
-        for rule_name, rule_instance in self.ruleset_instance.rules.items():
-            logger.info(f"Working on rule with name: {rule_name}.")
-            for given_path in rule_instance.given:
-                matches = self.spec_parser_instance.find_objects(given_path)
-                then = rule_instance.then
-                if not isinstance(rule_instance.then, list):
-                    then = [rule_instance.then]
-                for then_case in then:
-                    callable = self.get_callable(then_case.function)
-                    func_ops = then_case.functionOptions
-
-                    for match in matches:
-                        obj = match
-
-                        if then_case.field is not None:
-                            obj = match.get(then_case.field)
-                            result = callable(obj=obj, **func_ops)
-
-                            if not result:
-                                validation_fail_count += 1
-                                logger.error(
-                                    f'Validation on given "{given_path}" with func "{then_case.function}" failed.'
-                                )
-
-                            else:
-                                logger.success(
-                                    f'Validation on given "{given_path}" with func "{then_case.function}" succeeded.'
-                                )
-        if validation_fail_count == 0:
-            logger.success("[Linting finished] Validation succeeded. No issues found.")
-        elif validation_fail_count > 0:
-            logger.error(
-                f"[Linting finished] Validation did not succeed, found {validation_fail_count} issues."
+# Matches of a given path are checked in batches of this size as the walk
+# finds them, so memory stays bounded however many nodes a given (e.g. `$..*`)
+# matches. Checkers that use paths (batched custom callables) may compare the
+# matches with each other, so they get all matches of a clause at once.
+MATCH_BATCH_SIZE = 1000
+
+# Set in each worker process by `_init_worker`, so the parser and plan are
+# shipped once per worker instead of once per task.
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _evaluate_groups(
+    parser: Parser,
+    plan: ExecutionPlan,
+    group_indices: Iterable[int],
+    lint_cache: Optional[LintCache] = None,
+    costs: Optional[CostHistory] = None,
+    fail_fast: bool = False,
+    clause_filter: Optional[Callable[[CompiledClause], bool]] = None,
+) -> List[Tuple[int, _Outcomes]]:
+    """Match and check the given path groups of a plan, in a single walk of the specs.
+
+    Matches are streamed from the walk and checked in batches of
+    `MATCH_BATCH_SIZE` per group; only the objects that did not pass are kept.
+    Clauses whose checker uses paths get all matches of their group in one
+    call once the walk is done.
+
+    Args:
+        parser (Parser): The spec parser.
+        plan (ExecutionPlan): The compiled plan.
+        group_indices (Iterable[int]): Indices into `plan.groups` to evaluate,
+            in the order to check them.
+        lint_cache (Optional[LintCache], optional): Store of earlier results,
+            used for clauses with a cacheable checker. Defaults to None.
+        costs (Optional[CostHistory], optional): Filled with the checked objects
+            and seconds of every clause. Defaults to None.
+        fail_fast (bool, optional): Stop at the first batch in which a clause of
+            severity error fails, without walking the rest of the specs.
+            Defaults to False.
+        clause_filter (Optional[Callable[[CompiledClause], bool]], optional): Only
+            check the clauses it accepts; groups without such clauses are not
+            matched. Defaults to None, every clause.
+
+    Returns:
+        List[Tuple[int, _Outcomes]]: Per evaluated group index, the outcomes of
+            the checked clauses, in clause and document order.
+    """
+    selected = _select_clauses(plan, group_indices, clause_filter)
+    group_indices = list(selected)
+    groups = [plan.groups[group_index] for group_index in group_indices]
+    # only the selected clauses are bound, binding may index the whole spec
+    checkers = [
+        [
+            clause.checker.bind(parser) if index in selected[group_index] else None
+            for index, clause in enumerate(clauses)
+        ]
+        for group_index, (_, clauses) in zip(group_indices, groups)
+    ]
+    # per group, the clauses checked batch by batch and those that get all matches
+    streamed = [
+        [index for index in selected[group_index] if not group[index].uses_paths]
+        for group_index, group in zip(group_indices, checkers)
+    ]
+    whole = [
+        [index for index in selected[group_index] if group[index].uses_paths]
+        for group_index, group in zip(group_indices, checkers)
+    ]
+    buffers: List[List[Match]] = [[] for _ in groups]
+    held: List[List[Match]] = [[] for _ in groups]
+    failures: List[List[_Outcomes]] = [[[] for _ in clauses] for _, clauses in groups]
+
+    def check(position: int, matches: List[Match], clause_indices: List[int]) -> bool:
+        return _check_matches(
+            groups[position],
+            checkers[position],
+            matches,
+            failures[position],
+            lint_cache,
+            costs,
+            fail_fast,
+            clause_indices,
+        )
+
+    stopped = False
+    walk = parser.iter_matches_many([given_path for given_path, _ in groups])
+    for position, match in walk:
+        if whole[position]:
+            held[position].append(match)
+        if not streamed[position]:
+            continue
+        buffer = buffers[position]
+        buffer.append(match)
+        if len(buffer) >= MATCH_BATCH_SIZE:
+            buffers[position] = []
+            if check(position, buffer, streamed[position]):
+                stopped = True
+                walk.close()
+                break
+    for position in range(len(groups)):
+        if stopped:
+            break
+        if buffers[position]:
+            stopped = check(position, buffers[position], streamed[position])
+        if held[position] and not stopped:
+            stopped = check(position, held[position], whole[position])
+
+    return [
+        (group_index, [outcome for outcomes in group_failures for outcome in outcomes])
+        for group_index, group_failures in zip(group_indices, failures)
+    ]
+
+
+def _check_matches(
+    group: Tuple[str, Tuple[CompiledClause, ...]],
+    checkers: List[builtins.Checker],
+    matches: List[Match],
+    failures: List[_Outcomes],
+    lint_cache: Optional[LintCache] = None,
+    costs: Optional[CostHistory] = None,
+    fail_fast: bool = False,
+    clause_indices: Optional[Iterable[int]] = None,
+) -> bool:
+    """Check a batch of matches of a given path group with its clauses.
+
+    Args:
+        group (Tuple[str, Tuple[CompiledClause, ...]]): The given path and clauses.
+        checkers (List[builtins.Checker]): The clauses' checkers, bound to the spec.
+        matches (List[Match]): The matches.
+        failures (List[_Outcomes]): Per clause, extended with the failures.
+        lint_cache (Optional[LintCache], optional): Store of earlier results,
+            used for clauses with a cacheable checker. Defaults to None.
+        costs (Optional[CostHistory], optional): Adds the checked objects and
+            seconds of every clause. Defaults to None.
+        fail_fast (bool, optional): Stop at the first clause of severity error
+            that fails. Defaults to False.
+        clause_indices (Optional[Iterable[int]], optional): The clauses to check,
+            in order. Defaults to None, every clause.
+
+    Returns:
+        bool: Whether a clause of severity error failed, with `fail_fast`.
+    """
+    given_path, clauses = group
+    if clause_indices is None:
+        clause_indices = range(len(clauses))
+    for clause_index in clause_indices:
+        clause, checker = clauses[clause_index], checkers[clause_index]
+        start = time.perf_counter()
+        objs = _clause_objects(clause, matches)
+        paths = _clause_paths(clause, matches) if checker.uses_paths else None
+        if lint_cache is not None and checker.cacheable:
+            results = lint_cache.check(clause.fingerprint, checker, objs, paths)
+        else:
+            results = checker.check_many(objs, paths)
+        if costs is not None:
+            checks, seconds = costs.get((given_path, clause.fingerprint), (0, 0.0))
+            costs[(given_path, clause.fingerprint)] = (
+                checks + len(objs),
+                seconds + time.perf_counter() - start,
             )
+        failed = _outcomes(clause_index, clause, checker, matches, objs, results)
+        failures[clause_index].extend(failed)
+        if fail_fast and failed and clause.severity == "error":
+            return True
+    return False
+
+
+def _is_error(clause: CompiledClause) -> bool:
+    return clause.severity == "error"
+
+
+def _has_error(clauses: Iterable[CompiledClause]) -> bool:
+    return any(_is_error(clause) for clause in clauses)
+
+
+def _select_clauses(
+    plan: ExecutionPlan,
+    group_indices: Iterable[int],
+    clause_filter: Optional[Callable[[CompiledClause], bool]] = None,
+) -> Dict[int, List[int]]:
+    """Select the clauses to check per group.
+
+    Args:
+        plan (ExecutionPlan): The compiled plan.
+        group_indices (Iterable[int]): Indices into `plan.groups`.
+        clause_filter (Optional[Callable[[CompiledClause], bool]], optional):
+            Accepts the clauses to check. Defaults to None, every clause.
+
+    Returns:
+        Dict[int, List[int]]: Clause indices per group index, in the given order;
+            groups without selected clauses are left out.
+    """
+    selected = {}
+    for group_index in group_indices:
+        clauses = plan.groups[group_index][1]
+        clause_indices = [
+            index
+            for index, clause in enumerate(clauses)
+            if clause_filter is None or clause_filter(clause)
+        ]
+        if clause_indices:
+            selected[group_index] = clause_indices
+    return selected
+
+
+def _fail_fast_order(plan: ExecutionPlan, cost_model: CostModel) -> List[int]:
+    """Order the groups with error clauses first, each part cheapest first.
+
+    Args:
+        plan (ExecutionPlan): The compiled plan.
+        cost_model (CostModel): Estimates the cost of the groups.
+
+    Returns:
+        List[int]: Indices into `plan.groups`.
+    """
+    return sorted(
+        cost_model.order(plan, range(len(plan.groups))),
+        key=lambda group_index: not _has_error(plan.groups[group_index][1]),
+    )
+
+
+def _evaluate_fail_fast(
+    plan: ExecutionPlan,
+    cost_model: CostModel,
+    evaluate: Callable[..., List[Tuple[int, _Outcomes]]],
+) -> List[Tuple[int, _Outcomes]]:
+    """Evaluate a plan until the first clause of severity error fails.
+
+    Only the clauses of severity error are checked first, cheapest group first,
+    in one walk; the other clauses, also those sharing a given path with an
+    error clause, are only matched and checked when none of those failed, so a
+    run that stops early never pays for them.
+
+    Args:
+        plan (ExecutionPlan): The compiled plan.
+        cost_model (CostModel): Estimates the cost of the groups.
+        evaluate (Callable[..., List[Tuple[int, _Outcomes]]]): `_evaluate_groups`
+            or `_evaluate_groups_profiled`, bound to the spec and plan.
+
+    Returns:
+        List[Tuple[int, _Outcomes]]: Per evaluated group index, the outcomes of
+            the checked clauses, in clause and document order.
+    """
+    order = _fail_fast_order(plan, cost_model)
+    out = evaluate(order, fail_fast=True, clause_filter=_is_error)
+    if any(outcomes for _, outcomes in out):
+        return out
+    rest = evaluate(order, clause_filter=lambda clause: not _is_error(clause))
+    merged: Dict[int, _Outcomes] = {}
+    for group_index, outcomes in out + rest:
+        merged.setdefault(group_index, []).extend(outcomes)
+    return [
+        (group_index, sorted(outcomes, key=lambda outcome: outcome[0]))
+        for group_index, outcomes in merged.items()
+    ]
+
+
+def _clause_objects(clause: CompiledClause, matches: List[Tuple[Any, Any]]) -> List:
+    objs = [match for _, match in matches]
+    if clause.field is not None:
+        objs = [
+            match.get(clause.field) if isinstance(match, dict) else None
+            for match in objs
+        ]
+    return objs
+
+
+def _clause_paths(
+    clause: CompiledClause, matches: List[Tuple[Any, Any]]
+) -> List[Optional[Tuple]]:
+    if clause.field is None:
+        return [keys for keys, _ in matches]
+    return [None if keys is None else keys + (clause.field,) for keys, _ in matches]
+
+
+def _outcomes(
+    clause_index: int,
+    clause: CompiledClause,
+    checker: builtins.Checker,
+    matches: List[Tuple[Any, Any]],
+    objs: List[Any],
+    results: List[bool],
+) -> _Outcomes:
+    """Turn the results of a clause into failures, one per offending object.
+
+    Args:
+        clause_index (int): Index of the clause in its group.
+        clause (CompiledClause): The clause.
+        checker (builtins.Checker): The clause's checker, bound to the spec.
+        matches (List[Tuple[Any, Any]]): The matches.
+        objs (List[Any]): The checked object of every match.
+        results (List[bool]): Whether every object passed.
+
+    Returns:
+        _Outcomes: The failures; objects the checker locates problems in get one
+            per problem.
+    """
+    outcomes = []
+    for (keys, _), obj, result in zip(matches, objs, results):
+        if result:
+            continue
+        if keys is not None and clause.field is not None:
+            keys = keys + (clause.field,)
+        parts = checker.locate(obj) if keys is not None else None
+        if parts:
+            outcomes.extend((clause_index, keys + part) for part in parts)
+        else:
+            outcomes.append((clause_index, keys))
+    return outcomes
+
+
+def _evaluate_groups_profiled(
+    parser: Parser,
+    plan: ExecutionPlan,
+    group_indices: Iterable[int],
+    profiler: Profiler,
+    lint_cache: Optional[LintCache] = None,
+    fail_fast: bool = False,
+    clause_filter: Optional[Callable[[CompiledClause], bool]] = None,
+) -> List[Tuple[int, _Outcomes]]:
+    """Like `_evaluate_groups`, but timing every given path, clause and check.
+
+    Kept apart from `_evaluate_groups`, so unprofiled runs pay nothing for it.
+    Every given path is matched in a walk of its own, so its time can be told
+    apart; checks answered by the lint cache are only timed as a whole.
+
+    Args:
+        parser (Parser): The spec parser.
+        plan (ExecutionPlan): The compiled plan.
+        group_indices (Iterable[int]): Indices into `plan.groups` to evaluate.
+        profiler (Profiler): Collects the measurements.
+        lint_cache (Optional[LintCache], optional): Store of earlier results,
+            used for clauses with a cacheable checker. Defaults to None.
+        fail_fast (bool, optional): Stop after the first clause of severity error
+            that fails. Defaults to False.
+        clause_filter (Optional[Callable[[CompiledClause], bool]], optional): Only
+            check the clauses it accepts. Defaults to None, every clause.
+
+    Returns:
+        List[Tuple[int, _Outcomes]]: Per evaluated group index, the outcomes of
+            the checked clauses, in clause and document order.
+    """
+    out = []
+    selected = _select_clauses(plan, group_indices, clause_filter)
+    for group_index, clause_indices in selected.items():
+        given_path, clauses = plan.groups[group_index]
+        start = time.perf_counter()
+        matches = parser.find_matches_many([given_path])[given_path]
+        profiler.record_match(
+            given_path,
+            (clause.rule_name for clause in clauses),
+            start,
+            time.perf_counter() - start,
+            len(matches),
+        )
+        outcomes = []
+        for clause_index in clause_indices:
+            clause = clauses[clause_index]
+            start = time.perf_counter()
+            checker = clause.checker.bind(parser)
+            objs = _clause_objects(clause, matches)
+            paths = _clause_paths(clause, matches) if checker.uses_paths else None
+            if lint_cache is not None and checker.cacheable:
+                results = lint_cache.check(clause.fingerprint, checker, objs, paths)
+            elif checker.uses_paths:
+                # callables that take all matches at once are only timed as a whole
+                results = checker.check_many(objs, paths)
+            else:
+                results = []
+                for (keys, _), obj in zip(matches, objs):
+                    call_start = time.perf_counter()
+                    results.append(builtins.passed(checker(obj)))
+                    profiler.record_call(
+                        clause.rule_name,
+                        clause.function,
+                        keys,
+                        time.perf_counter() - call_start,
+                    )
+            profiler.record_check(
+                clause.rule_name,
+                clause.given,
+                clause.function,
+                start,
+                time.perf_counter() - start,
+                len(objs),
+            )
+            outcomes.extend(
+                _outcomes(clause_index, clause, checker, matches, objs, results)
+            )
+            if fail_fast and clause.severity == "error" and not all(results):
+                out.append((group_index, outcomes))
+                return out
+        out.append((group_index, outcomes))
+    return out
+
+
+def _init_worker(parser: Parser, plan: ExecutionPlan, lint_cache_path: Optional[str]):
+    _WORKER_STATE["parser"] = parser
+    _WORKER_STATE["plan"] = plan
+    # sqlite connections must not be shared across processes
+    _WORKER_STATE["lint_cache"] = (
+        LintCache(lint_cache_path) if lint_cache_path is not None else None
+    )
+    if _WORKER_STATE["lint_cache"] is not None:
+        # pool workers skip atexit handlers, but run multiprocessing finalizers
+        multiprocessing.util.Finalize(
+            None, _WORKER_STATE["lint_cache"].close, exitpriority=10
+        )
+
+
+def _evaluate_groups_in_worker(
+    group_indices: List[int],
+) -> Tuple[List[Tuple[int, _Outcomes]], CostHistory]:
+    costs = {}
+    results = _evaluate_groups(
+        _WORKER_STATE["parser"],
+        _WORKER_STATE["plan"],
+        group_indices,
+        _WORKER_STATE["lint_cache"],
+        costs,
+    )
+    return results, costs
+
+
+def _evaluate_parallel(
+    parser: Parser,
+    plan: ExecutionPlan,
+    jobs: int,
+    lint_cache: Optional[LintCache] = None,
+    cost_model: Optional[CostModel] = None,
+    costs: Optional[CostHistory] = None,
+) -> List[Tuple[int, _Outcomes]]:
+    """Spread the given path groups of a plan over a process pool.
+
+    The parser and plan are handed to every worker once through the pool
+    initializer (inherited without pickling where `fork` is available). Groups
+    are dealt into a few chunks of about equal estimated cost per worker to
+    balance the load, most expensive chunk first, and the outcomes are put back
+    in plan order, so output is the same as a serial run.
+
+    Args:
+        parser (Parser): The spec parser.
+        plan (ExecutionPlan): The compiled plan.
+        jobs (int): Number of worker processes.
+        lint_cache (Optional[LintCache], optional): Store of earlier results, each
+            worker opens its own connection to it. Defaults to None.
+        cost_model (Optional[CostModel], optional): Estimates the cost of the
+            groups. Defaults to None, estimating without history.
+        costs (Optional[CostHistory], optional): Filled with the checked objects
+            and seconds of every clause. Defaults to None.
+
+    Returns:
+        List[Tuple[int, _Outcomes]]: Per group index, the outcomes in plan order.
+    """
+    cost_model = cost_model if cost_model is not None else CostModel()
+    chunks = cost_model.chunks(plan, range(len(plan.groups)), jobs * 4)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(parser, plan, lint_cache.path if lint_cache else None),
+    ) as executor:
+        results = []
+        for chunk_results, chunk_costs in executor.map(
+            _evaluate_groups_in_worker, chunks
+        ):
+            results.extend(chunk_results)
+            if costs is not None:
+                costs.update(chunk_costs)
+    return sorted(results, key=lambda result: result[0])
@@ -1,2 +1,6 @@
 class NonExistentCallableError(Exception):
     pass
+
+
+class InvalidRulesetError(Exception):
+    pass
@@ -0,0 +1,192 @@
+import json
+import mmap
+import re
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Objects whose json text is larger than this are indexed and kept lazy,
+# smaller ones are parsed right away.
+LAZY_THRESHOLD = 64 * 1024
+
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_STRING_PATTERN = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_STRING = re.compile(_STRING_PATTERN, re.S)
+
+
+def _skip_pattern(depth: int, repeat: int = 256) -> bytes:
+    """Build a pattern that skips text, strings and containers up to `depth` levels.
+
+    Every alternative starts with a different character, so the pattern never
+    backtracks much, and skipping shallow containers happens entirely in the
+    regex engine instead of one loop iteration per bracket. Repetitions are
+    bounded at every level because the regex engine keeps state per repetition;
+    larger containers are skipped in several matches instead.
+    """
+    text = rb'[^"\[\]{}]*'
+    pattern = text + rb"(?:" + _STRING_PATTERN + text + rb"){0,%d}" % repeat
+    for _ in range(depth):
+        container = rb"[\[{]" + pattern + rb"[\]}]"
+        pattern = (
+            text
+            + rb"(?:(?:"
+            + _STRING_PATTERN
+            + rb"|"
+            + container
+            + rb")"
+            + text
+            + rb"){0,%d}" % repeat
+        )
+    return pattern
+
+
+# Skips up to the next string or bracket that is not part of a small, shallow
+# container
+_SKIP = re.compile(_skip_pattern(8), re.S)
+_OPENING = frozenset(b"{[")
+_SCALAR_END = re.compile(rb"[,}\]\s]")
+
+
+def _skip_whitespace(buffer: Any, pos: int) -> int:
+    return _WHITESPACE.match(buffer, pos).end()
+
+
+def _value_end(buffer: Any, pos: int) -> int:
+    """Find the end of the json value starting at `pos` without parsing it.
+
+    Args:
+        buffer (Any): The json text (bytes or mmap).
+        pos (int): Offset of the first character of the value.
+
+    Raises:
+        ValueError: Raised when the value is not terminated.
+
+    Returns:
+        int: Offset right after the value.
+    """
+    first = buffer[pos]
+    if first == 0x22:  # "
+        return _STRING.match(buffer, pos).end()
+    if first in _OPENING:
+        depth, size = 0, len(buffer)
+        while pos < size:
+            char = buffer[pos]
+            if char == 0x22:  # a string the skip pattern stopped in front of
+                pos = _SKIP.match(buffer, pos).end()
+                continue
+            if char in _OPENING:
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            pos = _SKIP.match(buffer, pos + 1).end()
+        raise ValueError("Unterminated json value.")
+    end = _SCALAR_END.search(buffer, pos)
+    return len(buffer) if end is None else end.start()
+
+
+class LazyObject(Mapping):
+    """Read-only json object that is indexed and parsed on demand.
+
+    On first access the members of the object are indexed: the offsets of
+    every value are recorded without creating any Python objects. A value is
+    only parsed when it is looked up, and large nested objects become lazy
+    objects themselves, so only the subtrees a query reaches into are loaded.
+    """
+
+    def __init__(self, buffer: Any, start: int, end: int):
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None
+        self._values: Dict[str, Any] = {}
+
+    def _get_index(self) -> Dict[str, Tuple[int, int]]:
+        if self._index is not None:
+            return self._index
+
+        buffer, index = self._buffer, {}
+        pos = _skip_whitespace(buffer, self._start + 1)
+        while buffer[pos : pos + 1] != b"}":
+            key_end = _value_end(buffer, pos)
+            key = buffer[pos + 1 : key_end - 1]
+            key = json.loads(buffer[pos:key_end]) if b"\\" in key else key.decode()
+            pos = _skip_whitespace(buffer, key_end) + 1  # skip the ":"
+            pos = _skip_whitespace(buffer, pos)
+            value_end = _value_end(buffer, pos)
+            index[key] = (pos, value_end)
+            pos = _skip_whitespace(buffer, value_end)
+            if buffer[pos : pos + 1] == b",":
+                pos = _skip_whitespace(buffer, pos + 1)
+        self._index = index
+        return index
+
+    def _parse(self, start: int, end: int) -> Any:
+        if self._buffer[start : start + 1] == b"{" and end - start > LAZY_THRESHOLD:
+            return LazyObject(self._buffer, start, end)
+        return json.loads(self._buffer[start:end])
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            start, end = self._get_index()[key]
+        value = self._values[key] = self._parse(start, end)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._get_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get_index())
+
+    def __len__(self) -> int:
+        return len(self._get_index())
+
+    def __repr__(self) -> str:
+        return f"<LazyObject {self._end - self._start} bytes>"
+
+    def __reduce__(self):
+        # memory maps cannot be pickled, a copy is sent as a plain dict instead
+        return (dict, (self.materialize(),))
+
+    def materialize(self) -> Dict:
+        """Parse the whole object into plain Python objects.
+
+        Returns:
+            Dict: The parsed object.
+        """
+        return json.loads(self._buffer[self._start : self._end])
+
+
+def materialize(obj: Any) -> Any:
+    """Turn a lazy object into a plain dict, leave anything else as is.
+
+    Args:
+        obj (Any): The object.
+
+    Returns:
+        Any: The plain object.
+    """
+    if isinstance(obj, LazyObject):
+        return obj.materialize()
+    return obj
+
+
+def read_json_lazy(path: Path) -> Any:
+    """Memory-map a json file and return a lazy view of it.
+
+    Args:
+        path (Path): Path to the json file.
+
+    Returns:
+        Any: A `LazyObject` if the document is an object, else the parsed document.
+    """
+    with open(path, "rb") as fp:
+        buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    start = _skip_whitespace(buffer, 3 if buffer[:3] == b"\xef\xbb\xbf" else 0)
+    if buffer[start : start + 1] != b"{":
+        return json.loads(buffer[start:])
+    return LazyObject(buffer, start, buffer.rfind(b"}") + 1)
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from stinky.noodle.utils import builtins
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# sqlite limits the number of host parameters per statement
+_BATCH_SIZE = 500
+
+
+def canonical_hash(obj: Any) -> str:
+    """Hash a json-like object independently of its key order.
+
+    Args:
+        obj (Any): The object.
+
+    Raises:
+        ValueError: Raised when the object contains a cycle (resolved `$ref`s).
+
+    Returns:
+        str: 128 bit blake2b hex digest of the canonical json representation.
+    """
+    canonical = None
+    if orjson is not None:
+        try:
+            canonical = orjson.dumps(
+                obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            )
+        except TypeError:
+            pass
+    if canonical is None:
+        canonical = json.dumps(
+            obj, sort_keys=True, separators=(",", ":"), default=str
+        ).encode()
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+class LintCache:
+    """Persistent store of check results, keyed by clause and matched subtree.
+
+    A clause is identified by its fingerprint (function, field, options and the
+    version of the callable, see `stinky.noodle.utils.plan.clause_fingerprint`),
+    a subtree by the hash of its canonical json. Changing a rule or bumping a
+    custom callable's version changes the fingerprint, so its old entries are
+    never hit again and are removed by `prune`. Several rulesets can share a
+    cache: `prune` records which clauses belong to which ruleset, and only
+    removes the entries of clauses that no ruleset uses anymore.
+
+    It also keeps the match count and check time of every clause of the last
+    run, which `stinky.noodle.utils.scheduler.CostModel` uses to schedule the
+    next one.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "clause TEXT NOT NULL, subtree TEXT NOT NULL, passed INTEGER NOT NULL, "
+            "PRIMARY KEY (clause, subtree)) WITHOUT ROWID"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS costs ("
+            "given TEXT NOT NULL, clause TEXT NOT NULL, checks REAL NOT NULL, "
+            "seconds REAL NOT NULL, PRIMARY KEY (given, clause)) WITHOUT ROWID"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS owners ("
+            "ruleset TEXT NOT NULL, clause TEXT NOT NULL, "
+            "PRIMARY KEY (ruleset, clause)) WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def check(
+        self,
+        fingerprint: str,
+        checker: builtins.Checker,
+        objs: List[Any],
+        paths: Optional[List[Optional[Tuple]]] = None,
+    ) -> List[bool]:
+        """Check objects, reusing stored results for subtrees that were seen before.
+
+        The objects that are not known are checked with one `check_many` call.
+
+        Args:
+            fingerprint (str): Fingerprint of the clause.
+            checker (builtins.Checker): The prepared callable of the clause.
+            objs (List[Any]): The matched objects.
+            paths (Optional[List[Optional[Tuple]]], optional): The keys leading to
+                every object, for checkers that use them. Defaults to None.
+
+        Returns:
+            List[bool]: Whether each object passed.
+        """
+        subtrees = []
+        for obj in objs:
+            try:
+                subtrees.append(canonical_hash(obj))
+            except ValueError:  # cyclic subtrees are always checked
+                subtrees.append(None)
+        known = {}
+        unique = [subtree for subtree in dict.fromkeys(subtrees) if subtree]
+        for start in range(0, len(unique), _BATCH_SIZE):
+            batch = unique[start : start + _BATCH_SIZE]
+            rows = self.connection.execute(
+                "SELECT subtree, passed FROM results WHERE clause = ? AND subtree IN "
+                f"({', '.join('?' * len(batch))})",
+                [fingerprint, *batch],
+            )
+            known.update((subtree, bool(passed)) for subtree, passed in rows)
+
+        # cyclic subtrees and the first object of every unknown subtree
+        pending, pending_subtrees = [], {}
+        for index, subtree in enumerate(subtrees):
+            if subtree is None:
+                pending.append(index)
+            elif subtree in known or subtree in pending_subtrees:
+                self.hits += 1
+            else:
+                self.misses += 1
+                pending_subtrees[subtree] = index
+                pending.append(index)
+        checked = dict(
+            zip(
+                pending,
+                checker.check_many(
+                    [objs[index] for index in pending],
+                    None if paths is None else [paths[index] for index in pending],
+                ),
+            )
+        )
+
+        out, new = [], {}
+        for index, subtree in enumerate(subtrees):
+            if subtree is None:
+                out.append(checked[index])
+                continue
+            if subtree not in known:
+                known[subtree] = new[subtree] = checked[pending_subtrees[subtree]]
+            out.append(known[subtree])
+
+        if new:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                [
+                    (fingerprint, subtree, int(passed))
+                    for subtree, passed in new.items()
+                ],
+            )
+            self.connection.commit()
+        return out
+
+    def load_costs(self) -> Dict[Tuple[str, str], Tuple[float, float]]:
+        """Get the costs of the clauses in their last run.
+
+        Returns:
+            Dict[Tuple[str, str], Tuple[float, float]]: Checked objects and
+                seconds per given path and clause fingerprint.
+        """
+        return {
+            (given, clause): (checks, seconds)
+            for given, clause, checks, seconds in self.connection.execute(
+                "SELECT given, clause, checks, seconds FROM costs"
+            )
+        }
+
+    def store_costs(self, costs: Dict[Tuple[str, str], Tuple[float, float]]):
+        """Store the costs of clauses, replacing those of earlier runs.
+
+        Args:
+            costs (Dict[Tuple[str, str], Tuple[float, float]]): Checked objects
+                and seconds per given path and clause fingerprint.
+        """
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO costs VALUES (?, ?, ?, ?)",
+            [
+                (given, clause, checks, seconds)
+                for (given, clause), (checks, seconds) in costs.items()
+            ],
+        )
+        self.connection.commit()
+
+    def prune(self, fingerprints: Iterable[str], ruleset: str) -> int:
+        """Remove the entries of clauses a ruleset no longer uses.
+
+        Clauses the ruleset used in an earlier `prune` but not anymore are
+        removed, unless another ruleset still uses them. Entries of other
+        rulesets that share the cache are kept.
+
+        Args:
+            fingerprints (Iterable[str]): Fingerprints of the current clauses of
+                the ruleset.
+            ruleset (str): Identifies the ruleset, e.g. its absolute path.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        fingerprints = list(set(fingerprints))
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS live (clause TEXT)")
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS stale (clause TEXT)")
+        self.connection.execute("DELETE FROM live")
+        self.connection.execute("DELETE FROM stale")
+        self.connection.executemany(
+            "INSERT INTO live VALUES (?)", [(fp,) for fp in fingerprints]
+        )
+        self.connection.execute(
+            "INSERT INTO stale SELECT clause FROM owners "
+            "WHERE ruleset = ? AND clause NOT IN (SELECT clause FROM live)",
+            [ruleset],
+        )
+        self.connection.execute(
+            "DELETE FROM owners WHERE ruleset = ? "
+            "AND clause IN (SELECT clause FROM stale)",
+            [ruleset],
+        )
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO owners VALUES (?, ?)",
+            [(ruleset, fp) for fp in fingerprints],
+        )
+        orphans = (
+            "clause IN (SELECT clause FROM stale) "
+            "AND clause NOT IN (SELECT clause FROM owners)"
+        )
+        cursor = self.connection.execute(f"DELETE FROM results WHERE {orphans}")
+        self.connection.execute(f"DELETE FROM costs WHERE {orphans}")
+        self.connection.commit()
+        return cursor.rowcount
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from loguru import logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Bump when the way documents are parsed changes, so stale cache entries are ignored
+CACHE_VERSION = 1
+
+JSON_EXTENSIONS = (".json",)
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+
+def detect_format(path: Path, content: bytes) -> str:
+    """Detect the format of a document by its extension, or else by its content.
+
+    Args:
+        path (Path): Path to the document.
+        content (bytes): The raw document.
+
+    Returns:
+        str: Either "json" or "yaml".
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in JSON_EXTENSIONS:
+        return "json"
+    if suffix in YAML_EXTENSIONS:
+        return "yaml"
+    # every json document is valid yaml, but only json starts with a bracket
+    return "json" if content.lstrip()[:1] in (b"{", b"[") else "yaml"
+
+
+def _parse_json(content: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _import_yaml() -> Any:
+    # imported on first use, most specs and rulesets are json
+    try:
+        import yaml
+    except ImportError:  # pragma: no cover
+        return None
+    return yaml
+
+
+def _parse_yaml(content: bytes) -> Any:
+    yaml = _import_yaml()
+    if yaml is None:
+        raise ImportError(
+            "PyYAML is required to read yaml documents, install stinky-noodle[yaml]."
+        )
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(content, Loader=loader)
+
+
+PARSERS: Dict[str, Callable[[bytes], Any]] = {
+    "json": _parse_json,
+    "yaml": _parse_yaml,
+}
+
+
+def backend_names() -> Dict[str, str]:
+    """Get the backend that is used for each format.
+
+    Returns:
+        Dict[str, str]: Format mapped to the name of its backend.
+    """
+    yaml_backend = "missing"
+    yaml = _import_yaml()
+    if yaml is not None:
+        yaml_backend = "libyaml" if hasattr(yaml, "CSafeLoader") else "pyyaml"
+    return {"json": "orjson" if orjson is not None else "json", "yaml": yaml_backend}
+
+
+class DocumentCache:
+    """On-disk cache of parsed documents, keyed by a hash of their content.
+
+    Entries are pickles written atomically, so concurrent runs (e.g. parallel
+    pre-commit hooks) never read a partially written entry.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(content: bytes, namespace: str = "document") -> str:
+        """Compute the cache key of a document.
+
+        Args:
+            content (bytes): The raw document.
+            namespace (str, optional): What the cached value is, so different
+                values derived from the same content do not collide.
+                Defaults to "document".
+
+        Returns:
+            str: The cache key.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        return f"{namespace}-v{CACHE_VERSION}-{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[Any]: The cached value, None on a miss or a corrupt entry.
+        """
+        try:
+            with open(self.cache_dir / f"{key}.pickle", "rb") as fp:
+                return pickle.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception as exception:
+            logger.debug(f"Ignoring unreadable cache entry {key}: {exception}")
+            return None
+
+    def put(self, key: str, value: Any):
+        """Store a value in the cache.
+
+        Args:
+            key (str): The cache key.
+            value (Any): The value, must be picklable.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_dir / f"{key}.pickle")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def load_document(path: Path, cache: Optional[DocumentCache] = None) -> Any:
+    """Read and parse a json or yaml document.
+
+    Args:
+        path (Path): Path to the document.
+        cache (Optional[DocumentCache], optional): Cache of parsed documents.
+            Defaults to None.
+
+    Returns:
+        Any: The parsed document.
+    """
+    with open(path, "rb") as fp:
+        content = fp.read()
+    return parse_document(path, content, cache=cache)
+
+
+def parse_document(
+    path: Path, content: bytes, cache: Optional[DocumentCache] = None
+) -> Any:
+    """Parse the content of a json or yaml document.
+
+    Args:
+        path (Path): Path to the document, used to detect its format.
+        content (bytes): The raw document.
+        cache (Optional[DocumentCache], optional): Cache of parsed documents.
+            Defaults to None.
+
+    Returns:
+        Any: The parsed document.
+    """
+    document_format = detect_format(path, content)
+    key = None
+    if cache is not None:
+        key = DocumentCache.key(content, namespace=document_format)
+        document = cache.get(key)
+        if document is not None:
+            logger.debug(f"Loaded {path} from the cache.")
+            return document
+
+    document = PARSERS[document_format](content)
+    if cache is not None:
+        cache.put(key, document)
+    return document
@@ -1,20 +1,1287 @@
 # from jsonpath_ng.ext import parse
-from typing import Any, Dict, List, Union
+import operator
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+from urllib.parse import unquote
 
-from pyjsonpath import JsonPath
+from loguru import logger
+
+from stinky.noodle.utils.lazy import LazyObject, materialize
+from stinky.noodle.utils.loader import load_document
+
+_NAME_PATTERN = re.compile(r"[^.\[\]()'\"\s~]+")
+_DOT_NAME_PATTERN = re.compile(r"[A-Za-z_$][\w$-]*")
+_INDEX_PATTERN = re.compile(r"-?[0-9]+")
+_CONTAINER_TYPES = (dict, list, LazyObject)
+
+
+class UnsupportedExpressionError(ValueError):
+    """Raised when an expression cannot be compiled for single-pass evaluation."""
+
+
+class _KeySelector:
+    """Select children by (one or more) names, e.g. `.paths` or `['a', 'b']`."""
+
+    scans = False
+
+    def __init__(self, names: Tuple[str, ...]):
+        self.names = names
+        self.keys = set(names) | {int(name) for name in names if name.isdigit()}
+
+    def matches(self, key: Any, size: Optional[int], child: Any, parent: Any) -> bool:
+        return key in self.keys
+
+    def __str__(self) -> str:
+        if len(self.names) == 1 and _DOT_NAME_PATTERN.fullmatch(self.names[0]):
+            return f".{self.names[0]}"
+        return "[{}]".format(",".join(repr(name) for name in self.names))
+
+    def lookup(self, node: Any) -> Iterable[Tuple[Any, Any]]:
+        if isinstance(node, list):
+            for name in self.names:
+                if name.isdigit() and int(name) < len(node):
+                    yield int(name), node[int(name)]
+        else:
+            for name in self.names:
+                if name in node:
+                    yield name, node[name]
+                elif name.isdigit() and int(name) in node:
+                    yield int(name), node[int(name)]
+
+
+class _IndexSelector:
+    """Select list items by index, e.g. `[0]` or `[0, -1]`."""
+
+    scans = False
+
+    def __init__(self, indices: Tuple[int, ...]):
+        self.indices = indices
+
+    def matches(self, key: Any, size: Optional[int], child: Any, parent: Any) -> bool:
+        if size is None:
+            return False
+        return any(
+            key == (index if index >= 0 else size + index) for index in self.indices
+        )
+
+    def __str__(self) -> str:
+        return "[{}]".format(",".join(str(index) for index in self.indices))
+
+    def lookup(self, node: Any) -> Iterable[Tuple[Any, Any]]:
+        if isinstance(node, list):
+            size = len(node)
+            for index in self.indices:
+                if -size <= index < size:
+                    yield index % size, node[index]
+
+
+class _SliceSelector:
+    """Select a range of list items, e.g. `[1:3]`."""
+
+    scans = True
+
+    def __init__(self, start: Optional[int], end: Optional[int]):
+        self.start = start
+        self.end = end
+
+    def matches(self, key: Any, size: Optional[int], child: Any, parent: Any) -> bool:
+        if size is None:
+            return False
+        return key in range(*slice(self.start, self.end).indices(size))
+
+    def __str__(self) -> str:
+        start = "" if self.start is None else self.start
+        end = "" if self.end is None else self.end
+        return f"[{start}:{end}]"
+
+
+class _WildcardSelector:
+    """Select every child, e.g. `.*` or `[*]`."""
+
+    scans = True
+
+    def matches(self, key: Any, size: Optional[int], child: Any, parent: Any) -> bool:
+        return True
+
+    def __str__(self) -> str:
+        return "[*]"
+
+
+class _FilterSelector:
+    """Select the children a filter holds for, e.g. `[?(@.in == 'path')]`."""
+
+    scans = True
+
+    def __init__(self, source: str, predicate: Callable[[Any, Any, Any], bool]):
+        self.source = source
+        self.predicate = predicate
+
+    def matches(self, key: Any, size: Optional[int], child: Any, parent: Any) -> bool:
+        return self.predicate(child, key, parent)
+
+    def __str__(self) -> str:
+        return f"[?({self.source})]"
+
+
+# Ends an expression that selects property names instead of values, e.g. `$.paths.*~`
+_PROPERTY_NAME = object()
+
+_Step = Tuple[bool, Any]
+
+# Filter expressions, in the JavaScript dialect of Spectral (jsonpath-plus):
+# `@` is the candidate child, `@property` (or `@key`) its key, `@parent` the
+# node it is a child of.
+_UNDEFINED = object()
+_FILTER_TOKEN = re.compile(
+    r"""\s*(?:
+    (?P<number>-?[0-9]+(?:\.[0-9]+)?)
+    |(?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    |(?P<regex>/(?:[^/\\]|\\.)+/[gimsuy]*)
+    |(?P<op>===|!==|==|!=|<=|>=|&&|\|\||[<>!().,\[\]])
+    |(?P<name>@?[A-Za-z_$][\w$]*|@)
+    )""",
+    re.VERBOSE,
+)
+_FILTER_LITERALS = {"true": True, "false": False, "null": None, "undefined": _UNDEFINED}
+_FILTER_COMPARISONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL}
+
+
+def _js_truthy(value: Any) -> bool:
+    if value is _UNDEFINED or value is None or value is False:
+        return False
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        return bool(value) and value == value  # NaN is falsy
+    return True
+
+
+def _js_equal(left: Any, right: Any) -> bool:
+    if left is _UNDEFINED or right is _UNDEFINED:
+        return left is right
+    # unlike in python, true is not 1 in javascript
+    if isinstance(left, bool) != isinstance(right, bool):
+        return False
+    return left == right
+
+
+def _js_member(value: Any, name: Any) -> Any:
+    if isinstance(value, list):
+        if name == "length":
+            return len(value)
+        if isinstance(name, int) and -len(value) <= name < len(value):
+            return value[name]
+        return _UNDEFINED
+    if isinstance(value, str):
+        return len(value) if name == "length" else _UNDEFINED
+    if isinstance(value, (dict, LazyObject)):
+        return value.get(name, _UNDEFINED)
+    return _UNDEFINED
+
+
+def _js_regex(pattern: Any) -> Any:
+    if isinstance(pattern, str):
+        return re.compile(pattern)
+    return pattern
+
+
+_FILTER_METHODS: Dict[str, Callable[..., Any]] = {
+    "match": lambda value, pattern: isinstance(value, str)
+    and _js_regex(pattern).search(value) is not None,
+    "test": lambda value, text: isinstance(text, str)
+    and _js_regex(value).search(text) is not None,
+    "startsWith": lambda value, prefix: isinstance(value, str)
+    and value.startswith(prefix),
+    "endsWith": lambda value, suffix: isinstance(value, str) and value.endswith(suffix),
+    "includes": lambda value, item: isinstance(value, (str, list)) and item in value,
+}
+
+
+class _FilterCompiler:
+    """Compile a filter expression into a predicate, by recursive descent.
+
+    Every construct becomes a closure taking the candidate child, its key and
+    its parent, so evaluating a filter never parses or `eval`s anything.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens: List[Tuple[str, str]] = []
+        pos = 0
+        source = source.rstrip()
+        while pos < len(source):
+            token = _FILTER_TOKEN.match(source, pos)
+            if token is None or token.end() == pos:
+                raise UnsupportedExpressionError(
+                    f"Unexpected {source[pos:]!r} in filter {self.source}."
+                )
+            self.tokens.append((token.lastgroup, token.group(token.lastgroup)))
+            pos = token.end()
+        self.pos = 0
+
+    def compile(self) -> Callable[[Any, Any, Any], bool]:
+        expression = self._or()
+        if self.pos != len(self.tokens):
+            raise UnsupportedExpressionError(
+                f"Unexpected {self.tokens[self.pos][1]!r} in filter {self.source}."
+            )
+
+        def predicate(child: Any, key: Any, parent: Any) -> bool:
+            return _js_truthy(expression(child, key, parent))
+
+        return predicate
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def _next(self) -> Tuple[str, str]:
+        if self.pos == len(self.tokens):
+            raise UnsupportedExpressionError(f"Unexpected end of filter {self.source}.")
+        self.pos += 1
+        return self.tokens[self.pos - 1]
+
+    def _expect(self, value: str):
+        if self._next()[1] != value:
+            raise UnsupportedExpressionError(
+                f"Expected {value!r} in filter {self.source}."
+            )
+
+    def _or(self) -> Callable:
+        left = self._and()
+        while self._peek() == "||":
+            self.pos += 1
+            right = self._and()
+            left = (
+                lambda left, right: lambda *ctx: left(*ctx)
+                if _js_truthy(left(*ctx))
+                else right(*ctx)
+            )(left, right)
+        return left
+
+    def _and(self) -> Callable:
+        left = self._not()
+        while self._peek() == "&&":
+            self.pos += 1
+            right = self._not()
+            left = (
+                lambda left, right: lambda *ctx: right(*ctx)
+                if _js_truthy(left(*ctx))
+                else left(*ctx)
+            )(left, right)
+        return left
+
+    def _not(self) -> Callable:
+        if self._peek() == "!":
+            self.pos += 1
+            operand = self._not()
+            return lambda *ctx: not _js_truthy(operand(*ctx))
+        return self._comparison()
+
+    def _comparison(self) -> Callable:
+        left = self._value()
+        op = self._peek()
+        if op in ("==", "===", "!=", "!=="):
+            self.pos += 1
+            right = self._value()
+            if op in ("==", "==="):
+                return lambda *ctx: _js_equal(left(*ctx), right(*ctx))
+            return lambda *ctx: not _js_equal(left(*ctx), right(*ctx))
+        if op in _FILTER_COMPARISONS:
+            self.pos += 1
+            right = self._value()
+            compare = _FILTER_COMPARISONS[op]
+
+            def comparison(*ctx: Any) -> bool:
+                left_value, right_value = left(*ctx), right(*ctx)
+                if isinstance(left_value, bool) or isinstance(right_value, bool):
+                    return False
+                try:
+                    return compare(left_value, right_value)
+                except TypeError:  # e.g. a missing property, or a string and a number
+                    return False
+
+            return comparison
+        return left
+
+    def _value(self) -> Callable:
+        value = self._primary()
+        while self._peek() in (".", "["):
+            if self._next()[1] == ".":
+                kind, name = self._next()
+                if kind != "name" or name.startswith("@"):
+                    raise UnsupportedExpressionError(
+                        f"Unexpected {name!r} in filter {self.source}."
+                    )
+                if self._peek() == "(":
+                    value = self._method(value, name)
+                else:
+                    value = (
+                        lambda value, name: lambda *ctx: _js_member(value(*ctx), name)
+                    )(value, name)
+            else:
+                kind, member = self._next()
+                if kind == "string":
+                    member = _unquote_js(member)
+                elif kind == "number" and "." not in member:
+                    member = int(member)
+                else:
+                    raise UnsupportedExpressionError(
+                        f"Unexpected {member!r} in filter {self.source}."
+                    )
+                self._expect("]")
+                value = (
+                    lambda value, member: lambda *ctx: _js_member(value(*ctx), member)
+                )(value, member)
+        return value
+
+    def _method(self, receiver: Callable, name: str) -> Callable:
+        if name not in _FILTER_METHODS:
+            raise UnsupportedExpressionError(
+                f"Method {name} is not supported in filter {self.source}."
+            )
+        self._expect("(")
+        argument = self._or()
+        self._expect(")")
+        method = _FILTER_METHODS[name]
+        return lambda *ctx: method(receiver(*ctx), argument(*ctx))
+
+    def _primary(self) -> Callable:
+        kind, token = self._next()
+        if token == "(":
+            inner = self._or()
+            self._expect(")")
+            return inner
+        if kind == "number":
+            number = float(token) if "." in token else int(token)
+            return lambda *ctx: number
+        if kind == "string":
+            text = _unquote_js(token)
+            return lambda *ctx: text
+        if kind == "regex":
+            body, flags = token[1:].rsplit("/", 1)
+            pattern = re.compile(body, sum(_REGEX_FLAGS.get(flag, 0) for flag in flags))
+            return lambda *ctx: pattern
+        if token == "@":
+            return lambda child, key, parent: child
+        if token in ("@property", "@key"):
+            return lambda child, key, parent: key
+        if token == "@parent":
+            return lambda child, key, parent: parent
+        if kind == "name" and token in _FILTER_LITERALS:
+            literal = _FILTER_LITERALS[token]
+            return lambda *ctx: literal
+        raise UnsupportedExpressionError(
+            f"Unexpected {token!r} in filter {self.source}."
+        )
+
+
+def _unquote_js(token: str) -> str:
+    return re.sub(r"\\(.)", r"\1", token[1:-1])
+
+
+def compile_filter(source: str) -> Callable[[Any, Any, Any], bool]:
+    """Compile a JSONPath filter expression into a predicate.
+
+    Supports Spectral's dialect: `@`, `@property` (or `@key`) and `@parent`,
+    member access (`@.in`, `@['x-tag']`, `.length`), string, number, regex
+    and `true`/`false`/`null`/`undefined` literals, `==`/`===`/`!=`/`!==`,
+    `<`/`<=`/`>`/`>=`, `!`/`&&`/`||` and the string methods `match`,
+    `startsWith`, `endsWith` and `includes`, with JavaScript semantics for
+    missing properties and truthiness.
+
+    Args:
+        source (str): The filter, e.g. `@.in == 'path' && @property != 'get'`.
+
+    Raises:
+        UnsupportedExpressionError: Raised when the filter uses other syntax.
+
+    Returns:
+        Callable[[Any, Any, Any], bool]: Predicate of the candidate child, its
+            key and its parent.
+    """
+    return _FilterCompiler(source).compile()
+
+
+def _filter_end(expr: str, start: int) -> int:
+    """Find the `]` that closes a filter, skipping brackets in strings and groups.
+
+    Args:
+        expr (str): The JSONPath expression.
+        start (int): Position of the `[` that opens the filter.
+
+    Raises:
+        UnsupportedExpressionError: Raised when the filter is not closed.
+
+    Returns:
+        int: Position of the closing `]`.
+    """
+    depth, quote, pos = 0, None, start + 1
+    while pos < len(expr):
+        char = expr[pos]
+        if char == "\\":
+            pos += 2
+            continue
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            if depth == 0:
+                return pos
+            depth -= 1
+        pos += 1
+    raise UnsupportedExpressionError(f"Unclosed filter in {expr}.")
+
+
+def _parse_bracket(content: str) -> Any:
+    """Parse the content of a `[...]` segment into a selector.
+
+    Args:
+        content (str): Whatever is in between the brackets.
+
+    Raises:
+        UnsupportedExpressionError: Raised for constructs the single-pass
+            evaluator does not understand.
+
+    Returns:
+        Any: The selector.
+    """
+    content = content.strip()
+    if content == "*":
+        return _WildcardSelector()
+    if content.startswith("?"):
+        source = content[1:].strip()
+        if source.startswith("(") and source.endswith(")"):
+            source = source[1:-1].strip()
+        return _FilterSelector(source, compile_filter(source))
+    if ":" in content:
+        parts = [part.strip() for part in content.split(":")]
+        if len(parts) != 2 or not all(
+            not part or _INDEX_PATTERN.fullmatch(part) for part in parts
+        ):
+            raise UnsupportedExpressionError(f"Slice {content} is not supported.")
+        start, end = (int(part) if part else None for part in parts)
+        return _SliceSelector(start, end)
+
+    parts = [part.strip() for part in content.split(",")]
+    if all(_INDEX_PATTERN.fullmatch(part) for part in parts):
+        return _IndexSelector(tuple(int(part) for part in parts))
+
+    names = []
+    for part in parts:
+        if len(part) >= 2 and part[0] == part[-1] and part[0] in "'\"":
+            names.append(part[1:-1])
+        elif _NAME_PATTERN.fullmatch(part):
+            names.append(part)
+        else:
+            raise UnsupportedExpressionError(f"Selector {part} is not supported.")
+    return _KeySelector(tuple(names))
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(json_expr: str) -> Tuple[_Step, ...]:
+    """Compile a JSONPath expression into a tuple of (descendant, selector) steps.
+
+    Besides the usual JSONPath, Spectral's extensions are supported: filters
+    (`[?(@.in == 'path')]`, see `compile_filter`) and a trailing `~`, which
+    selects the property names of the matches instead of their values.
+    Compiled expressions are cached, so every expression is parsed once.
+
+    Args:
+        json_expr (str): The JSONPath expression, e.g. `$.paths[*][*]`.
+
+    Raises:
+        UnsupportedExpressionError: Raised when the expression uses syntax
+            that has to be evaluated by `pyjsonpath` instead.
+
+    Returns:
+        Tuple[_Step, ...]: The compiled steps.
+    """
+    expr = json_expr.strip()
+    if not expr.startswith("$"):
+        raise UnsupportedExpressionError(f"{json_expr} does not start with $.")
+
+    steps = []
+    pos, size = 1, len(expr)
+    while pos < size:
+        descendant = False
+        if expr[pos] == "~" and pos == size - 1 and steps:
+            steps.append((False, _PROPERTY_NAME))
+            break
+        if expr.startswith("..", pos):
+            descendant = True
+            pos += 2
+        elif expr[pos] == ".":
+            pos += 1
+        elif expr[pos] != "[":
+            raise UnsupportedExpressionError(f"Unexpected {expr[pos:]} in {json_expr}.")
+
+        if expr.startswith("[?", pos):
+            end = _filter_end(expr, pos)
+            selector = _parse_bracket(expr[pos + 1 : end])
+            pos = end + 1
+        elif pos < size and expr[pos] == "[":
+            end = expr.find("]", pos)
+            if end == -1:
+                raise UnsupportedExpressionError(f"Unclosed bracket in {json_expr}.")
+            selector = _parse_bracket(expr[pos + 1 : end])
+            pos = end + 1
+        elif pos < size and expr[pos] == "*":
+            selector = _WildcardSelector()
+            pos += 1
+        else:
+            name = _NAME_PATTERN.match(expr, pos)
+            if name is None or expr.startswith("(", name.end()):
+                raise UnsupportedExpressionError(
+                    f"Unexpected {expr[pos:]} in {json_expr}."
+                )
+            selector = _KeySelector((name.group(),))
+            pos = name.end()
+        steps.append((descendant, selector))
+    return tuple(steps)
+
+
+def normalize_expression(json_expr: str) -> str:
+    """Normalize a JSONPath expression so equivalent spellings compare equal.
+
+    `$['paths'][*].get` and `$.paths.*.get` both become `$.paths[*].get`.
+    Expressions that cannot be compiled, or whose normalized form would
+    compile to other selectors (e.g. for keys with a `,` or `]`), are only
+    stripped of whitespace.
+
+    Args:
+        json_expr (str): The JSONPath expression.
+
+    Returns:
+        str: The normalized expression.
+    """
+    try:
+        steps = compile_expression(json_expr)
+    except UnsupportedExpressionError:
+        return json_expr.strip()
+
+    out = "$"
+    for descendant, selector in steps:
+        if selector is _PROPERTY_NAME:
+            out += "~"
+            break
+        part = str(selector)
+        if descendant:
+            part = f"..{part[1:]}" if part.startswith(".") else f"..{part}"
+        out += part
+
+    try:
+        round_trips = _step_keys(compile_expression(out)) == _step_keys(steps)
+    except UnsupportedExpressionError:
+        round_trips = False
+    return out if round_trips else json_expr.strip()
+
+
+def _step_keys(steps: Tuple[_Step, ...]) -> List[Tuple[bool, type, str]]:
+    return [
+        (descendant, type(selector), str(selector)) for descendant, selector in steps
+    ]
+
+
+_EXIT = object()
+
+
+def _iter_walk(
+    root: Any,
+    plans: List[Tuple[_Step, ...]],
+    cyclic: bool = False,
+    with_paths: bool = False,
+) -> Iterator[Tuple[int, Any]]:
+    """Walk `root` once and evaluate all compiled `plans` at the same time.
+
+    Every node carries the set of (plan, step) states that reached it. Subtrees
+    no state can reach are never visited, so `$.info` does not descend into
+    `$.paths`, while recursive descent keeps its state alive all the way down.
+    Matches are yielded as they are found, so nothing is copied or collected.
+
+    Args:
+        root (Any): The document.
+        plans (List[Tuple[_Step, ...]]): Compiled expressions.
+        cyclic (bool, optional): Whether the document may contain cycles (a
+            resolved view). Containers that are their own ancestor are then
+            skipped. Defaults to False.
+        with_paths (bool, optional): Yield (path, match) pairs, where the path is
+            the tuple of keys leading to the match. Defaults to False.
+
+    Yields:
+        Tuple[int, Any]: The index of the plan and a match, in document order.
+    """
+    # plans ending in `~` match the key of the node their other steps reach, at
+    # the path of that node
+    names_only = [bool(plan) and plan[-1][1] is _PROPERTY_NAME for plan in plans]
+    ends = [len(plan) - names for plan, names in zip(plans, names_only)]
+    track = with_paths or any(names_only)
+    ancestors = set()
+    # a path is kept as a (key, parent path) linked list while walking and
+    # only turned into a tuple for matches
+    stack = [(root, [(index, 0) for index in range(len(plans))], None)]
+    while stack:
+        node, states, link = stack.pop()
+        if node is _EXIT:
+            ancestors.discard(states)
+            continue
+        if cyclic and id(node) in ancestors:
+            continue
+
+        active = []
+        for state in states:
+            plan_index = state[0]
+            if state[1] != ends[plan_index]:
+                active.append(state)
+            elif names_only[plan_index]:
+                if link is not None:
+                    yield (
+                        plan_index,
+                        ((_link_keys(link), link[0]) if with_paths else link[0]),
+                    )
+            else:
+                yield plan_index, ((_link_keys(link), node) if with_paths else node)
+        if not active or not isinstance(node, _CONTAINER_TYPES):
+            continue
+
+        scan = False
+        for plan_index, step_index in active:
+            descendant, selector = plans[plan_index][step_index]
+            if descendant or selector.scans:
+                scan = True
+                break
+
+        children = []
+        if scan:
+            if isinstance(node, list):
+                items, size = enumerate(node), len(node)
+            else:
+                items, size = node.items(), None
+            for key, child in items:
+                is_container = isinstance(child, _CONTAINER_TYPES)
+                next_states = []
+                for plan_index, step_index in active:
+                    descendant, selector = plans[plan_index][step_index]
+                    if descendant and is_container:
+                        next_states.append((plan_index, step_index))
+                    if selector.matches(key, size, child, node):
+                        next_states.append((plan_index, step_index + 1))
+                if next_states:
+                    if len(next_states) > 1:
+                        next_states = list(dict.fromkeys(next_states))
+                    children.append(
+                        (child, next_states, (key, link) if track else None)
+                    )
+        else:
+            grouped = {}
+            for plan_index, step_index in active:
+                selector = plans[plan_index][step_index][1]
+                for key, child in selector.lookup(node):
+                    grouped.setdefault(
+                        key, (child, [], (key, link) if track else None)
+                    )[1].append((plan_index, step_index + 1))
+            children = list(grouped.values())
+        if cyclic and children:
+            ancestors.add(id(node))
+            stack.append((_EXIT, id(node), None))
+        stack.extend(reversed(children))
+
+
+def _walk(
+    root: Any,
+    plans: List[Tuple[_Step, ...]],
+    cyclic: bool = False,
+    with_paths: bool = False,
+) -> List[List[Any]]:
+    """Collect the matches of `_iter_walk` per plan.
+
+    Args:
+        root (Any): The document.
+        plans (List[Tuple[_Step, ...]]): Compiled expressions.
+        cyclic (bool, optional): Whether the document may contain cycles.
+            Defaults to False.
+        with_paths (bool, optional): Collect (path, match) pairs. Defaults to False.
+
+    Returns:
+        List[List[Any]]: Matches per plan, in document order.
+    """
+    results = [[] for _ in plans]
+    for plan_index, match in _iter_walk(root, plans, cyclic, with_paths):
+        results[plan_index].append(match)
+    return results
+
+
+def _link_keys(link: Optional[Tuple]) -> Tuple:
+    keys = []
+    while link is not None:
+        key, link = link
+        keys.append(key)
+    return tuple(reversed(keys))
+
+
+def format_path(keys: Iterable[Any]) -> str:
+    """Render the keys leading to a node as a JSONPath expression.
+
+    Args:
+        keys (Iterable[Any]): Object keys and array indices, from the root down.
+
+    Returns:
+        str: The path, e.g. `$.paths['/users'].get.tags[0]`.
+    """
+    out = "$"
+    for key in keys:
+        if isinstance(key, int):
+            out += f"[{key}]"
+        elif _DOT_NAME_PATTERN.fullmatch(key):
+            out += f".{key}"
+        else:
+            out += f"[{key!r}]"
+    return out
+
+
+def _unescape(token: str) -> str:
+    return unquote(token).replace("~1", "/").replace("~0", "~")
+
+
+class RefResolver:
+    """Resolves internal and local-file `$ref`s into a resolved view of a document.
+
+    Every reference target is looked up once per (file, JSON pointer) and
+    resolved once; all references to it share the same resolved node, so a
+    schema used by thousands of operations exists once in memory. Subtrees
+    without references are shared with the original document. Reference
+    cycles become cycles in the resolved view instead of infinite recursion,
+    and references that cannot be resolved are left as they are.
+    """
+
+    def __init__(
+        self,
+        document: Any,
+        base_path: Optional[Path] = None,
+        documents: Optional[Dict[Path, Any]] = None,
+    ):
+        """Initialize the resolver.
+
+        Args:
+            document (Any): The root document.
+            base_path (Optional[Path], optional): Path of the root document, used
+                to find files referenced by relative paths. Defaults to None.
+            documents (Optional[Dict[Path, Any]], optional): Referenced files that
+                are loaded already, by resolved path, e.g. from
+                `stinky.noodle.utils.bundle.BundleLoader.load`. Other files are
+                loaded when first referenced. Defaults to None.
+        """
+        self.base_path = Path(base_path).resolve() if base_path else None
+        self.documents: Dict[Optional[Path], Any] = dict(documents or {})
+        self.documents[self.base_path] = document
+        self._targets: Dict[Tuple[Optional[Path], str], Tuple[Optional[Path], Any]] = {}
+        self._resolved: Dict[int, Any] = {}
+        self._has_ref: Dict[int, bool] = {}
+
+    def _load(self, path: Path) -> Any:
+        if path not in self.documents:
+            self.documents[path] = load_document(path)
+        return self.documents[path]
+
+    def _lookup(self, source: Optional[Path], ref: str) -> Tuple[Optional[Path], Any]:
+        """Find the raw node a reference points at, memoized per (file, pointer).
+
+        Args:
+            source (Optional[Path]): File that contains the reference.
+            ref (str): The reference, e.g. `#/components/schemas/User` or
+                `./schemas.yaml#/User`.
+
+        Raises:
+            LookupError: Raised when the reference cannot be resolved.
+
+        Returns:
+            Tuple[Optional[Path], Any]: File that contains the target, and the target.
+        """
+        location, _, pointer = ref.partition("#")
+        if location:
+            if "://" in location:
+                raise LookupError(f"Remote reference {ref} is not supported.")
+            if source is None:
+                raise LookupError(f"Relative reference {ref} needs a base path.")
+            source = (source.parent / location).resolve()
+
+        key = (source, pointer)
+        if key not in self._targets:
+            try:
+                node = self._load(source) if location else self.documents[source]
+                for token in pointer.split("/")[1:]:
+                    token = _unescape(token)
+                    node = node[int(token)] if isinstance(node, list) else node[token]
+            except (KeyError, IndexError, ValueError, OSError) as exception:
+                raise LookupError(f"Unable to resolve {ref}: {exception}")
+            self._targets[key] = (source, node)
+        return self._targets[key]
+
+    def _contains_ref(self, node: Any) -> bool:
+        """Tell whether a raw node contains a reference, memoized per node.
+
+        Walks the node with an explicit stack, children before their parent, so
+        deeply nested documents do not hit the recursion limit.
+
+        Args:
+            node (Any): A raw node.
+
+        Returns:
+            bool: Whether the node or any node below it is a reference.
+        """
+        has_ref = self._has_ref
+        entered = set()
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            key = id(current)
+            if key in has_ref:
+                stack.pop()
+                continue
+            if isinstance(current, dict):
+                children = list(current.values())
+            elif isinstance(current, list):
+                children = current
+            else:
+                has_ref[key] = False
+                stack.pop()
+                continue
+            if key not in entered:
+                entered.add(key)
+                # children that are being entered already close a cycle
+                stack.extend(
+                    child
+                    for child in children
+                    if id(child) not in has_ref and id(child) not in entered
+                )
+                continue
+            stack.pop()
+            has_ref[key] = (
+                isinstance(current, dict) and isinstance(current.get("$ref"), str)
+            ) or any(has_ref.get(id(child), False) for child in children)
+        return has_ref[id(node)]
+
+    def _follow(self, source: Optional[Path], node: Any) -> Tuple[Optional[Path], Any]:
+        """Follow a (chain of) reference(s) to the first node that is not a reference.
+
+        Args:
+            source (Optional[Path]): File that contains `node`.
+            node (Any): A raw node.
+
+        Returns:
+            Tuple[Optional[Path], Any]: File and raw node at the end of the chain,
+                or the last reference when the chain cannot be followed.
+        """
+        seen = set()
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            if id(node) in seen:
+                logger.warning(f"Reference cycle through {node['$ref']}, not resolved.")
+                break
+            seen.add(id(node))
+            try:
+                source, node = self._lookup(source, node["$ref"])
+            except LookupError as exception:
+                logger.warning(str(exception))
+                break
+        return source, node
+
+    def _enter(
+        self, source: Optional[Path], node: Any
+    ) -> Tuple[Any, Optional[Tuple[Optional[Path], Any]]]:
+        """Get the resolved node for a raw node, or an empty one to fill.
+
+        Args:
+            source (Optional[Path]): File that contains `node`.
+            node (Any): A raw node.
+
+        Returns:
+            Tuple[Any, Optional[Tuple[Optional[Path], Any]]]: The resolved node,
+                and the file and raw node to fill it from if it is new.
+        """
+        source, node = self._follow(source, node)
+        if not self._contains_ref(node) or (
+            isinstance(node, dict) and isinstance(node.get("$ref"), str)
+        ):
+            return node, None
+        if id(node) in self._resolved:
+            return self._resolved[id(node)], None
+        # registered before the children are resolved, so cycles point back here
+        out = self._resolved[id(node)] = {} if isinstance(node, dict) else []
+        return out, (source, node)
+
+    def _resolve(self, source: Optional[Path], node: Any) -> Any:
+        """Resolve a raw node, filling new containers from an explicit stack.
+
+        Args:
+            source (Optional[Path]): File that contains `node`.
+            node (Any): A raw node.
+
+        Returns:
+            Any: The resolved node.
+        """
+        resolved, pending = self._enter(source, node)
+        stack = [] if pending is None else [(pending, resolved)]
+        while stack:
+            (source, node), out = stack.pop()
+            children = node.items() if isinstance(node, dict) else enumerate(node)
+            for key, child in children:
+                value, pending = self._enter(source, child)
+                if isinstance(out, dict):
+                    out[key] = value
+                else:
+                    out.append(value)
+                if pending is not None:
+                    stack.append((pending, value))
+        return resolved
+
+    def resolve(self) -> Any:
+        """Build the resolved view of the root document.
+
+        Returns:
+            Any: The resolved document, which may contain cycles.
+        """
+        return self._resolve(self.base_path, self.documents[self.base_path])
+
+
+def escape_pointer_token(token: Any) -> str:
+    """Escape a key for use in a JSON pointer.
+
+    Args:
+        token (Any): The key or index.
+
+    Returns:
+        str: The escaped token.
+    """
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def format_pointer(keys: Iterable[Any]) -> str:
+    """Render the keys leading to a node as a JSON pointer.
+
+    Args:
+        keys (Iterable[Any]): Object keys and array indices, from the root down.
+
+    Returns:
+        str: The pointer, e.g. `/paths/~1users/get/tags/0`.
+    """
+    return "".join(f"/{escape_pointer_token(key)}" for key in keys)
+
+
+class Match(NamedTuple):
+    """A node matched by a JSONPath expression: where it is and the node itself.
+
+    The node is a reference into the document, not a copy. `keys` is None for
+    matches of expressions evaluated with `pyjsonpath`, which reports no paths.
+    """
+
+    keys: Optional[Tuple]
+    node: Any
+
+    @property
+    def pointer(self) -> Optional[str]:
+        """Get the JSON pointer of the node, e.g. `/paths/~1users/get`.
+
+        Returns:
+            Optional[str]: The pointer, None if the keys are not known.
+        """
+        return None if self.keys is None else format_pointer(self.keys)
+
+
+# Sections whose members are reusable objects (OpenAPI 3 and Swagger 2), with the
+# number of pointer tokens that identify a single object
+_REUSABLE_SECTIONS = {
+    "components": 3,
+    "definitions": 2,
+    "parameters": 2,
+    "responses": 2,
+    "securityDefinitions": 2,
+}
+
+
+def _owner(tokens: List[str]) -> Optional[str]:
+    """Get the reusable object a location belongs to.
+
+    Args:
+        tokens (List[str]): Unescaped tokens of the location.
+
+    Returns:
+        Optional[str]: Pointer of the reusable object, None outside reusable sections.
+    """
+    size = _REUSABLE_SECTIONS.get(tokens[0]) if tokens else None
+    if size is None or len(tokens) < size:
+        return None
+    return "#/" + "/".join(escape_pointer_token(token) for token in tokens[:size])
+
+
+class ReferenceIndex:
+    """Reverse index of the internal references in a document, built in one walk.
+
+    `references` maps every referenced pointer to the locations of the
+    `$ref`s pointing at it. A reusable object is `reachable` if it is
+    referenced from outside the reusable sections, or from another reachable
+    reusable object; objects only used by unused objects are not reachable.
+    """
+
+    def __init__(self, document: Any):
+        """Build the index.
+
+        Args:
+            document (Any): The (unresolved) document.
+        """
+        self.references: Dict[str, List[str]] = {}
+        edges: Dict[Optional[str], Set[str]] = {}
+        stack = [(document, "#")]
+        while stack:
+            node, location = stack.pop()
+            if isinstance(node, dict):
+                ref = node.get("$ref")
+                if isinstance(ref, str) and ref.startswith("#"):
+                    tokens = [_unescape(token) for token in ref[1:].split("/")[1:]]
+                    target = "#" + "".join(
+                        "/" + escape_pointer_token(token) for token in tokens
+                    )
+                    self.references.setdefault(target, []).append(location)
+                    source = _owner(
+                        [_unescape(token) for token in location.split("/")[1:]]
+                    )
+                    edges.setdefault(source, set()).add(_owner(tokens) or target)
+                children = node.items()
+            elif isinstance(node, list):
+                children = enumerate(node)
+            else:
+                continue
+            stack.extend(
+                (child, f"{location}/{escape_pointer_token(key)}")
+                for key, child in children
+            )
+
+        self.reachable: Set[str] = set()
+        pending = list(edges.get(None, ()))
+        while pending:
+            owner = pending.pop()
+            if owner not in self.reachable:
+                self.reachable.add(owner)
+                pending.extend(edges.get(owner, ()))
+
+    def is_referenced(self, pointer: str) -> bool:
+        """Check whether a reusable object is (transitively) in use.
+
+        Args:
+            pointer (str): Pointer of the object, e.g. `#/components/schemas/User`.
+
+        Returns:
+            bool: Whether the object is reachable from the rest of the document.
+        """
+        return pointer in self.reachable
 
 
 class Parser:
-    def __init__(self, specs: Dict):
+    def __init__(
+        self,
+        specs: Dict,
+        resolve_refs: bool = False,
+        base_path: Optional[Path] = None,
+        documents: Optional[Dict[Path, Any]] = None,
+    ):
+        """Initialize the parser.
+
+        Args:
+            specs (Dict): The parsed specs, or a lazy document from
+                `stinky.noodle.utils.lazy.read_json_lazy`.
+            resolve_refs (bool, optional): Query a view of the specs in which
+                internal and local-file `$ref`s are resolved. Defaults to False.
+            base_path (Optional[Path], optional): Path of the spec file, used to
+                resolve references to other files. Defaults to None.
+            documents (Optional[Dict[Path, Any]], optional): The files the spec
+                references, loaded already by resolved path, e.g. with
+                `stinky.noodle.utils.bundle.BundleLoader`. Defaults to None.
+        """
+        self.raw_specs = specs
+        self.resolve_refs = resolve_refs
+        if resolve_refs:
+            specs = RefResolver(
+                materialize(specs), base_path=base_path, documents=documents
+            ).resolve()
         self.specs = specs
+        self.lazy = isinstance(specs, LazyObject)
+        self._reference_index: Optional[ReferenceIndex] = None
+
+    def reference_index(self) -> ReferenceIndex:
+        """Get the reference index of the specs, built on first use.
+
+        Returns:
+            ReferenceIndex: The index, shared by every rule that needs it.
+        """
+        if self._reference_index is None:
+            self._reference_index = ReferenceIndex(materialize(self.raw_specs))
+        return self._reference_index
 
     def find_objects(self, json_expr: str) -> Union[List[Any], Dict]:
-        """_summary_
+        """Find all objects in the specs matching a JSONPath expression.
+
+        Args:
+            json_expr (str): The JSONPath expression.
+
+        Returns:
+            Union[List[Any], Dict]: The matching objects.
+        """
+        return self.find_objects_many([json_expr])[json_expr]
+
+    def find_objects_many(self, json_exprs: Iterable[str]) -> Dict[str, List[Any]]:
+        """Find the objects matching each of `json_exprs` in a single walk of the specs.
+
+        Expressions the single-pass evaluator does not support (e.g. script
+        expressions) are evaluated one by one with `pyjsonpath` instead. For lazy documents
+        only the subtrees reached by the expressions are parsed; matches are
+        always returned as plain objects.
 
         Args:
-            json_expr (str): _description_
+            json_exprs (Iterable[str]): The JSONPath expressions.
 
         Returns:
-            Union[List[Any], Dict]: _description_
+            Dict[str, List[Any]]: The matching objects per expression.
         """
-        return JsonPath(self.specs, json_expr).load()
+        return self._find_many(json_exprs, with_paths=False)
+
+    def find_matches_many(
+        self, json_exprs: Iterable[str]
+    ) -> Dict[str, List[Tuple[Tuple, Any]]]:
+        """Like `find_objects_many`, but with the path of every match.
+
+        Paths are tuples of object keys and array indices (see `format_path`).
+        `pyjsonpath` does not report paths (and returns copies of the matches),
+        so matches of expressions evaluated with it have the path None.
+
+        Args:
+            json_exprs (Iterable[str]): The JSONPath expressions.
+
+        Returns:
+            Dict[str, List[Tuple[Tuple, Any]]]: (path, object) pairs per expression.
+        """
+        return self._find_many(json_exprs, with_paths=True)
+
+    def iter_matches(self, json_expr: str) -> Iterator[Match]:
+        """Yield the matches of a JSONPath expression as they are found.
+
+        Unlike `find_matches_many`, nothing is collected, so a caller that
+        stops early does not walk the rest of the specs.
+
+        Args:
+            json_expr (str): The JSONPath expression.
+
+        Yields:
+            Match: Every match, in document order.
+        """
+        for _, match in self.iter_matches_many([json_expr]):
+            yield match
+
+    def iter_matches_many(
+        self, json_exprs: Sequence[str]
+    ) -> Iterator[Tuple[int, Match]]:
+        """Yield the matches of several JSONPath expressions from a single walk.
+
+        Matches refer to the nodes of the specs, nothing is copied (except for
+        lazy documents, whose matches are parsed into plain objects). Matches
+        of expressions evaluated with `pyjsonpath` are copies without keys,
+        come first, and are found in the specs without resolved references.
+
+        Args:
+            json_exprs (Sequence[str]): The JSONPath expressions.
+
+        Yields:
+            Tuple[int, Match]: The index of the expression in `json_exprs` and a
+                match, in document order per expression.
+        """
+        positions, plans = [], []
+        for position, json_expr in enumerate(json_exprs):
+            try:
+                plans.append(compile_expression(json_expr))
+                positions.append(position)
+            except UnsupportedExpressionError:
+                from pyjsonpath import JsonPath
+
+                for node in JsonPath(self._fallback_specs(json_expr), json_expr).load():
+                    yield position, Match(None, node)
+        if not plans:
+            return
+
+        for plan_index, (keys, node) in _iter_walk(
+            self.specs, plans, cyclic=self.resolve_refs, with_paths=True
+        ):
+            yield (
+                positions[plan_index],
+                Match(keys, materialize(node) if self.lazy else node),
+            )
+
+    def _fallback_specs(self, json_expr: str) -> Any:
+        """Get the document to evaluate an expression on with `pyjsonpath`.
+
+        `pyjsonpath` recurses into the document without detecting cycles, so it
+        gets the specs as they are, without resolved references.
+
+        Args:
+            json_expr (str): The expression, for the warning.
+
+        Returns:
+            Any: The plain, unresolved specs.
+        """
+        if self.resolve_refs:
+            logger.warning(
+                f"{json_expr} is evaluated with pyjsonpath, without resolving $refs."
+            )
+        return materialize(self.raw_specs)
+
+    def _find_many(self, json_exprs: Iterable[str], with_paths: bool) -> Dict:
+        out = {}
+        compiled_exprs, plans, specs = [], [], None
+        for json_expr in dict.fromkeys(json_exprs):
+            try:
+                plans.append(compile_expression(json_expr))
+                compiled_exprs.append(json_expr)
+            except UnsupportedExpressionError:
+                from pyjsonpath import JsonPath
+
+                if specs is None:
+                    specs = self._fallback_specs(json_expr)
+                matches = JsonPath(specs, json_expr).load()
+                if with_paths:
+                    matches = [(None, match) for match in matches]
+                out[json_expr] = matches
+
+        if plans:
+            results = _walk(
+                self.specs, plans, cyclic=self.resolve_refs, with_paths=with_paths
+            )
+            if self.lazy and with_paths:
+                results = [
+                    [(keys, materialize(match)) for keys, match in matches]
+                    for matches in results
+                ]
+            elif self.lazy:
+                results = [
+                    [materialize(match) for match in matches] for matches in results
+                ]
+            out.update(zip(compiled_exprs, results))
+        return out
@@ -0,0 +1,274 @@
+import hashlib
+import inspect
+import json
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+import stinky
+from stinky.noodle.utils import builtins, sanitize_callable_name
+from stinky.noodle.utils.exceptions import NonExistentCallableError
+from stinky.noodle.utils.parser import normalize_expression
+from stinky.noodle.utils.ruleset import RuleSetModel, ThenModel
+
+# Spectral severities, most severe first
+SEVERITIES = ("error", "warn", "info", "hint")
+
+
+def severity_rank(severity: str) -> int:
+    """Rank a severity, 0 being the most severe.
+
+    Args:
+        severity (str): A name from `SEVERITIES`, or Spectral's numeric form
+            (`0` for error to `3` for hint).
+
+    Returns:
+        int: The rank. Unknown severities rank as `warn`, Spectral's default.
+    """
+    if severity in SEVERITIES:
+        return SEVERITIES.index(severity)
+    if str(severity).isdigit() and int(severity) < len(SEVERITIES):
+        return int(severity)
+    return SEVERITIES.index("warn")
+
+
+class Clause(NamedTuple):
+    rule_name: str
+    given: str
+    then: ThenModel
+
+
+class CompiledClause(NamedTuple):
+    rule_name: str
+    given: str
+    severity: str
+    message: str
+    function: str
+    field: Optional[str]
+    checker: builtins.Checker
+    fingerprint: str = ""
+
+
+class MatchPlan:
+    """All `then` clauses of a ruleset, grouped by normalized `given` path.
+
+    Each distinct path only has to be evaluated once against the specs, after
+    which its matches are dispatched to every clause in its group.
+    """
+
+    def __init__(self, ruleset_instance: RuleSetModel):
+        self.groups: Dict[str, List[Clause]] = {}
+        self.given_count = 0
+        for rule_name, rule_instance in ruleset_instance.rules.items():
+            then = rule_instance.then
+            if not isinstance(then, list):
+                then = [then]
+            for given_path in rule_instance.given:
+                self.given_count += 1
+                group = self.groups.setdefault(normalize_expression(given_path), [])
+                group.extend(
+                    Clause(rule_name, given_path, then_case) for then_case in then
+                )
+
+    @property
+    def saved_evaluations(self) -> int:
+        """Number of path evaluations saved by grouping identical givens.
+
+        Returns:
+            int: Givens across all rules minus distinct normalized givens.
+        """
+        return self.given_count - len(self.groups)
+
+
+class ExecutionPlan(NamedTuple):
+    """Immutable, picklable result of compiling a ruleset.
+
+    Callables are resolved and prepared with their options, and clauses are
+    grouped by normalized `given` path, so nothing has to be looked up while
+    matching.
+    """
+
+    groups: Tuple[Tuple[str, Tuple[CompiledClause, ...]], ...]
+    given_count: int
+    # the ruleset file and the files it extends, when compiled from files
+    sources: Tuple[str, ...] = ()
+
+    @property
+    def saved_evaluations(self) -> int:
+        """Number of path evaluations saved by grouping identical givens.
+
+        Returns:
+            int: Givens across all rules minus distinct normalized givens.
+        """
+        return self.given_count - len(self.groups)
+
+
+def filter_severity(plan: ExecutionPlan, min_severity: str) -> ExecutionPlan:
+    """Drop the clauses that are less severe than `min_severity`.
+
+    Given paths left without clauses are dropped too, so they are never matched.
+
+    Args:
+        plan (ExecutionPlan): The compiled plan.
+        min_severity (str): The least severe severity to keep, e.g. `warn`.
+
+    Returns:
+        ExecutionPlan: The filtered plan.
+    """
+    max_rank = severity_rank(min_severity)
+    groups, givens = [], set()
+    for given_path, clauses in plan.groups:
+        kept = tuple(
+            clause for clause in clauses if severity_rank(clause.severity) <= max_rank
+        )
+        if kept:
+            groups.append((given_path, kept))
+            givens.update((clause.rule_name, clause.given) for clause in kept)
+    return plan._replace(groups=tuple(groups), given_count=len(givens))
+
+
+def resolve_callable(
+    callable_name: str, custom_callables: Optional[Dict[str, Callable]] = None
+) -> Callable:
+    """Get a builtin or custom callable by its (JS) name.
+
+    Args:
+        callable_name (str): Name of the callable, e.g. `casing`.
+        custom_callables (Optional[Dict[str, Callable]], optional): Custom
+            callable names mapped to callables. Defaults to None.
+
+    Raises:
+        NonExistentCallableError: Raised when the callable is neither a builtin
+            nor a custom callable.
+
+    Returns:
+        Callable: The callable.
+    """
+    sanitized_callable_name = sanitize_callable_name(callable_name)
+    try:
+        return getattr(builtins, sanitized_callable_name)
+    except AttributeError:
+        logger.debug(
+            f"Callabel with name: {callable_name} is not a built-in. Trying custom callables."
+        )
+
+    sanitized_callable_name = sanitize_callable_name(callable_name, custom=True)
+    try:
+        return (custom_callables or {})[sanitized_callable_name]
+    except KeyError:
+        logger.debug(
+            f'Callabel with name: "{callable_name}" is not a custom callable either.'
+        )
+        raise NonExistentCallableError(f'Callable "{callable_name}" does not exist.')
+
+
+def callable_version(func: Callable) -> str:
+    """Describe the version of a callable, for cache invalidation.
+
+    Builtins are versioned with the package. Custom callables use their own or
+    their module's `__version__` when set, plus a hash of their code, so
+    editing a custom callable also invalidates its cached results.
+
+    Args:
+        func (Callable): The builtin or custom callable.
+
+    Returns:
+        str: The version description.
+    """
+    if getattr(builtins, getattr(func, "__name__", ""), None) is func:
+        return f"builtin:{stinky.__version__}"
+
+    module = inspect.getmodule(func)
+    version = getattr(func, "__version__", None) or getattr(module, "__version__", None)
+    code = getattr(func, "__code__", None)
+    code_hash = None
+    if code is not None:
+        code_hash = hashlib.sha256(
+            code.co_code + repr(code.co_consts).encode()
+        ).hexdigest()
+    name = getattr(func, "__qualname__", repr(func))
+    return f"custom:{getattr(module, '__name__', None)}.{name}:{version}:{code_hash}"
+
+
+def clause_fingerprint(then_case: ThenModel, func: Callable) -> str:
+    """Fingerprint everything that determines the result of a clause for an object.
+
+    Args:
+        then_case (ThenModel): The `then` clause.
+        func (Callable): Its resolved callable.
+
+    Returns:
+        str: sha256 hex digest.
+    """
+    payload = json.dumps(
+        [
+            then_case.function,
+            then_case.field,
+            then_case.functionOptions,
+            callable_version(func),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def compile_ruleset(
+    ruleset_instance: RuleSetModel,
+    custom_callables: Optional[Dict[str, Callable]] = None,
+) -> ExecutionPlan:
+    """Compile a ruleset into an execution plan.
+
+    Args:
+        ruleset_instance (RuleSetModel): The ruleset.
+        custom_callables (Optional[Dict[str, Callable]], optional): Custom
+            callable names mapped to callables. Defaults to None.
+
+    Raises:
+        NonExistentCallableError: Raised when any of the rules uses a function
+            that does not exist. All unknown functions are reported at once.
+
+    Returns:
+        ExecutionPlan: The compiled plan.
+    """
+    match_plan = MatchPlan(ruleset_instance)
+    rules = ruleset_instance.rules
+    resolved, unknown = {}, []
+    for clauses in match_plan.groups.values():
+        for clause in clauses:
+            function = clause.then.function
+            if function in resolved or function in unknown:
+                continue
+            try:
+                resolved[function] = resolve_callable(function, custom_callables)
+            except NonExistentCallableError:
+                unknown.append(function)
+    if unknown:
+        raise NonExistentCallableError(
+            f"Callables do not exist: {', '.join(repr(name) for name in unknown)}."
+        )
+
+    groups = []
+    for given_path, clauses in match_plan.groups.items():
+        compiled_clauses = []
+        for clause in clauses:
+            then_case = clause.then
+            rule_instance = rules[clause.rule_name]
+            compiled_clauses.append(
+                CompiledClause(
+                    rule_name=clause.rule_name,
+                    given=clause.given,
+                    severity=rule_instance.severity,
+                    message=rule_instance.message,
+                    function=then_case.function,
+                    field=then_case.field,
+                    checker=builtins.prepare(
+                        resolved[then_case.function], then_case.functionOptions
+                    ),
+                    fingerprint=clause_fingerprint(
+                        then_case, resolved[then_case.function]
+                    ),
+                )
+            )
+        groups.append((given_path, tuple(compiled_clauses)))
+    return ExecutionPlan(groups=tuple(groups), given_count=match_plan.given_count)
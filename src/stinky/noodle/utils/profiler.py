@@ -0,0 +1,246 @@
+import heapq
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from stinky.noodle.utils.parser import format_path
+
+
+class Profiler:
+    """Collects where the time of a lint goes.
+
+    For every distinct `given` path: the wall time spent matching it and the
+    number of matches; for every `then` clause and every function: the time
+    spent checking and the number of calls; and the slowest single checks.
+    Matching is timed with one walk of the specs per given path, so a profiled
+    run does not share walks between givens and is slower than a normal run.
+
+    Profilers of several files or processes can be merged, and exported as a
+    table, as json, or as a Chrome trace (`chrome://tracing`, Perfetto).
+    """
+
+    def __init__(self, slowest: int = 20):
+        """Initialize the profiler.
+
+        Args:
+            slowest (int, optional): Number of slowest checks to keep. Defaults to 20.
+        """
+        self.slowest_count = slowest
+        self.givens: Dict[str, Dict[str, Any]] = {}
+        self.clauses: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+        self.slowest: List[Tuple[float, int, Tuple]] = []
+        self.events: List[Dict[str, Any]] = []
+        self._calls = 0  # tie breaker in the heap
+
+    def _event(self, name: str, category: str, start: float, seconds: float, **args):
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": seconds * 1e6,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": args,
+            }
+        )
+
+    def record_match(
+        self,
+        given: str,
+        rules: Iterable[str],
+        start: float,
+        seconds: float,
+        matches: int,
+    ):
+        """Record the matching of a given path.
+
+        Args:
+            given (str): The normalized given path.
+            rules (Iterable[str]): Names of the rules that use it.
+            start (float): `time.perf_counter()` when matching started.
+            seconds (float): Time spent matching.
+            matches (int): Number of matches.
+        """
+        stats = self.givens.setdefault(
+            given, {"seconds": 0.0, "matches": 0, "rules": {}}
+        )
+        stats["seconds"] += seconds
+        stats["matches"] += matches
+        stats["rules"].update(dict.fromkeys(rules))
+        self._event(f"match {given}", "match", start, seconds, matches=matches)
+
+    def record_check(
+        self,
+        rule: str,
+        given: str,
+        function: str,
+        start: float,
+        seconds: float,
+        calls: int,
+    ):
+        """Record the checks of a `then` clause on all matches of its given path.
+
+        Args:
+            rule (str): Name of the rule.
+            given (str): The given path, as written in the rule.
+            function (str): Name of the function.
+            start (float): `time.perf_counter()` when checking started.
+            seconds (float): Time spent checking.
+            calls (int): Number of checked objects.
+        """
+        stats = self.clauses.setdefault(
+            (rule, given, function), {"seconds": 0.0, "calls": 0}
+        )
+        stats["seconds"] += seconds
+        stats["calls"] += calls
+        self._event(f"{rule} {function}", "check", start, seconds, calls=calls)
+
+    def record_call(
+        self,
+        rule: str,
+        function: str,
+        keys: Optional[Tuple],
+        seconds: float,
+    ):
+        """Record a single check, kept if it is among the slowest.
+
+        Args:
+            rule (str): Name of the rule.
+            function (str): Name of the function.
+            keys (Optional[Tuple]): Keys leading to the checked object.
+            seconds (float): Time spent checking.
+        """
+        self._calls += 1
+        entry = (seconds, self._calls, (rule, function, keys))
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, entry)
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def merge(self, other: "Profiler"):
+        """Add the measurements of another profiler, e.g. of a worker process.
+
+        Args:
+            other (Profiler): The other profiler.
+        """
+        for given, stats in other.givens.items():
+            own = self.givens.setdefault(
+                given, {"seconds": 0.0, "matches": 0, "rules": {}}
+            )
+            own["seconds"] += stats["seconds"]
+            own["matches"] += stats["matches"]
+            own["rules"].update(stats["rules"])
+        for key, stats in other.clauses.items():
+            own = self.clauses.setdefault(key, {"seconds": 0.0, "calls": 0})
+            own["seconds"] += stats["seconds"]
+            own["calls"] += stats["calls"]
+        for seconds, _, (rule, function, keys) in other.slowest:
+            self.record_call(rule, function, keys, seconds)
+        self.events.extend(other.events)
+
+    def functions(self) -> Dict[str, Dict[str, float]]:
+        """Get the time and calls per function, over all clauses that use it.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Seconds and calls per function name.
+        """
+        out = {}
+        for (_, _, function), stats in self.clauses.items():
+            own = out.setdefault(function, {"seconds": 0.0, "calls": 0})
+            own["seconds"] += stats["seconds"]
+            own["calls"] += stats["calls"]
+        return out
+
+    def to_json(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Export the measurements, every section sorted by time, slowest first.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: givens, clauses, functions and slowest.
+        """
+
+        def by_time(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return sorted(records, key=lambda record: -record["seconds"])
+
+        return {
+            "givens": by_time(
+                [
+                    {
+                        "given": given,
+                        "rules": list(stats["rules"]),
+                        "seconds": stats["seconds"],
+                        "matches": stats["matches"],
+                    }
+                    for given, stats in self.givens.items()
+                ]
+            ),
+            "clauses": by_time(
+                [
+                    {"rule": rule, "given": given, "function": function, **stats}
+                    for (rule, given, function), stats in self.clauses.items()
+                ]
+            ),
+            "functions": by_time(
+                [
+                    {"function": function, **stats}
+                    for function, stats in self.functions().items()
+                ]
+            ),
+            "slowest": by_time(
+                [
+                    {
+                        "rule": rule,
+                        "function": function,
+                        "path": None if keys is None else format_path(keys),
+                        "seconds": seconds,
+                    }
+                    for seconds, _, (rule, function, keys) in self.slowest
+                ]
+            ),
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Export the measurements as a Chrome trace.
+
+        Returns:
+            Dict[str, Any]: The trace, in the Trace Event Format.
+        """
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def table(self) -> str:
+        """Render the measurements as tables, slowest first.
+
+        Returns:
+            str: The tables.
+        """
+        report = self.to_json()
+        lines = [f"{'given':<60} {'ms':>10} {'matches':>9}  rules"]
+        for record in report["givens"]:
+            lines.append(
+                f"{record['given']:<60} {record['seconds'] * 1000:>10.2f} "
+                f"{record['matches']:>9}  {', '.join(record['rules'])}"
+            )
+        lines.append("")
+        lines.append(f"{'rule':<40} {'function':<20} {'ms':>10} {'calls':>9}  given")
+        for record in report["clauses"]:
+            lines.append(
+                f"{record['rule']:<40} {record['function']:<20} "
+                f"{record['seconds'] * 1000:>10.2f} {record['calls']:>9}  "
+                f"{record['given']}"
+            )
+        lines.append("")
+        lines.append(f"{'function':<40} {'ms':>10} {'calls':>9} {'us/call':>9}")
+        for record in report["functions"]:
+            per_call = record["seconds"] * 1e6 / max(record["calls"], 1)
+            lines.append(
+                f"{record['function']:<40} {record['seconds'] * 1000:>10.2f} "
+                f"{record['calls']:>9} {per_call:>9.1f}"
+            )
+        lines.append("")
+        lines.append(f"{'slowest checks':<40} {'function':<20} {'ms':>10}  path")
+        for record in report["slowest"]:
+            lines.append(
+                f"{record['rule']:<40} {record['function']:<20} "
+                f"{record['seconds'] * 1000:>10.3f}  {record['path']}"
+            )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,196 @@
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, TextIO, Type
+
+from loguru import logger
+
+import stinky
+
+
+class LintResult(NamedTuple):
+    """A single issue: a match that did not pass a `then` clause."""
+
+    rule: str
+    severity: str
+    message: str
+    path: str
+    function: str
+    # JSON pointer of the offending node, None when only the given path is known
+    pointer: Optional[str] = None
+
+
+class Reporter:
+    """Receives the results of a run and writes them in some format.
+
+    `result` is called for every result as soon as it is produced, `file` once
+    a spec is linted, and `close` at the end of the run.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream if stream is not None else sys.stdout
+
+    def result(self, spec_path: Path, result: LintResult):
+        pass
+
+    def file(self, spec_path: Path, results: Optional[List[LintResult]]):
+        """Report a linted spec.
+
+        Args:
+            spec_path (Path): Path to the spec file.
+            results (Optional[List[LintResult]]): Its results, None if it could
+                not be linted.
+        """
+
+    def close(self):
+        pass
+
+
+_LOG_LEVELS = {"error": "ERROR", "warn": "WARNING"}
+
+
+class TextReporter(Reporter):
+    """Logs every issue, a line per spec and a summary by severity."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        super().__init__(stream)
+        self.severities = Counter()
+        self.unlinted = 0
+
+    def file(self, spec_path: Path, results: Optional[List[LintResult]]):
+        if results is None:
+            self.unlinted += 1
+            logger.error(f"{spec_path}: could not be linted.")
+            return
+        for result in results:
+            logger.log(
+                _LOG_LEVELS.get(result.severity, "INFO"),
+                f"{spec_path}: {result.path}"
+                + (f" ({result.pointer})" if result.pointer is not None else "")
+                + f' rule "{result.rule}" ({result.severity}) '
+                f'failed with func "{result.function}": {result.message}',
+            )
+        self.severities.update(result.severity for result in results)
+        if results:
+            logger.error(f"{spec_path}: {len(results)} issues.")
+        else:
+            logger.success(f"{spec_path}: no issues.")
+
+    def close(self):
+        total = sum(self.severities.values())
+        if total == 0 and self.unlinted == 0:
+            logger.success("[Linting finished] Validation succeeded. No issues found.")
+            return
+        by_severity = ", ".join(
+            f"{count} {severity}" for severity, count in sorted(self.severities.items())
+        )
+        logger.error(
+            f"[Linting finished] Validation did not succeed, found {total} issues"
+            + (f" ({by_severity})" if by_severity else "")
+            + (f", {self.unlinted} files could not be linted" if self.unlinted else "")
+            + "."
+        )
+
+
+def _record(spec_path: Path, result: LintResult) -> Dict:
+    return {"file": str(spec_path), **result._asdict()}
+
+
+class JSONReporter(Reporter):
+    """Writes all results as one json array at the end of the run."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        super().__init__(stream)
+        self.records: List[Dict] = []
+
+    def file(self, spec_path: Path, results: Optional[List[LintResult]]):
+        self.records.extend(_record(spec_path, result) for result in results or [])
+
+    def close(self):
+        json.dump(self.records, self.stream, indent=2)
+        self.stream.write("\n")
+
+
+class NDJSONReporter(Reporter):
+    """Streams every result as a json line as soon as it is produced."""
+
+    def result(self, spec_path: Path, result: LintResult):
+        self.stream.write(json.dumps(_record(spec_path, result)) + "\n")
+        self.stream.flush()
+
+
+_SARIF_LEVELS = {"error": "error", "warn": "warning", "info": "note", "hint": "note"}
+
+
+class SARIFReporter(Reporter):
+    """Writes a SARIF 2.1.0 log at the end of the run, e.g. for code scanning."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        super().__init__(stream)
+        self.results: List[Dict] = []
+        self.rules: Dict[str, None] = {}
+        self.unlinted: List[str] = []
+
+    def file(self, spec_path: Path, results: Optional[List[LintResult]]):
+        if results is None:
+            self.unlinted.append(str(spec_path))
+            return
+        for result in results:
+            self.rules.setdefault(result.rule, None)
+            self.results.append(
+                {
+                    "ruleId": result.rule,
+                    "level": _SARIF_LEVELS.get(result.severity, "warning"),
+                    "message": {"text": result.message},
+                    "locations": [
+                        {
+                            "physicalLocation": {
+                                "artifactLocation": {"uri": Path(spec_path).as_uri()}
+                            },
+                            "logicalLocations": [{"fullyQualifiedName": result.path}],
+                        }
+                    ],
+                    "properties": {"jsonPointer": result.pointer},
+                }
+            )
+
+    def close(self):
+        log = {
+            "version": "2.1.0",
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "runs": [
+                {
+                    "tool": {
+                        "driver": {
+                            "name": "stinky-noodle",
+                            "version": stinky.__version__,
+                            "rules": [{"id": rule} for rule in self.rules],
+                        }
+                    },
+                    "invocations": [
+                        {
+                            "executionSuccessful": not self.unlinted,
+                            "toolExecutionNotifications": [
+                                {
+                                    "level": "error",
+                                    "message": {"text": f"{path} could not be linted."},
+                                }
+                                for path in self.unlinted
+                            ],
+                        }
+                    ],
+                    "results": self.results,
+                }
+            ],
+        }
+        json.dump(log, self.stream, indent=2)
+        self.stream.write("\n")
+
+
+REPORTERS: Dict[str, Type[Reporter]] = {
+    "text": TextReporter,
+    "json": JSONReporter,
+    "ndjson": NDJSONReporter,
+    "sarif": SARIFReporter,
+}
@@ -1,7 +1,15 @@
-from typing import Any, Dict, List, Optional, Union
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from loguru import logger
 from pydantic import BaseModel
 
+import stinky
+from stinky.noodle.utils.exceptions import InvalidRulesetError
+from stinky.noodle.utils.loader import DocumentCache, parse_document
+
 
 class ThenModel(BaseModel):
     function: str
@@ -21,7 +29,288 @@ class RuleModel(BaseModel):
 class RuleSetModel(BaseModel):
     description: str
     formats: List[str]
-    aliases: Dict[str, str]
+    aliases: Dict[str, Union[str, List[str], Dict[str, Any]]]
     rules: Dict[str, RuleModel]
     functions: List[str]
     functionsDir: str
+
+
+SEVERITIES = ("error", "warn", "info", "hint", "off")
+EXTENDS_MODES = ("all", "recommended", "off")
+# `#Name` at the start of a given path, optionally followed by more path
+ALIAS_PATTERN = re.compile(r"^#([A-Za-z0-9_-]+)(.*)$", re.DOTALL)
+
+
+def _extends_entries(extends: Any, path: Path) -> List[Tuple[str, str]]:
+    if extends is None:
+        return []
+    if isinstance(extends, str):
+        extends = [extends]
+    entries = []
+    for entry in extends:
+        if isinstance(entry, str):
+            entries.append((entry, "recommended"))
+        elif (
+            isinstance(entry, list)
+            and len(entry) == 2
+            and isinstance(entry[0], str)
+            and entry[1] in EXTENDS_MODES
+        ):
+            entries.append((entry[0], entry[1]))
+        else:
+            raise InvalidRulesetError(
+                f"{path}: invalid extends entry {entry!r}, expected a path or "
+                f"[path, {' | '.join(EXTENDS_MODES)}]."
+            )
+    return entries
+
+
+def _override_rule(name: str, base: Optional[Dict], override: Any, path: Path) -> Dict:
+    if isinstance(override, dict):
+        return dict(override) if base is None else {**base, **override}
+    if base is None:
+        raise InvalidRulesetError(
+            f"{path}: rule {name!r} is overridden, but no extended ruleset defines it."
+        )
+    if isinstance(override, bool):
+        if not override:
+            return dict(base, severity="off")
+        severity = base.get("severity", "warn")
+        return dict(base, severity="warn" if severity == "off" else severity)
+    if override in SEVERITIES:
+        return dict(base, severity=override)
+    raise InvalidRulesetError(
+        f"{path}: invalid override {override!r} of rule {name!r}, expected a rule, "
+        f"a boolean or one of {', '.join(SEVERITIES)}."
+    )
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _file_digest(path: Path) -> Optional[str]:
+    try:
+        with open(path, "rb") as fp:
+            return _digest(fp.read())
+    except OSError:
+        return None
+
+
+def _resolve_extends(
+    path: Path,
+    cache: Optional[DocumentCache],
+    resolved: Dict[Path, Dict],
+    chain: Tuple[Path, ...],
+    digests: Dict[Path, str],
+) -> Dict:
+    if path in chain:
+        cycle = " -> ".join(str(item) for item in (*chain, path))
+        raise InvalidRulesetError(f"Rulesets extend each other: {cycle}.")
+    if path in resolved:
+        return resolved[path]
+
+    try:
+        with open(path, "rb") as fp:
+            content = fp.read()
+    except OSError as exception:
+        raise InvalidRulesetError(f"Unable to read ruleset {path}: {exception}")
+    digests[path] = _digest(content)
+    document = parse_document(path, content, cache=cache)
+    if not isinstance(document, dict):
+        raise InvalidRulesetError(f"{path}: a ruleset must be a mapping.")
+
+    merged = {"aliases": {}, "rules": {}}
+    for target, mode in _extends_entries(document.get("extends"), path):
+        if ":" in target.split("/")[0] and not Path(target).is_absolute():
+            raise InvalidRulesetError(
+                f"{path}: only local rulesets can be extended, not {target!r}."
+            )
+        parent = _resolve_extends(
+            (path.parent / target).resolve(), cache, resolved, (*chain, path), digests
+        )
+        for key, value in parent.items():
+            if key not in ("aliases", "rules"):
+                merged[key] = value
+        merged["aliases"].update(parent["aliases"])
+        for name, rule in parent["rules"].items():
+            if mode == "off" or (
+                mode == "recommended" and rule.get("recommended") is False
+            ):
+                rule = dict(rule, severity="off")
+            merged["rules"][name] = rule
+
+    for key, value in document.items():
+        if key == "extends":
+            continue
+        if key == "aliases":
+            merged["aliases"].update(value or {})
+        elif key == "rules":
+            for name, override in (value or {}).items():
+                merged["rules"][name] = _override_rule(
+                    name, merged["rules"].get(name), override, path
+                )
+        else:
+            merged[key] = value
+
+    resolved[path] = merged
+    return merged
+
+
+def expand_given(
+    given: str, aliases: Dict[str, Any], seen: Tuple[str, ...] = ()
+) -> List[str]:
+    """Expand the aliases in a `given` path.
+
+    `#Name` is replaced by the path(s) of alias `Name`, and `#Name.more` or
+    `#Name[*]` by those paths followed by the rest of the given path. Aliases
+    can refer to other aliases.
+
+    Args:
+        given (str): The given path.
+        aliases (Dict[str, Any]): Alias names mapped to a path, a list of
+            paths, or a mapping with `targets`, each having a `given` (scoped
+            aliases, whose formats are not taken into account).
+        seen (Tuple[str, ...], optional): Aliases being expanded, to detect
+            cycles. Defaults to ().
+
+    Raises:
+        InvalidRulesetError: Raised when an alias is unknown or refers to itself.
+
+    Returns:
+        List[str]: The expanded given paths.
+    """
+    match = ALIAS_PATTERN.match(given)
+    if match is None:
+        return [given]
+    name, rest = match.groups()
+    if name in seen:
+        raise InvalidRulesetError(
+            f"Aliases refer to each other: {' -> '.join((*seen, name))}."
+        )
+    if name not in aliases:
+        raise InvalidRulesetError(f"Unknown alias {name!r} in given {given!r}.")
+
+    targets = aliases[name]
+    if isinstance(targets, dict):
+        targets = [
+            target_given
+            for target in targets.get("targets", [])
+            for target_given in _as_list(target.get("given"))
+        ]
+    return [
+        expanded + rest
+        for target in _as_list(targets)
+        for expanded in expand_given(target, aliases, (*seen, name))
+    ]
+
+
+def _as_list(value: Any) -> List:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def read_ruleset(
+    path: Union[str, Path],
+    cache: Optional[DocumentCache] = None,
+    digests: Optional[Dict[Path, str]] = None,
+) -> Tuple[Dict, List[Path]]:
+    """Read a ruleset with its `extends` chain resolved and aliases expanded.
+
+    Extended rulesets are local files, relative to the ruleset extending
+    them, optionally with a mode: `[path, "all" | "recommended" | "off"]`
+    (`recommended` by default, which turns off rules with `recommended: false`).
+    Rules are merged by name in order, the extending ruleset last: a full rule
+    definition is merged into the inherited one, a severity or boolean only
+    changes its severity. Rules that end up `off` are dropped.
+
+    Args:
+        path (Union[str, Path]): Path to the ruleset.
+        cache (Optional[DocumentCache], optional): Cache of parsed documents.
+            Defaults to None.
+        digests (Optional[Dict[Path, str]], optional): Filled with the sha256
+            of every file that was read. Defaults to None.
+
+    Raises:
+        InvalidRulesetError: Raised when the rulesets extend each other, a
+            ruleset cannot be read, an override has nothing to override, or
+            an alias is unknown.
+
+    Returns:
+        Tuple[Dict, List[Path]]: The merged ruleset, and the files it was read from.
+    """
+    resolved = {}
+    digests = digests if digests is not None else {}
+    merged = _resolve_extends(Path(path).resolve(), cache, resolved, (), digests)
+    rules = {}
+    for name, rule in merged["rules"].items():
+        if rule.get("severity") == "off":
+            continue
+        given = rule.get("given")
+        if given is not None:
+            rule = dict(
+                rule,
+                given=[
+                    expanded
+                    for path_expr in _as_list(given)
+                    for expanded in expand_given(path_expr, merged["aliases"])
+                ],
+            )
+        rules[name] = rule
+    # rulesets are resolved depth first, list the extending ones first
+    return dict(merged, rules=rules), list(reversed(resolved))
+
+
+def load_ruleset(
+    path: Union[str, Path], cache: Optional[DocumentCache] = None
+) -> Tuple[RuleSetModel, List[Path]]:
+    """Read and validate a ruleset, see `read_ruleset`.
+
+    Resolving and validating a large layered ruleset is slow, so with a cache
+    the validated ruleset is stored under the path and content of the ruleset
+    file, with the content hash of every file it extends. As long as none of
+    them changed, the validated ruleset is loaded without parsing, merging or
+    validating anything.
+
+    Args:
+        path (Union[str, Path]): Path to the ruleset.
+        cache (Optional[DocumentCache], optional): Cache of parsed documents
+            and validated rulesets. Defaults to None.
+
+    Raises:
+        InvalidRulesetError: Raised when the ruleset cannot be resolved.
+        pydantic.ValidationError: Raised when the merged ruleset is not valid.
+
+    Returns:
+        Tuple[RuleSetModel, List[Path]]: The ruleset, and the files it was read from.
+    """
+    path = Path(path).resolve()
+    key = None
+    if cache is not None:
+        root_digest = _file_digest(path)
+        if root_digest is not None:
+            key = DocumentCache.key(
+                f"{path}\0{root_digest}".encode(),
+                namespace=f"ruleset-{stinky.__version__}",
+            )
+            entry = cache.get(key)
+            if entry is not None and all(
+                _file_digest(Path(source)) == digest
+                for source, digest in entry["digests"].items()
+            ):
+                logger.debug(f"Loaded validated ruleset {path} from the cache.")
+                return entry["ruleset"], [Path(source) for source in entry["digests"]]
+
+    digests = {}
+    ruleset, sources = read_ruleset(path, cache=cache, digests=digests)
+    ruleset_instance = RuleSetModel(**ruleset)
+    if key is not None and digests.get(path) == root_digest:
+        cache.put(
+            key,
+            {
+                "digests": {str(source): digests[source] for source in sources},
+                "ruleset": ruleset_instance,
+            },
+        )
+    return ruleset_instance, sources
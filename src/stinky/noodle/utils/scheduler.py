@@ -0,0 +1,119 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from stinky.noodle.utils.plan import CompiledClause, ExecutionPlan
+
+# (given path, clause fingerprint) -> (checked objects, seconds) of an earlier run
+CostHistory = Dict[Tuple[str, str], Tuple[float, float]]
+
+# Per-check seconds assumed for clauses without history: cacheable checkers
+# (`schema`, custom callables) and batched custom callables are the expensive ones
+EXPENSIVE_CHECK_SECONDS = 1e-4
+CHEAP_CHECK_SECONDS = 1e-6
+# Matches assumed for givens without history, by whether they use recursive descent
+DESCENDANT_MATCHES = 100
+DIRECT_MATCHES = 10
+
+
+class CostModel:
+    """Estimates what checking a clause costs, from match counts and timings of
+    earlier runs.
+
+    Clauses without history are estimated from their checker (`schema` and
+    custom callables are expensive) and their given path (recursive descent
+    matches more). History is only recorded in the lint cache, so runs without
+    one always use these estimates.
+    """
+
+    def __init__(self, history: Optional[CostHistory] = None):
+        """Initialize the cost model.
+
+        Args:
+            history (Optional[CostHistory], optional): Checked objects and seconds
+                per given path and clause fingerprint, e.g. from
+                `stinky.noodle.utils.lint_cache.LintCache.load_costs`.
+                Defaults to None.
+        """
+        self.history = history or {}
+
+    def clause_cost(self, given_path: str, clause: CompiledClause) -> float:
+        """Estimate the seconds it takes to check all matches of a clause.
+
+        Args:
+            given_path (str): The normalized given path of the clause.
+            clause (CompiledClause): The clause.
+
+        Returns:
+            float: The estimated seconds.
+        """
+        known = self.history.get((given_path, clause.fingerprint))
+        if known is not None:
+            return known[1]
+        matches = DESCENDANT_MATCHES if ".." in given_path else DIRECT_MATCHES
+        checker = clause.checker
+        per_check = (
+            EXPENSIVE_CHECK_SECONDS
+            if checker.cacheable or checker.uses_paths
+            else CHEAP_CHECK_SECONDS
+        )
+        return matches * per_check
+
+    def group_cost(self, plan: ExecutionPlan, group_index: int) -> float:
+        """Estimate the seconds it takes to check all clauses of a given path group.
+
+        Args:
+            plan (ExecutionPlan): The compiled plan.
+            group_index (int): Index into `plan.groups`.
+
+        Returns:
+            float: The estimated seconds.
+        """
+        given_path, clauses = plan.groups[group_index]
+        return sum(self.clause_cost(given_path, clause) for clause in clauses)
+
+    def order(self, plan: ExecutionPlan, group_indices: Iterable[int]) -> List[int]:
+        """Order given path groups cheapest first.
+
+        Args:
+            plan (ExecutionPlan): The compiled plan.
+            group_indices (Iterable[int]): Indices into `plan.groups`.
+
+        Returns:
+            List[int]: The indices, cheapest first; ties keep plan order.
+        """
+        return sorted(
+            group_indices, key=lambda group_index: self.group_cost(plan, group_index)
+        )
+
+    def chunks(
+        self, plan: ExecutionPlan, group_indices: Sequence[int], count: int
+    ) -> List[List[int]]:
+        """Deal given path groups into chunks of about equal estimated cost.
+
+        The most expensive groups are dealt first, each to the cheapest chunk
+        so far (longest processing time first).
+
+        Args:
+            plan (ExecutionPlan): The compiled plan.
+            group_indices (Sequence[int]): Indices into `plan.groups`.
+            count (int): Number of chunks.
+
+        Returns:
+            List[List[int]]: Non-empty chunks of group indices, most expensive
+                chunk first.
+        """
+        count = max(1, min(count, len(group_indices)))
+        chunks: List[List[int]] = [[] for _ in range(count)]
+        heap = [(0.0, index) for index in range(count)]
+        for group_index in reversed(self.order(plan, group_indices)):
+            cost, index = heapq.heappop(heap)
+            chunks[index].append(group_index)
+            heapq.heappush(heap, (cost + self.group_cost(plan, group_index), index))
+        totals = dict((index, cost) for cost, index in heap)
+        return [
+            chunk
+            for index, chunk in sorted(
+                enumerate(chunks), key=lambda item: -totals[item[0]]
+            )
+            if chunk
+        ]
@@ -0,0 +1,61 @@
+from typing import Dict
+
+import pytest
+
+from stinky.noodle.utils.ruleset import RuleSetModel
+
+
+@pytest.fixture
+def specs() -> Dict:
+    return {
+        "info": {"title": "Example", "version": "1.0.0"},
+        "paths": {
+            "/users": {
+                "get": {"operationId": "listUsers", "tags": ["users"]},
+                "post": {"operationId": "create_user", "tags": ["users"]},
+            },
+        },
+        "components": {
+            "schemas": {
+                "User": {"type": "object", "properties": {"id": {"type": "integer"}}},
+            },
+        },
+    }
+
+
+@pytest.fixture
+def ruleset_instance() -> RuleSetModel:
+    return RuleSetModel(
+        description="Example ruleset",
+        formats=["oas3"],
+        aliases={},
+        functions=[],
+        functionsDir="functions",
+        rules={
+            "operation-id-camel-case": {
+                "description": "operationId should be camelCase",
+                "message": "operationId is not camelCase",
+                "severity": "error",
+                "given": ["$.paths[*][*]"],
+                "then": {
+                    "field": "operationId",
+                    "function": "casing",
+                    "functionOptions": {"type": "camel"},
+                },
+            },
+            "operation-tags": {
+                "description": "Operations should have tags",
+                "message": "Operation has no tags",
+                "severity": "warn",
+                "given": ["$['paths'][*].*"],
+                "then": [{"field": "tags", "function": "truthy"}],
+            },
+            "info-title": {
+                "description": "Info should have a title",
+                "message": "Info has no title",
+                "severity": "warn",
+                "given": ["$.info.title"],
+                "then": {"function": "truthy"},
+            },
+        },
+    )
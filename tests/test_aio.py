@@ -0,0 +1,63 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import pytest
+
+from stinky.noodle.aio import AsyncLinter
+from stinky.noodle.utils.enforcer import RuleEnforcer
+from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils.plan import compile_ruleset
+from stinky.noodle.utils.ruleset import RuleSetModel, ThenModel
+
+
+def custom_slow(obj, **kwargs) -> bool:
+    time.sleep(0.1)
+    return True
+
+
+def test_async_lint(ruleset_instance: RuleSetModel, specs: Dict):
+    """Test that async lints give the same results as the enforcer"""
+    plan = compile_ruleset(ruleset_instance)
+    expected = RuleEnforcer(None, Parser(specs=specs), plan=plan).enforce()
+    linter = AsyncLinter(plan, executor=ThreadPoolExecutor(2), max_concurrency=2)
+
+    async def main():
+        many = await asyncio.gather(*(linter.lint(specs) for _ in range(5)))
+        streamed = [result async for result in linter.iter_lint(specs, chunks=2)]
+        return many, streamed
+
+    many, streamed = asyncio.run(main())
+    assert many == [expected] * 5
+    assert sorted(streamed) == sorted(expected)
+
+
+def test_async_lint_does_not_block(ruleset_instance: RuleSetModel, specs: Dict):
+    """Test that the event loop keeps running during a slow lint"""
+    ruleset_instance.rules["info-title"].then = ThenModel(function="slow")
+    plan = compile_ruleset(ruleset_instance, {"slow": custom_slow})
+    linter = AsyncLinter(plan, max_concurrency=1)
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        ticker = asyncio.ensure_future(tick())
+        await asyncio.gather(linter.lint(specs), linter.lint(specs))
+        ticker.cancel()
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    # two lints of 0.1s each, one after the other
+    assert time.perf_counter() - start >= 0.2
+    assert len(ticks) > 5
+
+
+def test_async_linter_concurrency(ruleset_instance: RuleSetModel):
+    """Test that the concurrency limit is validated"""
+    with pytest.raises(ValueError, match="max_concurrency"):
+        AsyncLinter(compile_ruleset(ruleset_instance), max_concurrency=0)
@@ -0,0 +1,40 @@
+from benchmarks.generator import SCALES, generate_ruleset, generate_spec
+from benchmarks.run import compare
+from stinky.noodle.utils.plan import compile_ruleset
+from stinky.noodle.utils.ruleset import RuleSetModel
+
+
+def test_generate_spec():
+    """Test that the synthetic spec is deterministic and scales as configured"""
+    scale = SCALES["small"]
+    specs = generate_spec(scale)
+
+    assert specs == generate_spec(scale)
+    assert specs != generate_spec(scale, seed=1)
+    assert len(specs["paths"]) == scale.paths
+    assert len(specs["components"]["schemas"]) == scale.schemas + 1
+
+
+def test_generate_ruleset():
+    """Test that the synthetic ruleset compiles and uses every builtin"""
+    plan = compile_ruleset(RuleSetModel(**generate_ruleset()))
+
+    functions = {clause.function for _, clauses in plan.groups for clause in clauses}
+    assert len(functions) == 12
+
+
+def test_compare():
+    """Test that only regressions beyond the tolerance and noise floor are reported"""
+    baseline = {
+        "a": {"seconds": 0.1, "peak_mb": 10.0},
+        "b": {"seconds": 0.0001, "peak_mb": 0.1},
+    }
+    results = {
+        "a": {"seconds": 0.2, "peak_mb": 11.0},
+        "b": {"seconds": 0.0005, "peak_mb": 0.2},
+        "c": {"seconds": 1.0, "peak_mb": 1.0},
+    }
+
+    assert compare(results, baseline, tolerance=0.25) == [
+        "a: seconds 0.1000 -> 0.2000 (+100%)"
+    ]
@@ -1,15 +1,26 @@
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import pytest
 
 from stinky.noodle.utils.builtins import (
+    BatchCallableAdapter,
+    CallableAdapter,
+    CasingChecker,
+    Checker,
     builtin_alphabetical,
     builtin_casing,
+    builtin_defined,
     builtin_enumeration,
     builtin_falsy,
     builtin_length,
     builtin_pattern,
     builtin_schema,
+    builtin_truthy,
+    builtin_unreferenced_reusable_object,
+    builtin_xor,
+    passed,
+    prepare,
 )
 
 
@@ -265,11 +276,167 @@ def test_builtin_schema(
     )
 
 
-# @pytest.mark.parametrize(
-#     ("obj", "result"),
-#     [
-#     ],
-# )
-# def test_builtin_unreferenced_reusable_object(obj: Any, result: bool):
-#     """Test the truthy builtin"""
-#     assert builtin_truthy(obj=obj) is result
+@pytest.mark.parametrize(
+    ("obj", "properties", "result"),
+    [
+        ({"a": 1}, ["a", "b"], True),
+        ({"a": 1, "b": 2}, ["a", "b"], False),
+        ({"c": 1}, ["a", "b"], False),
+    ],
+)
+def test_builtin_xor(obj: Dict, properties: List[str], result: bool):
+    """Test the xor builtin"""
+    assert builtin_xor(obj=obj, properties=properties) is result
+
+
+def test_prepare_builtin():
+    """Test that builtins are prepared once and picklable"""
+    checker = prepare(builtin_casing, {"type": "snake"})
+
+    assert isinstance(checker, CasingChecker)
+    assert checker("snake_case") is True
+    assert checker("camelCase") is False
+    assert pickle.loads(pickle.dumps(checker))("snake_case") is True
+
+    schema_checker = prepare(
+        builtin_schema, {"schema": {"type": "string"}, "dialect": "draft7"}
+    )
+    assert passed(pickle.loads(pickle.dumps(schema_checker))("a")) is True
+    assert passed(schema_checker(1)) is False
+
+
+def test_checker_is_abstract():
+    """Test that checkers without __call__ fail when they are created"""
+
+    class IncompleteChecker(Checker):
+        pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompleteChecker()
+
+
+def test_prepare_custom_callable():
+    """Test that plain custom callables are adapted"""
+
+    def custom_starts_with(obj: str, prefix: str) -> bool:
+        return obj.startswith(prefix)
+
+    checker = prepare(custom_starts_with, {"prefix": "x-"})
+
+    assert isinstance(checker, CallableAdapter)
+    assert checker("x-custom") is True
+    assert checker("custom") is False
+
+
+def test_prepare_batched_custom_callable():
+    """Test that batched custom callables are called once with all matches"""
+    calls = []
+
+    def custom_starts_with(matches: List[Tuple], prefix: str) -> List[bool]:
+        calls.append(matches)
+        return [obj.startswith(prefix) for _, obj in matches]
+
+    custom_starts_with.batched = True
+    checker = prepare(custom_starts_with, {"prefix": "x-"})
+
+    assert isinstance(checker, BatchCallableAdapter)
+    assert checker.check_many(["x-a", "b"], [("a",), ("b",)]) == [True, False]
+    assert calls == [[(("a",), "x-a"), (("b",), "b")]]
+    assert checker("x-custom") is True
+
+    with pytest.raises(ValueError):  # a result per match is required
+        BatchCallableAdapter(lambda matches: []).check_many(["a"])
+
+
+STRINGS = ["camelCase", "snake_case", "camelCase", "x-1", "", "Pascal1Case", "a"]
+
+
+@pytest.mark.parametrize(
+    ("func", "options", "objs"),
+    [
+        (builtin_pattern, {"match": "^[a-z]+", "not_match": "_"}, STRINGS),
+        (builtin_pattern, {}, STRINGS),
+        (builtin_casing, {"type": "camel"}, STRINGS),
+        (builtin_casing, {"type": "pascal", "disallow_digits": True}, STRINGS),
+        (builtin_enumeration, {"values": ["a", "x-1"]}, STRINGS),
+        (builtin_enumeration, {"values": ["a"]}, ["a", ["a"], {}, "b"]),
+        (builtin_length, {"min": 1, "max": 5}, STRINGS),
+        (builtin_truthy, {}, ["", 0, None, [], "a", False, {}]),
+        (builtin_falsy, {}, ["", 0, None, [], "a", False, {}]),
+        (builtin_defined, {}, ["", None, {}]),
+        (builtin_xor, {"properties": ["a", "b"]}, [{"a": 1}, {"a": 1, "b": 1}]),
+    ],
+)
+def test_check_many(func: Callable, options: Dict, objs: List[Any]):
+    """Test that checking all matches at once agrees with checking them one by one"""
+    checker = prepare(func, options)
+
+    assert checker.check_many(objs) == [passed(checker(obj)) for obj in objs]
+
+
+@pytest.mark.parametrize(
+    ("func", "options"),
+    [
+        (builtin_pattern, {"match": "a"}),
+        (builtin_casing, {"type": "camel"}),
+        (builtin_enumeration, {"values": ["a"]}),
+        (builtin_length, {"min": 1, "max": 5}),
+    ],
+)
+def test_check_many_undefined(func: Callable, options: Dict):
+    """Test that checking all matches at once rejects undefined objects"""
+    with pytest.raises(ValueError):
+        prepare(func, options).check_many(["a", None])
+
+
+UNREFERENCED_SPECS = {
+    "paths": {
+        "/users": {
+            "get": {
+                "responses": {
+                    "200": {"$ref": "#/components/responses/Users"},
+                },
+            },
+        },
+    },
+    "components": {
+        "responses": {
+            "Users": {"schema": {"$ref": "#/components/schemas/UserList"}},
+        },
+        "schemas": {
+            "UserList": {"items": {"$ref": "#/components/schemas/User"}},
+            "User": {"properties": {"self": {"$ref": "#/components/schemas/User"}}},
+            "Orphan": {"items": {"$ref": "#/components/schemas/OrphanItem"}},
+            "OrphanItem": {"type": "object"},
+            "a/b": {"type": "object"},
+        },
+    },
+}
+
+
+@pytest.mark.parametrize(
+    ("location", "result"),
+    [
+        ("#/components/responses", []),
+        (
+            "#/components/schemas",
+            [
+                "#/components/schemas/Orphan is not referenced.",
+                "#/components/schemas/OrphanItem is not referenced.",
+                "#/components/schemas/a~1b is not referenced.",
+            ],
+        ),
+    ],
+)
+def test_builtin_unreferenced_reusable_object(location: str, result: List[str]):
+    """Test the unreferenced reusable object builtin, with transitive references"""
+    obj = UNREFERENCED_SPECS
+    for token in location.split("/")[1:]:
+        obj = obj[token]
+
+    assert (
+        builtin_unreferenced_reusable_object(
+            obj=obj, reusable_objects_location=location, document=UNREFERENCED_SPECS
+        )
+        == result
+    )
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from stinky.noodle.utils.builtins import ValidatorRegistry
+from stinky.noodle.utils.cache import LRUCache
+
+
+def test_lru_cache_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = LRUCache(maxsize=2)
+    cache.get_or_create("a", lambda: 1)
+    cache.get_or_create("b", lambda: 2)
+    cache.get_or_create("a", lambda: 0)
+    cache.get_or_create("c", lambda: 3)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats() == {"hits": 1, "misses": 3, "size": 2, "maxsize": 2}
+
+    cache.discard("a")
+    cache.discard("b")
+    assert "a" not in cache and len(cache) == 1
+
+
+def test_lru_cache_threads():
+    """Test that concurrent lookups of one key all get the same value"""
+    cache = LRUCache(maxsize=4)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(
+            executor.map(lambda _: cache.get_or_create("key", object), range(64))
+        )
+
+    assert all(value is values[0] for value in values)
+    assert cache.hits + cache.misses == 64
+
+
+def test_validator_registry():
+    """Test that equal schemas share one validator regardless of key order"""
+    registry = ValidatorRegistry(maxsize=8)
+    first = registry.get_validator({"type": "string", "maxLength": 2}, "draft7")
+    second = registry.get_validator({"maxLength": 2, "type": "string"}, "draft7")
+    other = registry.get_validator({"maxLength": 2, "type": "string"}, "draft4")
+
+    assert first is second
+    assert first is not other
+    assert registry.cache.stats()["hits"] == 1
+    assert registry.cache.stats()["misses"] == 2
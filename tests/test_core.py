@@ -0,0 +1,183 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from stinky.noodle.core import expand_spec_paths, lint_files
+from stinky.noodle.utils.plan import compile_ruleset
+from stinky.noodle.utils.ruleset import RuleSetModel
+
+
+def test_expand_spec_paths(tmp_path: Path):
+    """Test that globs are expanded and duplicates dropped"""
+    for name in ("b.json", "a.json", "c.yaml"):
+        (tmp_path / name).write_text("{}")
+
+    paths = expand_spec_paths(
+        [str(tmp_path / "c.yaml"), str(tmp_path / "*.json"), str(tmp_path / "a.json")]
+    )
+
+    assert [path.name for path in paths] == ["c.yaml", "a.json", "b.json"]
+
+
+def test_lint_files(tmp_path: Path, specs: Dict, ruleset_instance: RuleSetModel):
+    """Test that files are linted in a pool with per-file results"""
+    good = dict(specs, paths={})
+    (tmp_path / "bad.json").write_text(json.dumps(specs))
+    (tmp_path / "good.json").write_text(json.dumps(good))
+    (tmp_path / "broken.json").write_text("{")
+    spec_paths = expand_spec_paths([str(tmp_path / "*.json")])
+    plan = compile_ruleset(ruleset_instance)
+
+    for jobs in (1, 2):
+        results = lint_files(spec_paths, plan, jobs=jobs)
+        assert {
+            path.name: None if issues is None else len(issues)
+            for path, issues in results.items()
+        } == {
+            "bad.json": 1,
+            "broken.json": None,
+            "good.json": 0,
+        }
+
+
+def test_lint_files_fail_fast(
+    tmp_path: Path, specs: Dict, ruleset_instance: RuleSetModel
+):
+    """Test that no more files are linted after one with an error"""
+    for name in ("a.json", "b.json", "c.json"):
+        (tmp_path / name).write_text(json.dumps(specs))
+    spec_paths = expand_spec_paths([str(tmp_path / "*.json")])
+    plan = compile_ruleset(ruleset_instance)
+
+    for jobs in (1, 2):
+        results = lint_files(spec_paths, plan, jobs=jobs, fail_fast=True)
+        assert [path.name for path in results] == ["a.json"]
+
+
+def test_lint_files_bundle(tmp_path: Path, specs: Dict, ruleset_instance: RuleSetModel):
+    """Test that specs split over several files are linted as one document"""
+    (tmp_path / "paths").mkdir()
+    (tmp_path / "paths" / "users.json").write_text(json.dumps(specs["paths"]["/users"]))
+    bundled = dict(specs, paths={"/users": {"$ref": "paths/users.json"}})
+    for name in ("a.json", "b.json"):
+        (tmp_path / name).write_text(json.dumps(bundled))
+    spec_paths = expand_spec_paths([str(tmp_path / "*.json")])
+    plan = compile_ruleset(ruleset_instance)
+
+    for jobs in (1, 2):
+        results = lint_files(spec_paths, plan, jobs=jobs, resolve_refs=True)
+        assert {path.name: len(issues) for path, issues in results.items()} == {
+            "a.json": 1,
+            "b.json": 1,
+        }
+
+
+# Time `noodle` may take on top of starting python and importing loguru
+HELP_BUDGET_SECONDS = 0.3
+MINIMAL_LINT_BUDGET_SECONDS = 1.0
+NOODLE = "import sys; from stinky.noodle.core import entrypoint; entrypoint()"
+
+
+def startup_time(args: List[str]) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+@pytest.fixture
+def minimal_lint_args(tmp_path: Path, specs: Dict) -> List[str]:
+    rule = {"description": "", "message": "", "severity": "error"}
+    ruleset = {
+        "description": "Minimal ruleset",
+        "formats": ["oas3"],
+        "aliases": {},
+        "functions": [],
+        "functionsDir": "functions",
+        "rules": {
+            "operation-id-pattern": dict(
+                rule,
+                given=["$.paths[*][*]"],
+                then={
+                    "field": "operationId",
+                    "function": "pattern",
+                    "functionOptions": {"match": "^[a-z]"},
+                },
+            ),
+            "info-title": dict(
+                rule, given=["$.info"], then={"field": "title", "function": "truthy"}
+            ),
+        },
+    }
+    (tmp_path / "ruleset.json").write_text(json.dumps(ruleset))
+    (tmp_path / "spec.json").write_text(json.dumps(specs))
+    return ["-c", str(tmp_path / "ruleset.json"), str(tmp_path / "spec.json")]
+
+
+@pytest.mark.parametrize(
+    "lint, deferred",
+    [
+        (False, ["jsonschema", "pyjsonpath", "yaml", "convert_case", "pydantic"]),
+        (True, ["jsonschema", "pyjsonpath", "yaml"]),
+    ],
+)
+def test_startup_imports(lint: bool, deferred: List[str], minimal_lint_args: List[str]):
+    """Test that slow imports are deferred until a rule or spec needs them"""
+    script = NOODLE.replace(
+        "entrypoint()",
+        "\ntry:\n    entrypoint()\nexcept SystemExit:\n    pass\n"
+        f"print(','.join(m for m in {deferred!r} if m in sys.modules))",
+    )
+    args = minimal_lint_args if lint else ["--help"]
+    completed = subprocess.run(
+        [sys.executable, "-c", script, *args], capture_output=True, text=True
+    )
+    assert completed.stdout.splitlines()[-1] == ""
+
+
+def test_profile_flag(tmp_path: Path, minimal_lint_args: List[str]):
+    """Test that --profile is a flag, also right before the spec paths"""
+    ruleset_args, spec_path = minimal_lint_args[:2], minimal_lint_args[2]
+    profile_path = tmp_path / "profile.json"
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            NOODLE,
+            "--profile",
+            spec_path,
+            *ruleset_args,
+            "--profile-format",
+            "json",
+            "--profile-output",
+            str(profile_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert "invalid choice" not in completed.stderr
+    assert json.loads(profile_path.read_text())
+
+
+@pytest.mark.skipif(
+    not os.environ.get("NOODLE_STARTUP_BUDGET"),
+    reason="wall-clock budget, set NOODLE_STARTUP_BUDGET=1 to run",
+)
+def test_startup_budget(minimal_lint_args: List[str]):
+    """Test that `noodle --help` and a minimal lint start within budget"""
+    baseline = startup_time(["-c", "import loguru"])
+
+    assert startup_time(["-c", NOODLE, "--help"]) < baseline + HELP_BUDGET_SECONDS
+    assert (
+        startup_time(["-c", NOODLE, *minimal_lint_args])
+        < baseline + MINIMAL_LINT_BUDGET_SECONDS
+    )
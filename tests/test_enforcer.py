@@ -0,0 +1,341 @@
+import multiprocessing
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+from stinky.noodle.utils import enforcer
+from stinky.noodle.utils.enforcer import (
+    RuleEnforcer,
+    _evaluate_groups,
+    _evaluate_parallel,
+)
+from stinky.noodle.utils.exceptions import NonExistentCallableError
+from stinky.noodle.utils.lint_cache import LintCache
+from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils.plan import (
+    MatchPlan,
+    compile_ruleset,
+    filter_severity,
+    severity_rank,
+)
+from stinky.noodle.utils.profiler import Profiler
+from stinky.noodle.utils.ruleset import RuleSetModel, ThenModel
+from stinky.noodle.utils.scheduler import CostModel
+
+
+def test_match_plan_groups_givens(ruleset_instance: RuleSetModel):
+    """Test that equivalent givens are grouped and evaluated once"""
+    plan = MatchPlan(ruleset_instance)
+
+    assert list(plan.groups) == ["$.paths[*][*]", "$.info.title"]
+    assert [clause.rule_name for clause in plan.groups["$.paths[*][*]"]] == [
+        "operation-id-camel-case",
+        "operation-tags",
+    ]
+    assert plan.given_count == 3
+    assert plan.saved_evaluations == 1
+
+
+def test_compile_ruleset(ruleset_instance: RuleSetModel):
+    """Test that the compiled plan resolves callables and survives pickling"""
+    plan = compile_ruleset(ruleset_instance)
+    clauses = dict(plan.groups)["$.paths[*][*]"]
+
+    assert [clause.function for clause in clauses] == ["casing", "truthy"]
+    assert clauses[0].severity == "error"
+    assert clauses[0].field == "operationId"
+
+    restored = pickle.loads(pickle.dumps(plan))
+    assert restored.saved_evaluations == 1
+    assert dict(restored.groups)["$.paths[*][*]"][0].checker("camelCase") is True
+
+
+def test_compile_ruleset_unknown_callables(ruleset_instance: RuleSetModel):
+    """Test that all unknown functions are reported before matching"""
+    rule = ruleset_instance.rules["info-title"]
+    rule.then = [
+        ThenModel(function="doesNotExist"),
+        ThenModel(function="neitherDoesThis"),
+    ]
+
+    with pytest.raises(NonExistentCallableError) as exc_info:
+        compile_ruleset(ruleset_instance)
+    assert "'doesNotExist', 'neitherDoesThis'" in str(exc_info.value)
+
+
+def test_enforce_parallel(ruleset_instance: RuleSetModel, specs: Dict):
+    """Test that a process pool run gives the same outcomes as a serial run"""
+    plan = compile_ruleset(ruleset_instance)
+    parser = Parser(specs=specs)
+    group_indices = range(len(plan.groups))
+
+    serial = _evaluate_groups(parser, plan, group_indices)
+    assert _evaluate_parallel(parser, plan, jobs=2) == serial
+    assert serial[0] == (0, [(0, ("paths", "/users", "post", "operationId"))])
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="workers only inherit the patched close when forked",
+)
+def test_enforce_parallel_closes_lint_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    ruleset_instance: RuleSetModel,
+    specs: Dict,
+):
+    """Test that every worker closes its lint cache connection when it exits"""
+    closed_path = tmp_path / "closed"
+    close = LintCache.close
+
+    def record_close(self: LintCache):
+        with closed_path.open("a") as closed:
+            closed.write(f"{os.getpid()}\n")
+        close(self)
+
+    monkeypatch.setattr(LintCache, "close", record_close)
+    lint_cache = LintCache(tmp_path / "lint.sqlite")
+    plan = compile_ruleset(ruleset_instance)
+    _evaluate_parallel(Parser(specs=specs), plan, jobs=2, lint_cache=lint_cache)
+
+    pids = closed_path.read_text().split()
+    assert pids and str(os.getpid()) not in pids
+    assert len(set(pids)) == len(pids)
+    lint_cache.close()
+
+
+def test_enforce_unreferenced_reusable_object(
+    ruleset_instance: RuleSetModel, specs: Dict
+):
+    """Test that every unreferenced reusable object is reported at its own path"""
+    ruleset_instance.rules["info-title"].given = ["$.components.schemas"]
+    ruleset_instance.rules["info-title"].then = ThenModel(
+        function="unreferencedReusableObject",
+        functionOptions={"reusable_objects_location": "#/components/schemas"},
+    )
+    plan = compile_ruleset(ruleset_instance)
+    specs["components"]["schemas"].update(
+        {"Pet": {"type": "object"}, "Tag/Name": {"type": "string"}}
+    )
+
+    def unreferenced() -> List[Tuple[str, str]]:
+        results = RuleEnforcer(None, Parser(specs=specs), plan=plan).enforce()
+        return [
+            (result.path, result.pointer)
+            for result in results
+            if result.function == "unreferencedReusableObject"
+        ]
+
+    assert unreferenced() == [
+        ("$.components.schemas.User", "/components/schemas/User"),
+        ("$.components.schemas.Pet", "/components/schemas/Pet"),
+        ("$.components.schemas['Tag/Name']", "/components/schemas/Tag~1Name"),
+    ]
+    specs["paths"]["/users"]["get"]["schema"] = {"$ref": "#/components/schemas/User"}
+    assert unreferenced() == [
+        ("$.components.schemas.Pet", "/components/schemas/Pet"),
+        ("$.components.schemas['Tag/Name']", "/components/schemas/Tag~1Name"),
+    ]
+
+
+def test_enforce_batched_custom_callable(ruleset_instance: RuleSetModel, specs: Dict):
+    """Test that batched custom callables get every match with its path"""
+    calls = []
+
+    def custom_not_snake(matches, **kwargs):
+        calls.append(matches)
+        return ["_" not in obj for _, obj in matches]
+
+    custom_not_snake.batched = True
+    ruleset_instance.rules["operation-id-camel-case"].then = ThenModel(
+        field="operationId", function="notSnake"
+    )
+    plan = compile_ruleset(ruleset_instance, {"not_snake": custom_not_snake})
+
+    results = RuleEnforcer(None, Parser(specs=specs), plan=plan).enforce()
+    assert calls == [
+        [
+            (("paths", "/users", "get", "operationId"), "listUsers"),
+            (("paths", "/users", "post", "operationId"), "create_user"),
+        ]
+    ]
+    assert [result.path for result in results if result.function == "notSnake"] == [
+        "$.paths['/users'].post.operationId"
+    ]
+
+
+def test_enforce_batched_custom_callable_lint_cache(
+    tmp_path: Path, ruleset_instance: RuleSetModel
+):
+    """Test that path-aware batched callables are not answered from the lint cache"""
+
+    def custom_only_get(matches, **kwargs):
+        return [path[-1] == "get" for path, _ in matches]
+
+    custom_only_get.batched = True
+    ruleset_instance.rules["operation-tags"].then = ThenModel(function="onlyGet")
+    plan = compile_ruleset(ruleset_instance, {"only_get": custom_only_get})
+    operation = {"operationId": "op"}
+    specs = {"paths": {"/a": {"get": operation, "post": dict(operation)}}}
+
+    def enforce(lint_cache=None) -> List[str]:
+        results = RuleEnforcer(
+            None, Parser(specs=specs), plan=plan, lint_cache=lint_cache
+        ).enforce()
+        return [result.path for result in results if result.function == "onlyGet"]
+
+    expected = ["$.paths['/a'].post"]
+    assert enforce() == expected
+    for _ in range(2):
+        lint_cache = LintCache(tmp_path / "lint.sqlite")
+        try:
+            assert enforce(lint_cache) == expected
+        finally:
+            lint_cache.close()
+
+
+@pytest.mark.parametrize(
+    ("min_severity", "givens", "given_count"),
+    [
+        ("hint", ["$.paths[*][*]", "$.info.title"], 3),
+        ("warn", ["$.paths[*][*]", "$.info.title"], 3),
+        ("error", ["$.paths[*][*]"], 1),
+    ],
+)
+def test_filter_severity(
+    ruleset_instance: RuleSetModel,
+    min_severity: str,
+    givens: List[str],
+    given_count: int,
+):
+    """Test that less severe clauses and their given paths are dropped"""
+    plan = filter_severity(compile_ruleset(ruleset_instance), min_severity)
+
+    assert [given for given, _ in plan.groups] == givens
+    assert plan.given_count == given_count
+    assert all(
+        severity_rank(clause.severity) <= severity_rank(min_severity)
+        for _, clauses in plan.groups
+        for clause in clauses
+    )
+    assert severity_rank("1") == severity_rank("warn")
+
+
+def test_enforce_fail_fast(
+    ruleset_instance: RuleSetModel, specs: Dict, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that fail-fast stops at the first error, before matching other givens"""
+    ruleset_instance.rules["operation-id-camel-case"].severity = "warn"
+    ruleset_instance.rules["info-title"].severity = "error"
+    ruleset_instance.rules["info-title"].then = ThenModel(function="falsy")
+    plan = compile_ruleset(ruleset_instance)
+    parser = Parser(specs=specs)
+    matched = []
+    iter_matches_many = parser.iter_matches_many
+
+    def spy(json_exprs):
+        matched.append(list(json_exprs))
+        return iter_matches_many(matched[-1])
+
+    monkeypatch.setattr(parser, "iter_matches_many", spy)
+    results = RuleEnforcer(None, parser, plan=plan, fail_fast=True).enforce()
+
+    assert [result.rule for result in results] == ["info-title"]
+    assert matched == [["$.info.title"]]
+    assert len(RuleEnforcer(None, Parser(specs=specs), plan=plan).enforce()) == 2
+
+
+@pytest.mark.parametrize("profiled", [False, True])
+def test_enforce_fail_fast_shared_given(
+    ruleset_instance: RuleSetModel, specs: Dict, profiled: bool
+):
+    """Test that fail-fast checks error clauses before others of the same given"""
+    checked = []
+
+    def custom_has_tags(obj, **kwargs) -> bool:
+        checked.append(obj)
+        return bool(obj)
+
+    ruleset_instance.rules["operation-tags"].then = ThenModel(
+        field="tags", function="hasTags"
+    )
+    # the error rule after the warning in the shared group
+    rules = ruleset_instance.rules
+    rules["operation-id-camel-case"] = rules.pop("operation-id-camel-case")
+    plan = compile_ruleset(ruleset_instance, {"has_tags": custom_has_tags})
+    [(_, clauses)] = [group for group in plan.groups if group[0] == "$.paths[*][*]"]
+    assert [clause.severity for clause in clauses] == ["warn", "error"]
+
+    def enforce() -> List[str]:
+        profiler = Profiler() if profiled else None
+        results = RuleEnforcer(
+            None, Parser(specs=specs), plan=plan, profiler=profiler, fail_fast=True
+        ).enforce()
+        return [result.rule for result in results]
+
+    assert enforce() == ["operation-id-camel-case"]
+    assert checked == []
+
+    specs["paths"]["/users"]["post"]["operationId"] = "createUser"
+    del specs["paths"]["/users"]["get"]["tags"]
+    assert enforce() == ["operation-tags"]
+    assert len(checked) == 2
+
+
+def test_cost_model(ruleset_instance: RuleSetModel):
+    """Test that groups are ordered and balanced by their recorded cost"""
+    plan = compile_ruleset(ruleset_instance)
+    givens = [given for given, _ in plan.groups]
+    info_title = plan.groups[1][1][0]
+
+    # without history, the group with fewer cheap clauses is the cheapest
+    assert [givens[index] for index in CostModel().order(plan, range(2))] == [
+        "$.info.title",
+        "$.paths[*][*]",
+    ]
+    slow = CostModel({("$.info.title", info_title.fingerprint): (1, 1.0)})
+    assert slow.order(plan, range(2)) == [0, 1]
+    assert slow.chunks(plan, range(2), 4) == [[1], [0]]
+    assert slow.chunks(plan, range(2), 1) == [[1, 0]]
+
+
+def test_enforce_streams_batches(
+    ruleset_instance: RuleSetModel, specs: Dict, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that matches are checked in batches, but batched callables get all"""
+    batches, checked = [], []
+    check_matches = enforcer._check_matches
+
+    def spy(group, checkers, matches, *args):
+        checked.append((group[0], len(matches)))
+        return check_matches(group, checkers, matches, *args)
+
+    def custom_not_snake(matches, **kwargs):
+        batches.append(len(matches))
+        return ["_" not in obj for _, obj in matches]
+
+    custom_not_snake.batched = True
+    ruleset_instance.rules["operation-id-camel-case"].then = ThenModel(
+        field="operationId", function="notSnake"
+    )
+    plan = compile_ruleset(ruleset_instance, {"not_snake": custom_not_snake})
+    monkeypatch.setattr(enforcer, "MATCH_BATCH_SIZE", 1)
+    monkeypatch.setattr(enforcer, "_check_matches", spy)
+
+    results = RuleEnforcer(None, Parser(specs=specs), plan=plan).enforce()
+    assert batches == [2]
+    # tags are checked one match at a time, the batched callable after the walk
+    assert [count for given, count in checked if given == "$.paths[*][*]"] == [
+        1,
+        1,
+        2,
+    ]
+    assert [(result.path, result.pointer) for result in results] == [
+        (
+            "$.paths['/users'].post.operationId",
+            "/paths/~1users/post/operationId",
+        )
+    ]
@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Any, Dict, List
+
+from stinky.noodle.utils.enforcer import RuleEnforcer
+from stinky.noodle.utils.lint_cache import LintCache, canonical_hash
+from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils.plan import ExecutionPlan, compile_ruleset
+from stinky.noodle.utils.ruleset import RuleSetModel, ThenModel
+
+CALLS: List[Any] = []
+
+
+def custom_has_summary(obj: Dict, **kwargs) -> bool:
+    CALLS.append(obj)
+    return "summary" in obj
+
+
+def fingerprints(plan: ExecutionPlan) -> List[str]:
+    return [clause.fingerprint for _, clauses in plan.groups for clause in clauses]
+
+
+def test_canonical_hash():
+    """Test that key order does not change the hash"""
+    assert canonical_hash({"a": 1, "b": [1, 2]}) == canonical_hash(
+        {"b": [1, 2], "a": 1}
+    )
+    assert canonical_hash({"a": 1}) != canonical_hash({"a": 2})
+
+
+def test_lint_cache(tmp_path: Path, specs: Dict, ruleset_instance: RuleSetModel):
+    """Test that only new or changed subtrees and clauses are checked again"""
+    ruleset_instance.rules["operation-tags"].then = ThenModel(function="hasSummary")
+    custom_callables = {"has_summary": custom_has_summary}
+    plan = compile_ruleset(ruleset_instance, custom_callables)
+    cache_path = tmp_path / "lint.sqlite"
+
+    def enforce(specs: Dict) -> int:
+        lint_cache = LintCache(cache_path)
+        CALLS.clear()
+        results = RuleEnforcer(
+            ruleset_instance=ruleset_instance,
+            spec_parser_instance=Parser(specs=specs),
+            plan=plan,
+            lint_cache=lint_cache,
+        ).enforce()
+        assert lint_cache.prune(fingerprints(plan), "ruleset") == 0
+        lint_cache.close()
+        return len(results)
+
+    assert enforce(specs) == 3
+    assert len(CALLS) == 2
+
+    assert enforce(specs) == 3
+    assert CALLS == []
+
+    specs["paths"]["/users"]["get"]["summary"] = "List users"
+    assert enforce(specs) == 2
+    assert CALLS == [specs["paths"]["/users"]["get"]]
+
+    ruleset_instance.rules["operation-tags"].then = ThenModel(
+        function="hasSummary", functionOptions={"strict": True}
+    )
+    new_plan = compile_ruleset(ruleset_instance, custom_callables)
+    lint_cache = LintCache(cache_path)
+    assert lint_cache.prune(fingerprints(new_plan), "ruleset") == 3
+    lint_cache.close()
+
+
+def test_lint_cache_shared(tmp_path: Path, specs: Dict, ruleset_instance: RuleSetModel):
+    """Test that pruning for one ruleset keeps the entries of another"""
+    ruleset_instance.rules["operation-tags"].then = ThenModel(function="hasSummary")
+    custom_callables = {"has_summary": custom_has_summary}
+    plan = compile_ruleset(ruleset_instance, custom_callables)
+    other_instance = ruleset_instance.model_copy(deep=True)
+    other_instance.rules["operation-tags"].then = ThenModel(
+        function="hasSummary", functionOptions={"strict": True}
+    )
+    other_plan = compile_ruleset(other_instance, custom_callables)
+    cache_path = tmp_path / "lint.sqlite"
+
+    for name, instance, current in (
+        ("a", ruleset_instance, plan),
+        ("b", other_instance, other_plan),
+        ("a", ruleset_instance, plan),
+    ):
+        lint_cache = LintCache(cache_path)
+        CALLS.clear()
+        RuleEnforcer(
+            ruleset_instance=instance,
+            spec_parser_instance=Parser(specs=specs),
+            plan=current,
+            lint_cache=lint_cache,
+        ).enforce()
+        assert lint_cache.prune(fingerprints(current), name) == 0
+        lint_cache.close()
+    assert CALLS == []
+
+    # b drops its clause, a still uses the clauses they share
+    lint_cache = LintCache(cache_path)
+    assert lint_cache.prune(fingerprints(plan), "b") == 2
+    assert lint_cache.prune(fingerprints(plan), "a") == 0
+    lint_cache.close()
+
+
+def test_lint_cache_costs(tmp_path: Path, specs: Dict, ruleset_instance: RuleSetModel):
+    """Test that clause costs are kept between runs and pruned with the clauses"""
+    plan = compile_ruleset(ruleset_instance)
+    lint_cache = LintCache(tmp_path / "lint.sqlite")
+    RuleEnforcer(None, Parser(specs=specs), plan=plan, lint_cache=lint_cache).enforce()
+    lint_cache.close()
+
+    lint_cache = LintCache(tmp_path / "lint.sqlite")
+    costs = lint_cache.load_costs()
+    assert {given for given, _ in costs} == {"$.paths[*][*]", "$.info.title"}
+    assert costs[("$.info.title", plan.groups[1][1][0].fingerprint)][0] == 1
+
+    lint_cache.prune(fingerprints(plan), "ruleset")
+    lint_cache.prune([plan.groups[1][1][0].fingerprint], "ruleset")
+    assert list(lint_cache.load_costs()) == [
+        ("$.info.title", plan.groups[1][1][0].fingerprint)
+    ]
+    lint_cache.close()
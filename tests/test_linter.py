@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from stinky.noodle import Linter
+from stinky.noodle.utils.enforcer import RuleEnforcer
+from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils.plan import compile_ruleset
+from stinky.noodle.utils.ruleset import RuleSetModel
+
+
+def test_linter_threads(ruleset_instance: RuleSetModel, specs: Dict):
+    """Test that concurrent lints of different specs do not share state"""
+    linter = Linter(ruleset_instance)
+    good = dict(specs, paths={})
+    batch = [specs, good] * 50
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(linter.lint, batch))
+
+    expected = RuleEnforcer(None, Parser(specs=specs), plan=linter.plan).enforce()
+    assert results == [expected, []] * 50
+    assert [result.rule for result in expected] == ["operation-id-camel-case"]
+
+
+def test_linter_options(tmp_path: Path, ruleset_instance: RuleSetModel, specs: Dict):
+    """Test that linters can be created from a ruleset file, plan or model"""
+    ruleset_path = tmp_path / "ruleset.json"
+    ruleset_path.write_text(ruleset_instance.model_dump_json())
+    specs["info"]["title"] = ""
+
+    assert len(Linter.from_path(ruleset_path).lint(specs)) == 2
+    assert len(Linter.from_path(ruleset_path, min_severity="error").lint(specs)) == 1
+    plan = compile_ruleset(ruleset_instance)
+    assert Linter(plan=plan).plan is plan
+    with pytest.raises(ValueError, match="ruleset_instance or plan"):
+        Linter()
+
+
+def test_enforcer_custom_callables_default(ruleset_instance: RuleSetModel):
+    """Test that enforcers do not share a mutable custom callables default"""
+    first = RuleEnforcer(ruleset_instance, Parser(specs={}))
+    second = RuleEnforcer(ruleset_instance, Parser(specs={}))
+
+    first.custom_callables["extra"] = print
+    assert second.custom_callables == {}
@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from stinky.noodle.utils import loader
+from stinky.noodle.utils.bundle import BundleLoader, external_refs
+from stinky.noodle.utils.loader import DocumentCache, detect_format, load_document
+from stinky.noodle.utils.parser import Parser
+
+
+@pytest.mark.parametrize(
+    ("name", "content", "result"),
+    [
+        ("spec.json", b"openapi: 3.0.0", "json"),
+        ("spec.YAML", b"{}", "yaml"),
+        ("spec.yml", b"{}", "yaml"),
+        ("spec", b'  {"openapi": "3.0.0"}', "json"),
+        ("spec", b"openapi: 3.0.0", "yaml"),
+    ],
+)
+def test_detect_format(name: str, content: bytes, result: str):
+    """Test format detection by extension and content"""
+    assert detect_format(Path(name), content) == result
+
+
+def test_load_document(tmp_path: Path):
+    """Test loading json and yaml documents"""
+    pytest.importorskip("yaml")
+    (tmp_path / "spec.json").write_text('{"info": {"title": "x"}}')
+    (tmp_path / "spec.yaml").write_text("info:\n  title: x\n")
+
+    assert load_document(tmp_path / "spec.json") == {"info": {"title": "x"}}
+    assert load_document(tmp_path / "spec.yaml") == {"info": {"title": "x"}}
+
+
+def test_load_document_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that cached documents are not parsed again until they change"""
+    calls = []
+    parse_json = loader.PARSERS["json"]
+    monkeypatch.setitem(
+        loader.PARSERS, "json", lambda content: calls.append(1) or parse_json(content)
+    )
+    cache = DocumentCache(tmp_path / "cache")
+    spec_path = tmp_path / "spec.json"
+    spec_path.write_text('{"a": 1}')
+
+    assert load_document(spec_path, cache=cache) == {"a": 1}
+    assert load_document(spec_path, cache=cache) == {"a": 1}
+    assert len(calls) == 1
+
+    spec_path.write_text('{"a": 2}')
+    assert load_document(spec_path, cache=cache) == {"a": 2}
+    assert len(calls) == 2
+
+
+def test_bundle_loader(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that bundles are loaded across files, each file once per loader"""
+    parsed = []
+    parse_json = loader.PARSERS["json"]
+    monkeypatch.setitem(
+        loader.PARSERS,
+        "json",
+        lambda content: parsed.append(content) or parse_json(content),
+    )
+    (tmp_path / "schemas").mkdir()
+    (tmp_path / "paths").mkdir()
+    (tmp_path / "schemas" / "user.json").write_text(
+        json.dumps({"User": {"type": "object", "title": "User"}})
+    )
+    (tmp_path / "paths" / "users.json").write_text(
+        json.dumps(
+            {
+                "get": {"schema": {"$ref": "../schemas/user.json#/User"}},
+                "post": {"schema": {"$ref": "../schemas/user.json#/User"}},
+            }
+        )
+    )
+    spec = {
+        "paths": {
+            "/users": {"$ref": "./paths/users.json"},
+            "/missing": {"$ref": "./missing.json"},
+            "/remote": {"$ref": "https://example.com/spec.json"},
+        },
+        "components": {"schemas": {"User": {"$ref": "schemas/user.json#/User"}}},
+    }
+    for name in ("a.json", "b.json"):
+        (tmp_path / name).write_text(json.dumps(spec))
+
+    assert external_refs(spec) == [
+        "./paths/users.json",
+        "./missing.json",
+        "schemas/user.json",
+    ]
+    with BundleLoader(max_workers=4) as bundle_loader:
+        documents = bundle_loader.load(tmp_path / "a.json")
+        bundle_loader.load(tmp_path / "b.json")
+    assert list(documents)[0] == (tmp_path / "a.json").resolve()
+    assert set(documents) == {
+        (tmp_path / name).resolve()
+        for name in ("a.json", "paths/users.json", "schemas/user.json")
+    }
+    # a.json, b.json, users.json and user.json, however often they are referenced
+    assert len(parsed) == 4
+
+    spec_parser = Parser(
+        specs=documents[(tmp_path / "a.json").resolve()],
+        resolve_refs=True,
+        base_path=tmp_path / "a.json",
+        documents=documents,
+    )
+    assert len(parsed) == 4
+    assert spec_parser.find_objects("$.paths['/users'].*.schema.title") == [
+        "User",
+        "User",
+    ]
@@ -0,0 +1,273 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from stinky.noodle.utils import lazy
+from stinky.noodle.utils.parser import (
+    Parser,
+    UnsupportedExpressionError,
+    compile_expression,
+    format_path,
+    normalize_expression,
+)
+
+SPECS = {
+    "info": {"title": "Example", "version": "1.0.0"},
+    "paths": {
+        "/users": {
+            "get": {"operationId": "listUsers", "tags": ["b", "a"]},
+            "post": {"operationId": "createUser"},
+        },
+        "/users/{id}": {
+            "get": {
+                "operationId": "getUser",
+                "parameters": [{"name": "id", "in": "path"}, {"name": "q"}],
+            },
+        },
+    },
+    "components": {
+        "schemas": {
+            "User": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, "name": {"type": "string"}},
+            },
+        },
+    },
+}
+
+
+@pytest.mark.parametrize(
+    ("json_expr", "expected"),
+    [
+        ("$.info.title", ["Example"]),
+        ("$['info']['version']", ["1.0.0"]),
+        ("$..operationId", ["listUsers", "createUser", "getUser"]),
+        ("$.paths[*][*].operationId", ["listUsers", "createUser", "getUser"]),
+        ("$.paths.*.get.tags[*]", ["b", "a"]),
+        ("$..parameters[0].name", ["id"]),
+        ("$..parameters[-1].name", ["q"]),
+        ("$..parameters[0:1].name", ["id"]),
+        ("$..properties[*].type", ["integer", "string"]),
+        ("$.paths['/users'][get, post].operationId", ["listUsers", "createUser"]),
+        ("$.does.not.exist", []),
+        ("$..parameters[?(@.in == 'path')].name", ["id"]),
+        ("$..parameters[?(@.in !== 'path')].name", ["q"]),
+        ("$..parameters[?(!@.in && @.name)].name", ["q"]),
+        ("$.paths[*][?(@property === 'get')].operationId", ["listUsers", "getUser"]),
+        ("$.paths[*][?(@property.match(/^p/i))].operationId", ["createUser"]),
+        ("$.paths[?(@property.startsWith('/users/'))].get.operationId", ["getUser"]),
+        ("$..[?(@.tags && @.tags.length > 1)].operationId", ["listUsers"]),
+        ("$..tags[?(@ == 'a' || @parent.length == 0)]", ["a"]),
+        ("$.paths[*]~", ["/users", "/users/{id}"]),
+        ("$.paths['/users'][*]~", ["get", "post"]),
+        ("$..properties[?(@.type == 'string')]~", ["name"]),
+    ],
+)
+def test_find_objects(json_expr: str, expected: List[Any]):
+    """Test single expressions through the single-pass evaluator"""
+    assert Parser(specs=SPECS).find_objects(json_expr) == expected
+
+
+def test_find_objects_many():
+    """Test that a batch query returns the same as one query per expression"""
+    json_exprs = [
+        "$.info",
+        "$..operationId",
+        "$.components.schemas[*]",
+        "$..[?(@.in == 'path')]",
+    ]
+    parser = Parser(specs=SPECS)
+    many: Dict[str, List[Any]] = parser.find_objects_many(json_exprs)
+
+    assert list(sorted(many)) == sorted(json_exprs)
+    for json_expr in json_exprs:
+        assert many[json_expr] == parser.find_objects(json_expr)
+    assert many["$..[?(@.in == 'path')]"] == [{"name": "id", "in": "path"}]
+
+
+def test_find_objects_lazy(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that a lazy document gives the same matches as the parsed one"""
+    monkeypatch.setattr(lazy, "LAZY_THRESHOLD", 0)
+    spec_path = tmp_path / "spec.json"
+    spec_path.write_text(json.dumps(SPECS, indent=2))
+    specs = lazy.read_json_lazy(spec_path)
+    json_exprs = [
+        "$.info",
+        "$.paths",
+        "$..operationId",
+        "$.components.schemas[*]",
+        "$..[?(@.in == 'path')]",
+    ]
+
+    assert isinstance(specs, lazy.LazyObject)
+    assert Parser(specs=specs).find_objects_many(json_exprs) == Parser(
+        specs=SPECS
+    ).find_objects_many(json_exprs)
+
+    specs = lazy.read_json_lazy(spec_path)
+    assert Parser(specs=specs).find_objects("$.info.title") == ["Example"]
+    assert list(specs._values) == ["info"]
+
+
+def test_resolve_refs(tmp_path: Path):
+    """Test that refs are resolved once, shared, and that cycles terminate"""
+    (tmp_path / "common.json").write_text(
+        json.dumps({"Error": {"type": "object", "title": "Error"}})
+    )
+    specs = {
+        "paths": {
+            "/nodes": {
+                "get": {"schema": {"$ref": "#/components/schemas/Node"}},
+                "post": {"schema": {"$ref": "#/components/schemas/Node"}},
+                "delete": {"schema": {"$ref": "common.json#/Error"}},
+            }
+        },
+        "components": {
+            "schemas": {
+                "Node": {
+                    "title": "Node",
+                    "properties": {"child": {"$ref": "#/components/schemas/Node"}},
+                },
+                "Alias": {"$ref": "#/components/schemas/Alias"},
+            }
+        },
+    }
+    parser = Parser(specs=specs, resolve_refs=True, base_path=tmp_path / "spec.json")
+
+    get, post, delete = parser.find_objects("$.paths['/nodes'][*].schema")
+    assert get is post
+    assert get["properties"]["child"] is get
+    assert delete == {"type": "object", "title": "Error"}
+    assert parser.find_objects("$..title") == ["Node", "Node", "Error", "Node"]
+    assert parser.find_objects("$.components.schemas.Alias") == [
+        {"$ref": "#/components/schemas/Alias"}
+    ]
+    assert parser.raw_specs is specs
+    assert Parser(specs=specs).find_objects("$..title") == ["Node"]
+
+
+def test_resolve_refs_deep():
+    """Test that refs in specs nested deeper than the recursion limit are resolved"""
+    nested = leaf = {}
+    for _ in range(sys.getrecursionlimit() * 2):
+        leaf["child"] = {}
+        leaf = leaf["child"]
+    leaf["$ref"] = "#/info"
+    parser = Parser(
+        specs={"info": {"title": "Deep"}, "nested": nested}, resolve_refs=True
+    )
+
+    node = parser.specs["nested"]
+    while "child" in node:
+        node = node["child"]
+    assert node is parser.specs["info"]
+
+
+def test_resolve_refs_fallback():
+    """Test that pyjsonpath evaluates expressions on the specs without resolved refs"""
+    specs = {
+        "components": {
+            "schemas": {
+                "Node": {
+                    "title": "Node",
+                    "properties": {"child": {"$ref": "#/components/schemas/Node"}},
+                }
+            }
+        }
+    }
+    parser = Parser(specs=specs, resolve_refs=True)
+    json_expr = "$..[?(@.title in ['Node'])]"
+
+    expected = [specs["components"]["schemas"]["Node"]]
+    assert parser.find_objects(json_expr) == expected
+    assert parser.find_objects_many([json_expr]) == {json_expr: expected}
+    assert [
+        match.node for _, match in parser.iter_matches_many([json_expr])
+    ] == expected
+
+
+def test_reference_index():
+    """Test that the reference index is built once and records ref locations"""
+    specs = {
+        **SPECS,
+        "paths": {"/users": {"get": {"schema": {"$ref": "#/components/schemas/User"}}}},
+    }
+    parser = Parser(specs=specs)
+    index = parser.reference_index()
+
+    assert parser.reference_index() is index
+    assert index.references == {
+        "#/components/schemas/User": ["#/paths/~1users/get/schema"]
+    }
+    assert index.is_referenced("#/components/schemas/User")
+    assert not index.is_referenced("#/components/schemas/Other")
+
+
+def test_find_matches_many():
+    """Test that matches come with the keys leading to them"""
+    matches = Parser(specs=SPECS).find_matches_many(
+        ["$.paths[*].get.operationId", "$..[?(@.in == 'path')]"]
+    )
+
+    assert matches["$.paths[*].get.operationId"] == [
+        (("paths", "/users", "get", "operationId"), "listUsers"),
+        (("paths", "/users/{id}", "get", "operationId"), "getUser"),
+    ]
+    assert matches["$..[?(@.in == 'path')]"] == [
+        (("paths", "/users/{id}", "get", "parameters", 0), {"name": "id", "in": "path"})
+    ]
+    assert (
+        format_path(("paths", "/users/{id}", "get", "parameters", 0))
+        == "$.paths['/users/{id}'].get.parameters[0]"
+    )
+
+
+def test_iter_matches():
+    """Test that matches are yielded lazily with their JSON pointers"""
+    matches = Parser(specs=SPECS).iter_matches("$.paths[*][?(@.operationId)]~")
+
+    match = next(matches)
+    assert match == (("paths", "/users", "get"), "get")
+    operation = next(Parser(specs=SPECS).iter_matches("$.paths['/users'].get")).node
+    assert operation is SPECS["paths"]["/users"]["get"]
+    assert match.pointer == "/paths/~1users/get"
+    assert [(match.pointer, match.node) for match in matches] == [
+        ("/paths/~1users/post", "post"),
+        ("/paths/~1users~1{id}/get", "get"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("json_expr", "normalized"),
+    [
+        ("$.paths.*[?( @.in=='path' )]", "$.paths[*][?(@.in=='path')]"),
+        ("$['paths'][?(@property == ']')]", "$.paths[?(@property == ']')]"),
+        ("$.paths.*~", "$.paths[*]~"),
+    ],
+)
+def test_normalize_filters(json_expr: str, normalized: str):
+    """Test that filters and property names survive normalization"""
+    assert normalize_expression(json_expr) == normalized
+    assert compile_expression(normalized) is compile_expression(normalized)
+
+
+@pytest.mark.parametrize(
+    "json_expr",
+    ["$.paths['/a\\\\b'].get", "$..['it\\'s']", """ $['say "hi"', 'it\\'s'] """],
+)
+def test_normalize_keeps_unparsable(json_expr: str):
+    """Test that expressions whose normalized form would select other keys are kept"""
+    assert normalize_expression(json_expr) == json_expr.strip()
+
+
+@pytest.mark.parametrize(
+    "json_expr",
+    ["$..[?(@.in ==)]", "$..[?(@.in == 'path'", "$..[?(@.name.toUpperCase())]"],
+)
+def test_unsupported_filters(json_expr: str):
+    """Test that malformed or unknown filter syntax is rejected when compiling"""
+    with pytest.raises(UnsupportedExpressionError):
+        compile_expression(json_expr)
@@ -0,0 +1,74 @@
+import json
+import pickle
+from typing import Dict
+
+from stinky.noodle.utils.enforcer import RuleEnforcer
+from stinky.noodle.utils.parser import Parser
+from stinky.noodle.utils.plan import compile_ruleset
+from stinky.noodle.utils.profiler import Profiler
+from stinky.noodle.utils.ruleset import RuleSetModel
+
+
+def test_profiled_enforce(ruleset_instance: RuleSetModel, specs: Dict):
+    """Test that a profiled run gives the same results and records every clause"""
+    plan = compile_ruleset(ruleset_instance)
+    profiler = Profiler()
+
+    plain = RuleEnforcer(None, Parser(specs=specs), plan=plan).enforce()
+    profiled = RuleEnforcer(
+        None, Parser(specs=specs), plan=plan, profiler=profiler
+    ).enforce()
+    assert profiled == plain
+
+    report = profiler.to_json()
+    assert {record["given"] for record in report["givens"]} == {
+        "$.paths[*][*]",
+        "$.info.title",
+    }
+    assert {(record["rule"], record["function"]) for record in report["clauses"]} == {
+        ("operation-id-camel-case", "casing"),
+        ("operation-tags", "truthy"),
+        ("info-title", "truthy"),
+    }
+    assert {record["function"] for record in report["functions"]} == {
+        "casing",
+        "truthy",
+    }
+    assert all(record["path"].startswith("$") for record in report["slowest"])
+    seconds = [record["seconds"] for record in report["clauses"]]
+    assert seconds == sorted(seconds, reverse=True)
+    assert "operation-tags" in profiler.table()
+
+
+def test_profiler_slowest_is_bounded():
+    """Test that only the slowest checks are kept"""
+    profiler = Profiler(slowest=3)
+    for index in range(10):
+        profiler.record_call("rule", "truthy", ("paths", str(index)), index / 1000)
+
+    assert [record["path"] for record in profiler.to_json()["slowest"]] == [
+        "$.paths['9']",
+        "$.paths['8']",
+        "$.paths['7']",
+    ]
+
+
+def test_profiler_merge_and_export():
+    """Test that worker profilers merge, pickle and export as a Chrome trace"""
+    first, second = Profiler(), Profiler()
+    for profiler in (first, second):
+        profiler.record_match("$.info", ["rule"], 1.0, 0.5, 2)
+        profiler.record_check("rule", "$.info", "truthy", 1.5, 0.25, 2)
+        profiler.record_call("rule", "truthy", ("info",), 0.2)
+
+    first.merge(pickle.loads(pickle.dumps(second)))
+    report = first.to_json()
+    assert report["givens"] == [
+        {"given": "$.info", "rules": ["rule"], "seconds": 1.0, "matches": 4}
+    ]
+    assert report["functions"] == [{"function": "truthy", "seconds": 0.5, "calls": 4}]
+    assert len(report["slowest"]) == 2
+
+    trace = json.loads(json.dumps(first.chrome_trace()))
+    assert len(trace["traceEvents"]) == 4
+    assert {event["ph"] for event in trace["traceEvents"]} == {"X"}
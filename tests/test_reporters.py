@@ -0,0 +1,84 @@
+import io
+import json
+from pathlib import Path
+from typing import Type
+
+import pytest
+
+from stinky.noodle.utils.reporters import (
+    JSONReporter,
+    LintResult,
+    NDJSONReporter,
+    Reporter,
+    SARIFReporter,
+    TextReporter,
+)
+
+RESULTS = [
+    LintResult(
+        rule="operation-id-camel-case",
+        severity="error",
+        message="operationId is not camelCase",
+        path="$.paths['/users'].post.operationId",
+        function="casing",
+        pointer="/paths/~1users/post/operationId",
+    ),
+    LintResult(
+        rule="operation-tags",
+        severity="warn",
+        message="Operation has no tags",
+        path="$.paths['/users'].post.tags",
+        function="truthy",
+    ),
+]
+
+
+def report(reporter: Reporter, spec_path: Path):
+    for result in RESULTS:
+        reporter.result(spec_path, result)
+    reporter.file(spec_path, RESULTS)
+    reporter.file(spec_path.with_name("broken.json"), None)
+    reporter.close()
+
+
+@pytest.mark.parametrize(
+    "reporter_cls", [TextReporter, JSONReporter, NDJSONReporter, SARIFReporter]
+)
+def test_reporters(reporter_cls: Type[Reporter], tmp_path: Path):
+    """Test that every reporter writes all results of a run"""
+    stream = io.StringIO()
+    spec_path = tmp_path / "spec.json"
+    report(reporter_cls(stream), spec_path)
+    output = stream.getvalue()
+
+    if reporter_cls is TextReporter:
+        assert output == ""
+    elif reporter_cls is JSONReporter:
+        assert json.loads(output) == [
+            {"file": str(spec_path), **result._asdict()} for result in RESULTS
+        ]
+    elif reporter_cls is NDJSONReporter:
+        assert [json.loads(line) for line in output.splitlines()] == [
+            {"file": str(spec_path), **result._asdict()} for result in RESULTS
+        ]
+    else:
+        run = json.loads(output)["runs"][0]
+        assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == [
+            "operation-id-camel-case",
+            "operation-tags",
+        ]
+        assert [result["level"] for result in run["results"]] == ["error", "warning"]
+        assert [result["properties"]["jsonPointer"] for result in run["results"]] == [
+            "/paths/~1users/post/operationId",
+            None,
+        ]
+        assert run["invocations"][0]["executionSuccessful"] is False
+
+
+def test_ndjson_reporter_streams(tmp_path: Path):
+    """Test that results are written as soon as they are produced"""
+    stream = io.StringIO()
+    reporter = NDJSONReporter(stream)
+    reporter.result(tmp_path / "spec.json", RESULTS[0])
+
+    assert json.loads(stream.getvalue())["rule"] == "operation-id-camel-case"
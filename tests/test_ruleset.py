@@ -0,0 +1,202 @@
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from stinky.noodle.server import LintDaemon
+from stinky.noodle.utils.exceptions import InvalidRulesetError
+from stinky.noodle.utils.loader import DocumentCache
+from stinky.noodle.utils.ruleset import expand_given, load_ruleset, read_ruleset
+
+
+def rule(given: Any, function: str = "truthy", **kwargs) -> Dict:
+    return dict(
+        {
+            "description": "",
+            "message": "",
+            "severity": "warn",
+            "given": given,
+            "then": {"function": function},
+        },
+        **kwargs,
+    )
+
+
+def write(path: Path, ruleset: Dict) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(ruleset))
+    return path
+
+
+@pytest.fixture
+def base_ruleset(tmp_path: Path) -> Path:
+    return write(
+        tmp_path / "base" / "base.json",
+        {
+            "description": "Company ruleset",
+            "formats": ["oas3"],
+            "aliases": {"Operation": ["$.paths[*][*]"], "Info": "$.info"},
+            "functions": [],
+            "functionsDir": "functions",
+            "rules": {
+                "operation-tags": rule("#Operation.tags"),
+                "info-title": rule("#Info", severity="error"),
+                "operation-summary": rule("#Operation", recommended=False),
+            },
+        },
+    )
+
+
+def test_read_ruleset(tmp_path: Path, base_ruleset: Path):
+    """Test that extends chains are merged in order and aliases expanded"""
+    write(
+        tmp_path / "team.json",
+        {
+            "extends": "base/base.json",
+            "aliases": {"PathItem": "$.paths[*]", "Get": "#PathItem.get"},
+            "rules": {"info-title": "hint", "get-id": rule("#Get.operationId")},
+        },
+    )
+    path = write(
+        tmp_path / "service.json",
+        {
+            "extends": [["team.json", "all"]],
+            "description": "Service ruleset",
+            "rules": {
+                "operation-tags": False,
+                "get-id": {"severity": "error"},
+            },
+        },
+    )
+
+    ruleset, sources = read_ruleset(path)
+    assert ruleset["description"] == "Service ruleset"
+    assert ruleset["formats"] == ["oas3"]
+    assert {name: rule["severity"] for name, rule in ruleset["rules"].items()} == {
+        "info-title": "hint",
+        "get-id": "error",
+    }
+    assert ruleset["rules"]["info-title"]["given"] == ["$.info"]
+    assert ruleset["rules"]["get-id"]["given"] == ["$.paths[*].get.operationId"]
+    assert sources == [path, tmp_path / "team.json", base_ruleset]
+
+
+@pytest.mark.parametrize(
+    ("mode", "rules"),
+    [
+        ("recommended", ["operation-tags", "info-title"]),
+        ("all", ["operation-tags", "info-title", "operation-summary"]),
+        ("off", []),
+    ],
+)
+def test_read_ruleset_extends_mode(tmp_path: Path, base_ruleset: Path, mode, rules):
+    """Test that the extends mode picks the inherited rules"""
+    path = write(tmp_path / "ruleset.json", {"extends": [["base/base.json", mode]]})
+
+    assert list(read_ruleset(path)[0]["rules"]) == rules
+
+
+@pytest.mark.parametrize(
+    ("ruleset", "error"),
+    [
+        ({"extends": "spectral:oas"}, "only local rulesets"),
+        ({"extends": "missing.json"}, "Unable to read"),
+        ({"extends": "ruleset.json"}, "extend each other"),
+        ({"rules": {"unknown": "off"}}, "no extended ruleset defines it"),
+        ({"rules": {"a": rule("#Unknown")}}, "Unknown alias"),
+        ({"extends": [["base.json", "some"]]}, "invalid extends entry"),
+    ],
+)
+def test_read_ruleset_invalid(tmp_path: Path, ruleset: Dict, error: str):
+    """Test that unresolvable rulesets are reported"""
+    path = write(tmp_path / "ruleset.json", ruleset)
+
+    with pytest.raises(InvalidRulesetError, match=error):
+        read_ruleset(path)
+
+
+@pytest.mark.parametrize(
+    ("given", "expanded"),
+    [
+        ("$.info", ["$.info"]),
+        ("#Info", ["$.info"]),
+        ("#Operation[*]", ["$.paths[*].get[*]", "$.paths[*].put[*]"]),
+        ("#Scoped.name", ["$.a.name", "$.b.name"]),
+    ],
+)
+def test_expand_given(given: str, expanded: list):
+    """Test that aliases are expanded, also in other aliases"""
+    aliases = {
+        "Info": "$.info",
+        "PathItem": "$.paths[*]",
+        "Operation": ["#PathItem.get", "#PathItem.put"],
+        "Scoped": {"targets": [{"formats": ["oas3"], "given": ["$.a", "$.b"]}]},
+        "Loop": "#Loop",
+    }
+    assert expand_given(given, aliases) == expanded
+    with pytest.raises(InvalidRulesetError, match="refer to each other"):
+        expand_given("#Loop", aliases)
+
+
+def test_load_ruleset_scoped_alias(tmp_path: Path):
+    """Test that rulesets with scoped aliases load and expand them"""
+    path = write(
+        tmp_path / "ruleset.json",
+        {
+            "description": "",
+            "formats": ["oas3"],
+            "aliases": {
+                "Ops": {
+                    "description": "Operations",
+                    "targets": [{"formats": ["oas3"], "given": ["$.paths[*][*]"]}],
+                }
+            },
+            "functions": [],
+            "functionsDir": "functions",
+            "rules": {"operation-tags": rule("#Ops.tags")},
+        },
+    )
+
+    ruleset_instance, _ = load_ruleset(path)
+    assert ruleset_instance.rules["operation-tags"].given == ["$.paths[*][*].tags"]
+
+
+def test_load_ruleset_cache(tmp_path: Path, base_ruleset: Path):
+    """Test that the validated ruleset is cached by its merged content"""
+    cache = DocumentCache(tmp_path / "cache")
+    path = write(tmp_path / "ruleset.json", {"extends": "base/base.json"})
+
+    def entries():
+        return sorted(entry.name for entry in cache.cache_dir.glob("ruleset-*"))
+
+    first, _ = load_ruleset(path, cache=cache)
+    assert len(entries()) == 1
+    second, _ = load_ruleset(path, cache=cache)
+    assert second == first and len(entries()) == 1
+
+    write(path, {"extends": "base/base.json", "rules": {"info-title": "off"}})
+    third, _ = load_ruleset(path, cache=cache)
+    assert list(third.rules) == ["operation-tags"]
+    assert len(entries()) == 2
+
+    base = json.loads(base_ruleset.read_text())
+    base["rules"]["operation-tags"]["severity"] = "error"
+    base_ruleset.write_text(json.dumps(base))
+    fourth, _ = load_ruleset(path, cache=cache)
+    assert fourth.rules["operation-tags"].severity == "error"
+
+
+def test_lint_daemon_reloads_extended_ruleset(tmp_path: Path, base_ruleset: Path):
+    """Test that the daemon recompiles when an extended ruleset changes"""
+    path = write(tmp_path / "ruleset.json", {"extends": "base/base.json"})
+    lint_daemon = LintDaemon(path)
+    plan = lint_daemon.plan()
+    assert lint_daemon.plan() is plan
+
+    base = json.loads(base_ruleset.read_text())
+    del base["rules"]["info-title"]
+    base_ruleset.write_text(json.dumps(base, indent=2))
+    assert lint_daemon.plan() is not plan
+    assert plan.given_count == 2
+    assert lint_daemon.plan().given_count == 1
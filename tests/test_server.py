@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+
+from stinky.noodle.server import (
+    LintDaemon,
+    LintServer,
+    changed_paths,
+    lint_remote,
+    send_request,
+)
+from stinky.noodle.utils.ruleset import RuleSetModel
+
+
+def test_lint_daemon(tmp_path: Path, specs: Dict, ruleset_instance: RuleSetModel):
+    """Test that the daemon lints over its socket and only re-parses changed specs"""
+    ruleset_path = tmp_path / "ruleset.json"
+    ruleset_path.write_text(ruleset_instance.model_dump_json())
+    spec_path = tmp_path / "spec.json"
+    spec_path.write_text(json.dumps(specs))
+    socket_path = tmp_path / "noodle.sock"
+
+    lint_daemon = LintDaemon(ruleset_path)
+    with LintServer(socket_path, lint_daemon) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            assert lint_remote(socket_path, [str(spec_path)]) == 1
+            assert lint_remote(socket_path, [str(spec_path)]) == 1
+            assert lint_daemon.parsers.stats()["misses"] == 1
+
+            specs["paths"]["/users"]["post"]["operationId"] = "createUser"
+            spec_path.write_text(json.dumps(specs, indent=2))
+            request = {"command": "lint", "spec_paths": [str(spec_path)]}
+            responses = list(send_request(socket_path, request))
+            assert responses[0]["results"] == []
+            assert responses[-1] == {"done": True, "fail_count": 0}
+            assert lint_daemon.parsers.stats()["misses"] == 2
+        finally:
+            assert list(send_request(socket_path, {"command": "shutdown"})) == [
+                {"ok": True, "pid": os.getpid()}
+            ]
+            thread.join(timeout=5)
+    assert not socket_path.exists()
+
+
+def test_changed_paths(tmp_path: Path):
+    """Test that only new and modified files are reported"""
+    first, second = tmp_path / "a.json", tmp_path / "b.json"
+    first.write_text("{}")
+    stamps = {}
+
+    assert changed_paths([first, second], stamps) == [first]
+    assert changed_paths([first, second], stamps) == []
+    second.write_text("{}")
+    first.write_text('{"a": 1}')
+    assert changed_paths([first, second], stamps) == [first, second]
+
+
+def test_lint_daemon_resolve_refs(
+    tmp_path: Path, specs: Dict, ruleset_instance: RuleSetModel
+):
+    """Test that specs are linted again when a file they reference changes"""
+    ruleset_path = tmp_path / "ruleset.json"
+    ruleset_path.write_text(ruleset_instance.model_dump_json())
+    spec_path = tmp_path / "spec.json"
+    spec_path.write_text(
+        json.dumps(
+            dict(
+                specs,
+                paths={
+                    "/users": {"$ref": "./users.json"},
+                    "/teams": {"$ref": "./teams.json"},
+                },
+            )
+        )
+    )
+    users = specs["paths"]["/users"]
+    users["post"]["operationId"] = "createUser"
+    (tmp_path / "users.json").write_text(json.dumps(users))
+
+    lint_daemon = LintDaemon(ruleset_path, resolve_refs=True)
+    # teams.json does not exist yet, its operations cannot be checked
+    assert lint_daemon.lint(spec_path)["fail_count"] is None
+    (tmp_path / "teams.json").write_text(
+        json.dumps({"get": {"operationId": "listTeams"}})
+    )
+    assert lint_daemon.lint(spec_path)["fail_count"] == 1
+    assert lint_daemon.lint(spec_path)["fail_count"] == 1
+    assert lint_daemon.parsers.stats()["misses"] == 2
+
+    users["post"]["operationId"] = "create_user"
+    (tmp_path / "users.json").write_text(json.dumps(users, indent=2))
+    assert lint_daemon.lint(spec_path)["fail_count"] == 2
+    assert lint_daemon.parsers.stats()["misses"] == 3